@@ -0,0 +1,295 @@
+"""
+Incrementally maintained overview aggregates.
+
+``stats_aggregates`` holds one row per (scope, key):
+
+- ``("status", <status>)``: resources
+- ``("type", <resource_type>)``: resources, completed
+- ``("skill", <skill>)``: resources, completed, seconds
+- ``("total", "")``: seconds
+
+Write paths in ``services`` apply deltas in the same transaction as the
+change itself, so ``GET /stats/overview`` is a read of a handful of rows.
+``rebuild`` / ``check`` recompute everything from the raw tables.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, select
+
+from . import versions
+from .models import ResourceDB, ResourceSkillDB, StatsAggregateDB, StudySessionDB
+from .schemas import ResourceStatus, ResourceType
+
+Key = Tuple[str, str]
+# [resources, completed, seconds]
+Values = List[Any]
+
+# incremental float sums and a fresh GROUP BY can differ in the last bits
+SECONDS_TOLERANCE = 1e-3
+
+
+def _bump(
+    session: Session,
+    scope: str,
+    key: str,
+    resources: int = 0,
+    completed: int = 0,
+    seconds: float = 0.0,
+) -> None:
+    stmt = sqlite_insert(StatsAggregateDB).values(
+        scope=scope,
+        key=key,
+        resources=resources,
+        completed=completed,
+        seconds=seconds,
+    )
+    session.exec(
+        stmt.on_conflict_do_update(
+            index_elements=["scope", "key"],
+            set_={
+                "resources": StatsAggregateDB.resources + stmt.excluded.resources,
+                "completed": StatsAggregateDB.completed + stmt.excluded.completed,
+                "seconds": StatsAggregateDB.seconds + stmt.excluded.seconds,
+            },
+        )
+    )
+
+
+def _skills(target_skills: Sequence[str] | None) -> List[str]:
+    return list(dict.fromkeys(target_skills or []))
+
+
+# ---------- Write-path hooks ----------
+
+def on_resource_created(session: Session, db_resource: ResourceDB) -> None:
+    done = int(db_resource.status == ResourceStatus.completed)
+    _bump(session, "status", db_resource.status.value, resources=1)
+    _bump(
+        session,
+        "type",
+        db_resource.resource_type.value,
+        resources=1,
+        completed=done,
+    )
+    for skill in _skills(db_resource.target_skills):
+        _bump(session, "skill", skill, resources=1, completed=done)
+
+
+def on_resource_status_changed(
+    session: Session,
+    db_resource: ResourceDB,
+    old_status: ResourceStatus,
+) -> None:
+    on_resources_status_changed(session, [(db_resource, old_status)])
+
+
+def on_resources_status_changed(
+    session: Session,
+    changes: Sequence[Tuple[ResourceDB, ResourceStatus]],
+) -> None:
+    """Status changes of many resources, one upsert per affected row."""
+    # key -> [resources, completed]
+    deltas: Dict[Key, List[int]] = {}
+
+    def add(key: Key, resources: int = 0, completed: int = 0) -> None:
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += resources
+        delta[1] += completed
+
+    for db_resource, old_status in changes:
+        new_status = db_resource.status
+        if new_status == old_status:
+            continue
+        add(("status", old_status.value), resources=-1)
+        add(("status", new_status.value), resources=1)
+
+        done = int(new_status == ResourceStatus.completed) - int(
+            old_status == ResourceStatus.completed
+        )
+        if done:
+            add(("type", db_resource.resource_type.value), completed=done)
+            for skill in _skills(db_resource.target_skills):
+                add(("skill", skill), completed=done)
+
+    for (scope, key), (resources, completed) in deltas.items():
+        if resources or completed:
+            _bump(session, scope, key, resources=resources, completed=completed)
+
+
+def on_study_time_added(
+    session: Session,
+    target_skills: Sequence[str],
+    seconds: float,
+) -> None:
+    """``target_skills`` of the resource the time was logged against."""
+    _bump(session, "total", "", seconds=seconds)
+
+    # a resource's study time is split evenly across its skills
+    skills = _skills(target_skills)
+    for skill in skills:
+        _bump(session, "skill", skill, seconds=seconds / len(skills))
+
+
+# ---------- Reads ----------
+
+def _stored_rows(session: Session) -> Dict[Key, Values]:
+    return {
+        (a.scope, a.key): [a.resources, a.completed, a.seconds]
+        for a in session.exec(select(StatsAggregateDB))
+    }
+
+
+def _rows_from_tables(session: Session) -> Dict[Key, Values]:
+    """Recompute every aggregate row with GROUP BY queries on the raw tables."""
+    rows: Dict[Key, Values] = {}
+
+    def add(
+        key: Key, resources: int = 0, completed: int = 0, seconds: float = 0.0
+    ) -> None:
+        row = rows.setdefault(key, [0, 0, 0.0])
+        row[0] += resources
+        row[1] += completed
+        row[2] += seconds
+
+    is_completed = case(
+        (col(ResourceDB.status) == ResourceStatus.completed, 1), else_=0
+    )
+
+    # counts per (type, status)
+    for resource_type, status, count in session.exec(
+        select(ResourceDB.resource_type, ResourceDB.status, func.count())
+        .group_by(col(ResourceDB.resource_type), col(ResourceDB.status))
+    ):
+        done = count if status == ResourceStatus.completed else 0
+        add(("status", ResourceStatus(status).value), resources=count)
+        add(
+            ("type", ResourceType(resource_type).value),
+            resources=count,
+            completed=done,
+        )
+
+    # total study time
+    total_seconds = session.exec(
+        select(func.coalesce(func.sum(StudySessionDB.duration_seconds), 0))
+    ).one()
+    add(("total", ""), seconds=float(total_seconds))
+
+    # by skill: resource counts
+    for skill, resources, completed in session.exec(
+        select(ResourceSkillDB.skill, func.count(), func.sum(is_completed))
+        .join(ResourceDB, col(ResourceDB.id) == ResourceSkillDB.resource_id)
+        .group_by(col(ResourceSkillDB.skill))
+    ):
+        add(("skill", skill), resources=resources, completed=completed or 0)
+
+    # by skill: a resource's study time is split evenly across its skills
+    seconds_per_resource = (
+        select(
+            StudySessionDB.resource_id,
+            func.sum(StudySessionDB.duration_seconds).label("seconds"),
+        )
+        .group_by(col(StudySessionDB.resource_id))
+        .subquery()
+    )
+    skills_per_resource = (
+        select(ResourceSkillDB.resource_id, func.count().label("n"))
+        .group_by(col(ResourceSkillDB.resource_id))
+        .subquery()
+    )
+    for skill, seconds in session.exec(
+        select(
+            ResourceSkillDB.skill,
+            func.sum(
+                seconds_per_resource.c.seconds * 1.0 / skills_per_resource.c.n
+            ),
+        )
+        .join(
+            seconds_per_resource,
+            seconds_per_resource.c.resource_id == ResourceSkillDB.resource_id,
+        )
+        .join(
+            skills_per_resource,
+            skills_per_resource.c.resource_id == ResourceSkillDB.resource_id,
+        )
+        .group_by(col(ResourceSkillDB.skill))
+    ):
+        add(("skill", skill), seconds=float(seconds or 0.0))
+
+    return rows
+
+
+def overview_from_rows(rows: Dict[Key, Values]) -> Dict[str, Any]:
+    """Shape aggregate rows into the ``/stats/overview`` payload."""
+    by_status = {
+        key: vals[0] for (scope, key), vals in rows.items() if scope == "status"
+    }
+    total_seconds = rows.get(("total", ""), [0, 0, 0.0])[2]
+
+    return {
+        "total_resources": sum(by_status.values()),
+        "completed_resources": by_status.get(ResourceStatus.completed.value, 0),
+        "in_progress_resources": by_status.get(ResourceStatus.in_progress.value, 0),
+        "total_study_hours": round(total_seconds / 3600.0, 2),
+        "by_type": {
+            key: {"count": vals[0], "completed": vals[1]}
+            for (scope, key), vals in sorted(rows.items())
+            if scope == "type" and vals[0] > 0
+        },
+        "by_skill": {
+            key: {
+                "resources": vals[0],
+                "completed": vals[1],
+                "hours": round(vals[2] / 3600.0, 2),
+            }
+            for (scope, key), vals in sorted(rows.items())
+            if scope == "skill" and vals[0] > 0
+        },
+    }
+
+
+def read_overview(session: Session) -> Dict[str, Any]:
+    return overview_from_rows(_stored_rows(session))
+
+
+# ---------- Maintenance ----------
+
+def check(session: Session) -> List[str]:
+    """Compare stored aggregates with the raw tables; returns drift messages."""
+    stored = _stored_rows(session)
+    fresh = _rows_from_tables(session)
+    zero: Values = [0, 0, 0.0]
+
+    problems = []
+    for key in sorted(set(stored) | set(fresh)):
+        have = stored.get(key, zero)
+        want = fresh.get(key, zero)
+        if (
+            have[0] != want[0]
+            or have[1] != want[1]
+            or abs(have[2] - want[2]) > SECONDS_TOLERANCE
+        ):
+            problems.append(f"{key[0]}/{key[1]}: stored {have}, expected {want}")
+    return problems
+
+
+def rebuild(session: Session) -> None:
+    """Replace the stored aggregates with values recomputed from raw tables.
+
+    Does not commit; callers own the transaction.
+    """
+    fresh = _rows_from_tables(session)
+    session.exec(delete(StatsAggregateDB))
+    for (scope, key), (resources, completed, seconds) in fresh.items():
+        session.add(
+            StatsAggregateDB(
+                scope=scope,
+                key=key,
+                resources=resources,
+                completed=completed,
+                seconds=seconds,
+            )
+        )
+    # cached responses and client ETags may cover the values replaced here
+    versions.bump(session, versions.RESOURCES, versions.SESSIONS)
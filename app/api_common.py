@@ -0,0 +1,101 @@
+"""
+Pieces shared by the sync (``app.main``) and async (``app.async_main``) apps:
+common setup and routes, query parameter descriptions, and the helpers
+their handlers use around ``services``.
+"""
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
+from sqlalchemy.exc import OperationalError
+
+from . import http_cache, profiling, services
+from .database import create_db_and_tables, is_database_locked
+from .metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, registry
+from .versions import DataState
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated item fields to return (e.g. id,title,status); "
+    "only these columns are read"
+)
+SORT_DESCRIPTION = (
+    "Order of the items: id (default) or a study total; prefix with - "
+    "for descending, e.g. -total_seconds"
+)
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Request metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/", include_in_schema=False)
+def root() -> RedirectResponse:
+    return RedirectResponse(url="/docs")
+
+
+def database_locked(request: Request, exc: Exception) -> Response:
+    # a writer that waited out busy_timeout: tell the client to retry
+    if not isinstance(exc, OperationalError) or not is_database_locked(exc):
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "database is locked"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def install(app: FastAPI) -> None:
+    """Middleware, error handling, startup and the routes above.
+
+    Must run before the app's own routes are declared (see ``profiling``).
+    """
+    app.add_middleware(MetricsMiddleware)
+    profiling.install(app)
+    app.add_exception_handler(OperationalError, database_locked)
+    app.add_event_handler("startup", create_db_and_tables)
+    app.include_router(router)
+
+
+# ---------- Handler helpers ----------
+
+def parse_fields(
+    raw: Optional[str], allowed: Sequence[str]
+) -> Optional[Tuple[str, ...]]:
+    """``services.parse_fields``, with unknown fields answered by a 400."""
+    try:
+        return services.parse_fields(raw, allowed)
+    except services.InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+
+# Conditional GET: the version is read before the data, so a cached body
+# is never older than the ETag it is stored under.
+
+def conditional(
+    request: Request,
+    cache: http_cache.ResponseCache,
+    state: DataState,
+    build: Callable[[], Any],
+) -> Response:
+    """Serve a read endpoint through ETag checks and the response cache."""
+    cached = http_cache.lookup(request, cache, state)
+    if cached is not None:
+        return cached
+    return http_cache.render(request, cache, state, build())
+
+
+async def conditional_async(
+    request: Request,
+    cache: http_cache.ResponseCache,
+    state: DataState,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """``conditional`` for an async ``build``."""
+    cached = http_cache.lookup(request, cache, state)
+    if cached is not None:
+        return cached
+    return http_cache.render(request, cache, state, await build())
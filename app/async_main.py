@@ -0,0 +1,224 @@
+"""
+Async variant of the API, backed by aiosqlite:
+
+    uvicorn app.async_main:app
+
+Serves the core resource, session and stats endpoints with ``async def``
+handlers so requests wait on the event loop rather than holding a
+threadpool worker each. Bulk upload (``POST /sessions/bulk``), bulk
+progress updates (``PATCH /resources/bulk``), ``/search``, ``/changes`` and
+the exports stay on ``app.main``.
+"""
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import api_common, http_cache, versions
+from . import async_services as services
+from .api_common import FIELDS_DESCRIPTION, SORT_DESCRIPTION
+from .database import get_async_session
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from .schemas import (
+    Resource,
+    ResourceCreate,
+    ResourcePage,
+    ResourceSort,
+    ResourceStatus,
+    ResourceType,
+    ResourceUpdate,
+    StudySession,
+    StudySessionBase,
+    StudySessionPage,
+    Timeseries,
+    TimeseriesBucket,
+)
+from .services import (
+    RESOURCE_FIELDS,
+    STUDY_SESSION_FIELDS,
+    InvalidStudySession,
+    resource_fields,
+)
+
+app = FastAPI(title="Learning Progress Tracker (async)")
+
+# must precede the route declarations
+api_common.install(app)
+
+response_cache = http_cache.ResponseCache()
+
+
+async def _conditional(
+    request: Request,
+    session: AsyncSession,
+    scopes: Sequence[str],
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    state = await services.data_state(session, scopes)
+    return await api_common.conditional_async(request, response_cache, state, build)
+
+
+@app.post("/resources", response_model=Resource)
+async def create_resource(
+    payload: ResourceCreate,
+    session: AsyncSession = Depends(get_async_session),
+) -> Resource:
+    return await services.create_resource(payload, session)
+
+
+@app.get("/resources", response_model=ResourcePage)
+async def list_resources(
+    request: Request,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    sort: ResourceSort = Query(ResourceSort.id, description=SORT_DESCRIPTION),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    selected = api_common.parse_fields(fields, RESOURCE_FIELDS)
+    try:
+        return await _conditional(
+            request,
+            session,
+            [versions.RESOURCES],
+            lambda: services.list_resources_page_rows(
+                session=session,
+                limit=limit,
+                cursor=cursor,
+                status=status,
+                resource_type=resource_type,
+                tag=tag,
+                skill=skill,
+                fields=selected,
+                sort=sort,
+            ),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+@app.get("/resources/{resource_id}", response_model=Resource)
+async def get_resource(
+    request: Request,
+    resource_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    selected = api_common.parse_fields(fields, RESOURCE_FIELDS)
+
+    async def build() -> Any:
+        # the row comes from the resource cache; fields only narrow the body
+        res = await services.get_resource_by_id(resource_id, session)
+        if not res:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        return resource_fields(res, selected)
+
+    return await _conditional(request, session, [versions.RESOURCES], build)
+
+
+@app.patch("/resources/{resource_id}", response_model=Resource)
+async def update_resource(
+    resource_id: int,
+    payload: ResourceUpdate,
+    session: AsyncSession = Depends(get_async_session),
+) -> Resource:
+    updated = await services.update_resource(resource_id, payload, session)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return updated
+
+
+@app.post("/sessions", response_model=StudySession)
+async def create_session(
+    payload: StudySessionBase,
+    session: AsyncSession = Depends(get_async_session),
+) -> StudySession:
+    try:
+        created = await services.create_study_session(payload, session)
+    except InvalidStudySession as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    if not created:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return created
+
+
+@app.get("/sessions", response_model=StudySessionPage)
+async def list_sessions(
+    request: Request,
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    selected = api_common.parse_fields(fields, STUDY_SESSION_FIELDS)
+    try:
+        return await _conditional(
+            request,
+            session,
+            [versions.SESSIONS],
+            lambda: services.list_study_sessions_page_rows(
+                session,
+                limit=limit,
+                cursor=cursor,
+                resource_id=resource_id,
+                started_from=started_from,
+                started_to=started_to,
+                fields=selected,
+            ),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+@app.get("/cache/resources")
+async def get_resource_cache_stats(
+    session: AsyncSession = Depends(get_async_session),
+) -> Dict[str, float]:
+    """Hit / miss / eviction counters of the resource cache."""
+    return await services.resource_cache_stats(session)
+
+
+@app.get("/stats/overview")
+async def get_overview(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    return await _conditional(
+        request,
+        session,
+        [versions.RESOURCES, versions.SESSIONS],
+        lambda: services.compute_overview_stats(session),
+    )
+
+
+@app.get("/stats/timeseries", response_model=Timeseries)
+async def get_timeseries(
+    request: Request,
+    bucket: TimeseriesBucket = TimeseriesBucket.day,
+    day_from: Optional[date] = Query(None, alias="from"),
+    day_to: Optional[date] = Query(None, alias="to"),
+    skill: Optional[str] = None,
+    resource_type: Optional[ResourceType] = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    return await _conditional(
+        request,
+        session,
+        [versions.SESSIONS],
+        lambda: services.compute_timeseries(
+            session,
+            bucket=bucket,
+            day_from=day_from,
+            day_to=day_to,
+            skill=skill,
+            resource_type=resource_type,
+        ),
+    )
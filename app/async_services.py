@@ -0,0 +1,152 @@
+"""
+Async façade over ``services`` for the async app (``app.async_main``).
+
+Each function runs the sync implementation through ``AsyncSession.run_sync``:
+SQLAlchemy drives it inside a greenlet on the event loop and awaits the
+aiosqlite driver for I/O, so no threadpool worker is held per request and
+the business rules live in one place.
+"""
+
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Sequence, TypeVar, cast
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import services, versions
+from .schemas import (
+    Resource,
+    ResourceCreate,
+    ResourceSort,
+    ResourceStatus,
+    ResourceType,
+    ResourceUpdate,
+    StudySession,
+    StudySessionBase,
+    Timeseries,
+    TimeseriesBucket,
+)
+
+T = TypeVar("T")
+
+
+async def _run(session: AsyncSession, fn: Callable[[Session], T]) -> T:
+    # run_sync hands over the AsyncSession's sync_session_class, which for
+    # sqlmodel's AsyncSession is sqlmodel's Session
+    return await session.run_sync(lambda sync: fn(cast(Session, sync)))
+
+
+async def create_resource(
+    payload: ResourceCreate,
+    session: AsyncSession,
+) -> Resource:
+    return await _run(session, lambda s: services.create_resource(payload, s))
+
+
+async def list_resources_page_rows(
+    session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: ResourceSort = ResourceSort.id,
+) -> Dict[str, Any]:
+    return await _run(
+        session,
+        lambda s: services.list_resources_page_rows(
+            s,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            resource_type=resource_type,
+            tag=tag,
+            skill=skill,
+            fields=fields,
+            sort=sort,
+        ),
+    )
+
+
+async def get_resource_by_id(
+    resource_id: int,
+    session: AsyncSession,
+) -> Optional[Resource]:
+    return await _run(session, lambda s: services.get_resource_by_id(resource_id, s))
+
+
+async def update_resource(
+    resource_id: int,
+    payload: ResourceUpdate,
+    session: AsyncSession,
+) -> Optional[Resource]:
+    return await _run(
+        session, lambda s: services.update_resource(resource_id, payload, s)
+    )
+
+
+async def create_study_session(
+    payload: StudySessionBase,
+    session: AsyncSession,
+) -> Optional[StudySession]:
+    return await _run(session, lambda s: services.create_study_session(payload, s))
+
+
+async def list_study_sessions_page_rows(
+    session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    return await _run(
+        session,
+        lambda s: services.list_study_sessions_page_rows(
+            s,
+            limit=limit,
+            cursor=cursor,
+            resource_id=resource_id,
+            started_from=started_from,
+            started_to=started_to,
+            fields=fields,
+        ),
+    )
+
+
+async def data_state(
+    session: AsyncSession, scopes: Sequence[str]
+) -> versions.DataState:
+    return await _run(session, lambda s: services.data_state(s, scopes))
+
+
+async def resource_cache_stats(session: AsyncSession) -> Dict[str, float]:
+    return await _run(session, services.resource_cache_stats)
+
+
+async def compute_overview_stats(session: AsyncSession) -> Dict[str, Any]:
+    return await _run(session, services.compute_overview_stats)
+
+
+async def compute_timeseries(
+    session: AsyncSession,
+    bucket: TimeseriesBucket = TimeseriesBucket.day,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    skill: Optional[str] = None,
+    resource_type: Optional[ResourceType] = None,
+) -> Timeseries:
+    return await _run(
+        session,
+        lambda s: services.compute_timeseries(
+            s,
+            bucket=bucket,
+            day_from=day_from,
+            day_to=day_to,
+            skill=skill,
+            resource_type=resource_type,
+        ),
+    )
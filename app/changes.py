@@ -0,0 +1,162 @@
+"""
+Change log behind ``GET /changes`` (incremental sync for client copies).
+
+Every write path in ``services`` appends one ``change_log`` row per entity
+it created or changed, in the same transaction as the change. A session
+write also logs its resource, whose study totals moved. ``seq`` is an
+AUTOINCREMENT key, and SQLite has one writer at a time, so entries commit
+in ``seq`` order and a client that remembers the last ``seq`` it applied
+can ask for everything after it.
+
+Entries are upserts: the feed returns the entity's current state next to
+them, so a client never needs the intermediate ones. That is what lets
+``compact`` (``python -m app.cli compact-changes``, meant for cron) bound
+the log:
+
+- an entry superseded by a later one for the same entity is deleted;
+- entries older than ``CHANGE_LOG_RETENTION_DAYS`` are deleted and the
+  highest deleted ``seq`` becomes the ``pruned_through`` watermark.
+  Clients behind it have missed entries and must resync from the full
+  listings (``ChangesPruned``, 410 over HTTP).
+
+So the log holds at most one entry per entity, and only for entities
+changed within the retention window.
+"""
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, select
+
+from . import versions
+from .models import ChangeLogDB, ChangeLogStateDB
+from .schemas import ChangeEntity, ChangeOp
+
+PRUNED_THROUGH = "pruned_through"
+
+
+@dataclass(frozen=True)
+class ChangeLogSettings:
+    retention_days: float = 30.0
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "ChangeLogSettings":
+        return cls(
+            retention_days=float(
+                env.get("CHANGE_LOG_RETENTION_DAYS") or cls.retention_days
+            ),
+        )
+
+
+settings = ChangeLogSettings.from_env()
+
+
+class ChangesPruned(Exception):
+    """Raised when entries after ``since`` have been compacted away."""
+
+    def __init__(self, since: int, pruned_through: int) -> None:
+        super().__init__(
+            f"changes up to seq {pruned_through} were compacted; resync "
+            f"from the full listings, then continue from since={pruned_through}"
+        )
+        self.since = since
+        self.pruned_through = pruned_through
+
+
+@dataclass(frozen=True)
+class Compaction:
+    superseded: int  # entries dropped for a later one of the same entity
+    expired: int  # entries dropped for age
+    pruned_through: int
+
+
+def _utcnow() -> datetime:
+    # naive UTC, as in versions
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ---------- Write-path hook ----------
+
+def record(
+    session: Session, entity: ChangeEntity, ids: Iterable[int], op: ChangeOp
+) -> None:
+    now = _utcnow()
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+        for entity_id in dict.fromkeys(ids)
+    ]
+    if rows:
+        session.exec(insert(ChangeLogDB), params=rows)
+
+
+# ---------- Reads ----------
+
+def pruned_through(session: Session) -> int:
+    seq = session.exec(
+        select(ChangeLogStateDB.seq).where(ChangeLogStateDB.name == PRUNED_THROUGH)
+    ).first()
+    return seq or 0
+
+
+def read(
+    session: Session, since: int, limit: int
+) -> Tuple[List[ChangeLogDB], bool]:
+    """Up to ``limit`` entries after ``since``, oldest first, and whether
+    more follow. Raises ChangesPruned."""
+    watermark = pruned_through(session)
+    if since < watermark:
+        raise ChangesPruned(since, watermark)
+    entries = list(
+        session.exec(
+            select(ChangeLogDB)
+            .where(col(ChangeLogDB.seq) > since)
+            .order_by(col(ChangeLogDB.seq))
+            .limit(limit + 1)
+        )
+    )
+    return entries[:limit], len(entries) > limit
+
+
+# ---------- Maintenance ----------
+
+def compact(
+    session: Session,
+    retention_days: float = settings.retention_days,
+    now: Optional[datetime] = None,
+) -> Compaction:
+    """Drop superseded and expired entries. Does not commit."""
+    latest = (
+        select(func.max(ChangeLogDB.seq))
+        .group_by(col(ChangeLogDB.entity), col(ChangeLogDB.entity_id))
+    )
+    superseded = session.exec(
+        delete(ChangeLogDB).where(col(ChangeLogDB.seq).not_in(latest))
+    ).rowcount
+
+    cutoff = (now or _utcnow()) - timedelta(days=retention_days)
+    watermark = pruned_through(session)
+    newest_expired = session.exec(
+        select(func.max(ChangeLogDB.seq)).where(
+            col(ChangeLogDB.changed_at) < cutoff
+        )
+    ).one()
+    expired = 0
+    if newest_expired is not None and newest_expired > watermark:
+        watermark = newest_expired
+        expired = session.exec(
+            delete(ChangeLogDB).where(col(ChangeLogDB.seq) <= watermark)
+        ).rowcount
+        session.exec(
+            sqlite_insert(ChangeLogStateDB)
+            .values(name=PRUNED_THROUGH, seq=watermark)
+            .on_conflict_do_update(index_elements=["name"], set_={"seq": watermark})
+        )
+
+    if superseded or expired:
+        # cached /changes responses may list deleted entries
+        versions.bump(session, versions.RESOURCES, versions.SESSIONS)
+    return Compaction(superseded, expired, watermark)
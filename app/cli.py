@@ -0,0 +1,109 @@
+"""
+Maintenance commands, run against the configured database:
+
+    python -m app.cli check-aggregates
+    python -m app.cli rebuild-aggregates
+    python -m app.cli check-rollups
+    python -m app.cli rebuild-rollups
+    python -m app.cli check-study-totals
+    python -m app.cli rebuild-study-totals
+    python -m app.cli rebuild-search
+    python -m app.cli compact-changes
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, Optional
+
+from sqlmodel import Session
+
+from . import aggregates, changes, rollups, search, study_totals
+from .database import create_db_and_tables, engine
+
+
+def check_aggregates(session: Session) -> int:
+    problems = aggregates.check(session)
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} aggregate row(s) out of sync")
+    return 1 if problems else 0
+
+
+def rebuild_aggregates(session: Session) -> int:
+    aggregates.rebuild(session)
+    session.commit()
+    print("overview aggregates rebuilt")
+    return 0
+
+
+def check_rollups(session: Session) -> int:
+    problems = rollups.check(session)
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} rollup row(s) out of sync")
+    return 1 if problems else 0
+
+
+def rebuild_rollups(session: Session) -> int:
+    rollups.rebuild(session)
+    session.commit()
+    print("study rollups rebuilt")
+    return 0
+
+
+def check_study_totals(session: Session) -> int:
+    problems = study_totals.check(session)
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} resource(s) with study totals out of sync")
+    return 1 if problems else 0
+
+
+def rebuild_study_totals(session: Session) -> int:
+    study_totals.rebuild(session)
+    session.commit()
+    print("study totals rebuilt")
+    return 0
+
+
+def rebuild_search(session: Session) -> int:
+    search.rebuild(session)
+    session.commit()
+    print("search index rebuilt")
+    return 0
+
+
+def compact_changes(session: Session) -> int:
+    result = changes.compact(session)
+    session.commit()
+    print(
+        f"change log compacted: {result.superseded} superseded and "
+        f"{result.expired} expired entries removed, "
+        f"pruned through seq {result.pruned_through}"
+    )
+    return 0
+
+
+COMMANDS: Dict[str, Callable[[Session], int]] = {
+    "check-aggregates": check_aggregates,
+    "rebuild-aggregates": rebuild_aggregates,
+    "check-rollups": check_rollups,
+    "rebuild-rollups": rebuild_rollups,
+    "check-study-totals": check_study_totals,
+    "rebuild-study-totals": rebuild_study_totals,
+    "rebuild-search": rebuild_search,
+    "compact-changes": compact_changes,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        return COMMANDS[args.command](session)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
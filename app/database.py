@@ -1,7 +1,17 @@
-from collections.abc import Iterator
+import os
+from collections.abc import AsyncIterator, Iterator, Mapping
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Optional
 
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .metrics import instrument_engine
 
 # Base directory of the project (one level up from app/)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -10,18 +20,153 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-DATABASE_URL = f"sqlite:///{DATA_DIR / 'learning.db'}"
+DEFAULT_DATABASE_URL = f"sqlite:///{DATA_DIR / 'learning.db'}"
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """Engine + SQLite connection settings; ``None`` leaves SQLite's default."""
+
+    url: str = DEFAULT_DATABASE_URL
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    busy_timeout_ms: int = 5000
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None  # pages, or KiB when negative
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "EngineSettings":
+        """Start from the ``DB_PROFILE`` profile, then apply per-setting overrides."""
+        profile = env.get("DB_PROFILE", "default")
+        try:
+            settings = PROFILES[profile]
+        except KeyError:
+            raise ValueError(
+                f"DB_PROFILE must be one of {sorted(PROFILES)}, got {profile!r}"
+            ) from None
+
+        overrides: Dict[str, Any] = {}
+        for var, (field, cast) in ENV_VARS.items():
+            if env.get(var):
+                overrides[field] = cast(env[var])
+        return replace(settings, **overrides)
+
+    @property
+    def async_url(self) -> str:
+        return self.url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+
+PROFILES: Dict[str, EngineSettings] = {
+    # SQLite / SQLAlchemy defaults: rollback journal, synchronous=FULL
+    "default": EngineSettings(),
+    # WAL lets readers run alongside the single writer; NORMAL only fsyncs
+    # at checkpoints, which is still durable against application crashes
+    "tuned": EngineSettings(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        busy_timeout_ms=10000,
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,
+        pool_size=20,
+        max_overflow=20,
+    ),
+}
+
+ENV_VARS: Dict[str, tuple[str, Any]] = {
+    "DATABASE_URL": ("url", str),
+    "SQLITE_JOURNAL_MODE": ("journal_mode", str),
+    "SQLITE_SYNCHRONOUS": ("synchronous", str),
+    "SQLITE_BUSY_TIMEOUT_MS": ("busy_timeout_ms", int),
+    "SQLITE_MMAP_SIZE": ("mmap_size", int),
+    "SQLITE_CACHE_SIZE": ("cache_size", int),
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+}
+
+
+def _pragmas(settings: EngineSettings) -> list[str]:
+    pragmas = [f"busy_timeout = {settings.busy_timeout_ms}"]
+    if settings.journal_mode:
+        pragmas.append(f"journal_mode = {settings.journal_mode}")
+    if settings.synchronous:
+        pragmas.append(f"synchronous = {settings.synchronous}")
+    if settings.mmap_size is not None:
+        pragmas.append(f"mmap_size = {settings.mmap_size}")
+    if settings.cache_size is not None:
+        pragmas.append(f"cache_size = {settings.cache_size}")
+    return pragmas
+
+
+def _install_pragmas(engine: Engine, settings: EngineSettings) -> None:
+    pragmas = _pragmas(settings)
 
-engine = create_engine(DATABASE_URL, echo=False)
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+
+def _pool_kwargs(settings: EngineSettings) -> Dict[str, Any]:
+    # in-memory databases use a single-connection pool without these knobs
+    if settings.url in ("sqlite://", "sqlite:///:memory:"):
+        return {}
+    return {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+    }
+
+
+def build_engine(settings: EngineSettings) -> Engine:
+    engine = create_engine(settings.url, echo=False, **_pool_kwargs(settings))
+    _install_pragmas(engine, settings)
+    instrument_engine(engine)
+    return engine
+
+
+settings = EngineSettings.from_env()
+DATABASE_URL = settings.url
+
+engine = build_engine(settings)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Engine for the async app; created on first use so aiosqlite stays optional."""
+    async_engine = create_async_engine(
+        settings.async_url, echo=False, **_pool_kwargs(settings)
+    )
+    _install_pragmas(async_engine.sync_engine, settings)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def is_database_locked(exc: OperationalError) -> bool:
+    """True when SQLite gave up waiting for a lock (after ``busy_timeout``)."""
+    return "database is locked" in str(exc.orig)
 
 
 def create_db_and_tables() -> None:
     from . import models  # noqa: F401
+    from .migrations import run_migrations
 
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 def get_session() -> Iterator[Session]:
     """FastAPI dependency that yields a DB session."""
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that yields an async DB session (aiosqlite)."""
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,170 @@
+"""
+Streaming exports of resources and study sessions as NDJSON or CSV.
+
+Rows are read in keyset-paged batches of ``EXPORT_BATCH_SIZE`` and encoded
+one batch at a time, so memory stays flat regardless of how many rows are
+exported. Each batch is read in its own short transaction that ends before
+the batch is sent: a slow client never holds SQLite's shared lock (which,
+outside WAL mode, blocks every writer) while the body is downloading. The
+export is therefore not one snapshot; rows written meanwhile may or may not
+appear, but no row is repeated or skipped.
+"""
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import Engine, tuple_
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, col, select
+
+from . import services
+from .models import ResourceDB, StudySessionDB
+from .schemas import ExportFormat, ResourceStatus
+
+EXPORT_BATCH_SIZE = 1000
+
+RESOURCE_FIELDS = [
+    "id",
+    "title",
+    "resource_type",
+    "provider",
+    "url",
+    "total_units",
+    "completed_units",
+    "progress_percent",
+    "status",
+    "tags",
+    "target_skills",
+    "total_seconds",
+    "session_count",
+    "first_studied_at",
+    "last_studied_at",
+]
+SESSION_FIELDS = [
+    "id",
+    "resource_id",
+    "started_at",
+    "ended_at",
+    "duration_seconds",
+    "notes",
+]
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _columns(model: Any, fields: List[str]) -> List[Any]:
+    return [col(getattr(model, name)) for name in fields]
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    value = _plain(value)
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+def _encode_batch(
+    fmt: ExportFormat, names: List[str], rows: Sequence[Any]
+) -> bytes:
+    if fmt == ExportFormat.ndjson:
+        return "".join(
+            json.dumps(dict(zip(names, map(_plain, row), strict=True))) + "\n"
+            for row in rows
+        ).encode()
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows([_csv_cell(v) for v in row] for row in rows)
+    return buf.getvalue().encode()
+
+
+def _stream(
+    bind: Engine | Connection,
+    page: Callable[[Optional[Any]], Any],
+    key_of: Callable[[Any], Any],
+    names: List[str],
+    fmt: ExportFormat,
+) -> Iterator[bytes]:
+    """Encoded batches of ``page(after)``, a LIMITed select ordered by the
+    keyset ``key_of(row)``; ``after`` is the key of the previous batch's last
+    row (None for the first)."""
+    if fmt == ExportFormat.csv:
+        buf = io.StringIO()
+        csv.writer(buf).writerow(names)
+        yield buf.getvalue().encode()
+
+    # the request's session is closed before a streaming body is sent, so
+    # each batch gets its own session, closed before the batch is yielded
+    after = None
+    while True:
+        with Session(bind) as session:
+            batch = session.exec(page(after).limit(EXPORT_BATCH_SIZE)).all()
+        if not batch:
+            return
+        yield _encode_batch(fmt, names, batch)
+        if len(batch) < EXPORT_BATCH_SIZE:
+            return
+        after = key_of(batch[-1])
+
+
+def stream_resources(
+    bind: Engine | Connection,
+    fmt: ExportFormat,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
+) -> Iterator[bytes]:
+    stmt, order_col = services.filter_resources(
+        select(*_columns(ResourceDB, RESOURCE_FIELDS)),
+        status,
+        resource_type,
+        tag,
+        skill,
+    )
+
+    def page(after: Optional[int]) -> Any:
+        paged = stmt if after is None else stmt.where(order_col > after)
+        return paged.order_by(order_col)
+
+    # order_col is the resource id, which is RESOURCE_FIELDS[0]
+    return _stream(bind, page, lambda row: row[0], RESOURCE_FIELDS, fmt)
+
+
+def stream_study_sessions(
+    bind: Engine | Connection,
+    fmt: ExportFormat,
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+) -> Iterator[bytes]:
+    stmt = services.filter_study_sessions(
+        select(*_columns(StudySessionDB, SESSION_FIELDS)),
+        resource_id,
+        started_from,
+        started_to,
+    )
+    started_at, session_id = col(StudySessionDB.started_at), col(StudySessionDB.id)
+
+    def page(after: Optional[Any]) -> Any:
+        paged = stmt
+        if after is not None:
+            paged = stmt.where(tuple_(started_at, session_id) > after)
+        return paged.order_by(started_at, session_id)
+
+    key = SESSION_FIELDS.index("started_at")
+    return _stream(bind, page, lambda row: (row[key], row[0]), SESSION_FIELDS, fmt)
@@ -0,0 +1,198 @@
+"""
+Optional group commit for single-item writes.
+
+On SQLite every commit is a serialized fsync, so concurrent
+``POST /sessions`` / ``PATCH /resources/{id}`` requests queue behind one
+another's commits. With ``WRITE_GROUP_COMMIT=1`` those endpoints hand their
+writes to one writer thread per engine instead. The thread runs up to
+``WRITE_GROUP_MAX_BATCH`` queued jobs in one transaction and commits once,
+so throughput grows with the batch size rather than the fsync rate. By
+default a batch is whatever queued up while the previous one committed;
+``WRITE_GROUP_DELAY_MS`` makes the thread wait that long after the first
+job for more, which pays off when fsync is slow.
+
+A job is a function of the writer's ``Session`` that must not commit (see
+``services.add_study_session`` / ``services.apply_resource_update``). Each
+caller's future resolves with its own job's result once the batch is
+committed. A job that raises gets its exception; the batch is rolled back
+and the other jobs are run again without it. A failed commit fails every
+job in the batch.
+
+Only ``app.main`` uses it; the writer thread runs sync sessions.
+"""
+import os
+import queue
+import threading
+import time
+import weakref
+from collections.abc import Mapping
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from . import resource_cache
+from .metrics import registry
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class GroupCommitSettings:
+    enabled: bool = False
+    max_batch: int = 64
+    max_delay_ms: float = 0.0
+
+    @classmethod
+    def from_env(
+        cls, env: Mapping[str, str] = os.environ
+    ) -> "GroupCommitSettings":
+        return cls(
+            enabled=env.get("WRITE_GROUP_COMMIT", "").lower() in ("1", "true", "yes"),
+            max_batch=int(env.get("WRITE_GROUP_MAX_BATCH") or cls.max_batch),
+            max_delay_ms=float(env.get("WRITE_GROUP_DELAY_MS") or cls.max_delay_ms),
+        )
+
+
+settings = GroupCommitSettings.from_env()
+
+
+@dataclass
+class _Job:
+    work: Callable[[Session], Any]
+    future: "Future[Any]"
+
+
+class GroupCommitter:
+    """One writer thread that commits queued jobs in batches."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch: int = GroupCommitSettings.max_batch,
+        max_delay_ms: float = GroupCommitSettings.max_delay_ms,
+    ) -> None:
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self.batches = 0
+        self.jobs = 0
+        self._thread = threading.Thread(
+            target=self._run, name="group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, work: Callable[[Session], T]) -> "Future[T]":
+        future: "Future[T]" = Future()
+        self._queue.put(_Job(work, future))
+        return future
+
+    def run(self, work: Callable[[Session], T]) -> T:
+        """``submit`` and wait for the batch holding ``work`` to commit."""
+        return self.submit(work).result()
+
+    def close(self) -> None:
+        """Finish the queued jobs, then stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "mean_batch": self.jobs / self.batches if self.batches else 0.0,
+        }
+
+    # ---------- Writer thread ----------
+
+    def _collect(self) -> Tuple[List[_Job], bool]:
+        """Block for a job, then add queued ones (waiting up to ``max_delay``)."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        jobs = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(jobs) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                # past the deadline, still take whatever is already queued
+                job = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if job is None:  # close() was called
+                return jobs, True
+            jobs.append(job)
+        return jobs, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            jobs, stop = self._collect()
+            pending = [j for j in jobs if j.future.set_running_or_notify_cancel()]
+            try:
+                self._commit(pending)
+            except Exception as exc:
+                # keep the writer alive and never leave a caller waiting
+                for job in pending:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+
+    def _commit(self, pending: List[_Job]) -> None:
+        while pending:
+            with Session(self.engine) as session:
+                results: List[Any] = []
+                failed: Optional[Tuple[_Job, BaseException]] = None
+                for job in pending:
+                    try:
+                        results.append(job.work(session))
+                    except Exception as exc:
+                        failed = (job, exc)
+                        break
+                if failed is None:
+                    try:
+                        session.commit()
+                    except Exception as exc:
+                        _discard(session)
+                        for job in pending:
+                            job.future.set_exception(exc)
+                        return
+                    self.batches += 1
+                    self.jobs += len(pending)
+                    registry.observe("db_group_commit_batch_size", {}, len(pending))
+                    for job, result in zip(pending, results, strict=True):
+                        job.future.set_result(result)
+                    return
+                _discard(session)
+            failed_job, error = failed
+            failed_job.future.set_exception(error)
+            pending = [j for j in pending if j is not failed_job]
+
+
+def _discard(session: Session) -> None:
+    session.rollback()
+    # jobs may have cached rows read under the batch's uncommitted version
+    resource_cache.cache_for(session).clear()
+
+
+_committers: "weakref.WeakKeyDictionary[Engine, GroupCommitter]" = (
+    weakref.WeakKeyDictionary()
+)
+_committers_lock = threading.Lock()
+
+
+def committer_for(session: Session) -> GroupCommitter:
+    engine = session.get_bind().engine
+    with _committers_lock:
+        committer = _committers.get(engine)
+        if committer is None:
+            committer = _committers[engine] = GroupCommitter(
+                engine, settings.max_batch, settings.max_delay_ms
+            )
+        return committer
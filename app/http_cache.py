@@ -0,0 +1,132 @@
+"""
+Conditional GET and an in-process response cache for read endpoints.
+
+Every response carries the ``ETag`` / ``Last-Modified`` of the data
+versions it was built from (see ``versions``). A request whose
+``If-None-Match`` (or ``If-Modified-Since``) still matches gets a 304
+without running the endpoint. Otherwise the JSON body is served from a
+small LRU cache keyed by (path, query string, ETag), so repeated polls of
+unchanged data skip both the queries and the serialization. Entries for
+old versions are never hit again and fall out of the LRU.
+
+Bodies are encoded with orjson. The list endpoints hand over plain dicts
+of column values, which orjson serializes natively; anything it does not
+know (pydantic models, ...) goes through ``jsonable_encoder``.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .versions import DataState
+
+DEFAULT_MAX_ENTRIES = 256
+
+CacheKey = Tuple[str, str, str]
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded JSON bodies."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: CacheKey, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _headers(state: DataState) -> Dict[str, str]:
+    headers = {"ETag": state.etag, "Cache-Control": "no-cache"}
+    if state.last_modified is not None:
+        headers["Last-Modified"] = _http_date(state.last_modified)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # weak comparison (RFC 9110 13.1.2)
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return modified <= since
+
+
+def _key(request: Request, state: DataState) -> CacheKey:
+    return (request.url.path, str(request.query_params), state.etag)
+
+
+def lookup(
+    request: Request, cache: ResponseCache, state: DataState
+) -> Optional[Response]:
+    """A 304 or a cached response for ``request``, or None to run the endpoint."""
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    # If-Modified-Since is ignored when If-None-Match is present
+    if (
+        if_none_match is not None and _etag_matches(if_none_match, state.etag)
+    ) or (
+        if_none_match is None
+        and if_modified_since is not None
+        and _not_modified_since(if_modified_since, state.last_modified)
+    ):
+        return Response(status_code=304, headers=_headers(state))
+
+    body = cache.get(_key(request, state))
+    if body is None:
+        return None
+    return Response(body, media_type="application/json", headers=_headers(state))
+
+
+def encode(content: Any) -> bytes:
+    return orjson.dumps(
+        content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+def render(
+    request: Request, cache: ResponseCache, state: DataState, content: Any
+) -> Response:
+    """Encode ``content`` as JSON, cache the body and attach validators."""
+    body = encode(content)
+    cache.put(_key(request, state), body)
+    return Response(body, media_type="application/json", headers=_headers(state))
@@ -1,31 +1,77 @@
-from typing import Any, Dict, List, Optional
+import json
+from datetime import date, datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from sqlmodel import Session
 
-from . import services
-from .database import create_db_and_tables, get_session
+from . import api_common, export, group_commit, http_cache, services, versions
+from .api_common import FIELDS_DESCRIPTION, SORT_DESCRIPTION
+from .database import get_session
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
 from .schemas import (
+    BulkItemError,
+    ChangeFeed,
+    ExportFormat,
     Resource,
+    ResourceBulkUpdate,
+    ResourceBulkUpdateResult,
     ResourceCreate,
+    ResourcePage,
+    ResourceSort,
     ResourceStatus,
+    ResourceType,
     ResourceUpdate,
+    SearchKind,
+    SearchPage,
     StudySession,
     StudySessionBase,
+    StudySessionBulkResult,
+    StudySessionPage,
+    Timeseries,
+    TimeseriesBucket,
 )
 
 app = FastAPI(title="Learning Progress Tracker")
 
+MAX_BULK_ITEMS = 10_000
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/jsonl"}
+BulkItem = TypeVar("BulkItem", bound=BaseModel)
+
+# must precede the route declarations
+api_common.install(app)
+
+response_cache = http_cache.ResponseCache()
+
 
-@app.on_event("startup")
-def on_startup() -> None:
-    create_db_and_tables()
+def _conditional(
+    request: Request,
+    session: Session,
+    scopes: Sequence[str],
+    build: Callable[[], Any],
+) -> Response:
+    state = services.data_state(session, scopes)
+    return api_common.conditional(request, response_cache, state, build)
 
 
-@app.get("/", include_in_schema=False)
-def root() -> RedirectResponse:
-    return RedirectResponse(url="/docs")
+def _openapi_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    # nested enums / models point at the app's shared component schemas
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return schema
 
 
 @app.post("/resources", response_model=Resource)
@@ -36,32 +82,92 @@ def create_resource(
     return services.create_resource(payload, session)
 
 
-@app.get("/resources", response_model=List[Resource])
+@app.get("/resources", response_model=ResourcePage)
 def list_resources(
+    request: Request,
     status: Optional[ResourceStatus] = None,
     resource_type: Optional[str] = None,
     tag: Optional[str] = None,
     skill: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    sort: ResourceSort = Query(ResourceSort.id, description=SORT_DESCRIPTION),
+    session: Session = Depends(get_session),
+) -> Response:
+    selected = api_common.parse_fields(fields, services.RESOURCE_FIELDS)
+    try:
+        return _conditional(
+            request,
+            session,
+            [versions.RESOURCES],
+            lambda: services.list_resources_page_rows(
+                session=session,
+                limit=limit,
+                cursor=cursor,
+                status=status,
+                resource_type=resource_type,
+                tag=tag,
+                skill=skill,
+                fields=selected,
+                sort=sort,
+            ),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+# declared before /resources/{resource_id} so "bulk" is not read as an id
+@app.patch(
+    "/resources/bulk",
+    response_model=ResourceBulkUpdateResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": _openapi_schema(ResourceBulkUpdate),
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def update_resources_bulk(
+    request: Request,
     session: Session = Depends(get_session),
-) -> List[Resource]:
-    return services.list_resources(
-        session=session,
-        status=status,
-        resource_type=resource_type,
-        tag=tag,
-        skill=skill,
+) -> ResourceBulkUpdateResult:
+    """Progress / status updates for many resources, committed together."""
+    items, errors = _parse_bulk(
+        await request.body(),
+        request.headers.get("content-type", ""),
+        ResourceBulkUpdate,
     )
+    result = await run_in_threadpool(services.update_resources_bulk, items, session)
+    result.errors = sorted(result.errors + errors, key=lambda e: e.index)
+    return result
 
 
 @app.get("/resources/{resource_id}", response_model=Resource)
 def get_resource(
+    request: Request,
     resource_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     session: Session = Depends(get_session),
-) -> Resource:
-    res = services.get_resource_by_id(resource_id, session)
-    if not res:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    return res
+) -> Response:
+    selected = api_common.parse_fields(fields, services.RESOURCE_FIELDS)
+
+    def build() -> Any:
+        # the row comes from the resource cache; fields only narrow the body
+        res = services.get_resource_by_id(resource_id, session)
+        if not res:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        return services.resource_fields(res, selected)
+
+    return _conditional(request, session, [versions.RESOURCES], build)
 
 
 @app.patch("/resources/{resource_id}", response_model=Resource)
@@ -70,7 +176,10 @@ def update_resource(
     payload: ResourceUpdate,
     session: Session = Depends(get_session),
 ) -> Resource:
-    updated = services.update_resource(resource_id, payload, session)
+    if group_commit.settings.enabled:
+        updated = services.update_resource_grouped(resource_id, payload, session)
+    else:
+        updated = services.update_resource(resource_id, payload, session)
     if not updated:
         raise HTTPException(status_code=404, detail="Resource not found")
     return updated
@@ -81,22 +190,266 @@ def create_session(
     payload: StudySessionBase,
     session: Session = Depends(get_session),
 ) -> StudySession:
-    created = services.create_study_session(payload, session)
+    try:
+        if group_commit.settings.enabled:
+            created = services.create_study_session_grouped(payload, session)
+        else:
+            created = services.create_study_session(payload, session)
+    except services.InvalidStudySession as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
     if not created:
         raise HTTPException(status_code=404, detail="Resource not found")
     return created
 
 
-@app.get("/sessions", response_model=List[StudySession])
+def _parse_bulk(
+    body: bytes, content_type: str, model: Type[BulkItem]
+) -> Tuple[List[Tuple[int, BulkItem]], List[BulkItemError]]:
+    """Decode a JSON array or NDJSON body into (index, payload) pairs."""
+    raw: List[Any] = []
+    errors: List[BulkItemError] = []
+
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        for index, line in enumerate(lines):
+            try:
+                raw.append(json.loads(line))
+            except ValueError:
+                raw.append(None)
+                errors.append(BulkItemError(index=index, detail="Invalid JSON"))
+    else:
+        try:
+            raw = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON") from None
+        if not isinstance(raw, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array")
+
+    if len(raw) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request"
+        )
+
+    items: List[Tuple[int, BulkItem]] = []
+    failed = {e.index for e in errors}
+    for index, obj in enumerate(raw):
+        if index in failed:
+            continue
+        try:
+            items.append((index, model.model_validate(obj)))
+        except ValidationError as exc:
+            errors.append(
+                BulkItemError(index=index, detail=exc.errors()[0]["msg"])
+            )
+    return items, errors
+
+
+@app.post(
+    "/sessions/bulk",
+    response_model=StudySessionBulkResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/StudySessionBase"},
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_sessions_bulk(
+    request: Request,
+    session: Session = Depends(get_session),
+) -> StudySessionBulkResult:
+    items, errors = _parse_bulk(
+        await request.body(), request.headers.get("content-type", ""), StudySessionBase
+    )
+    result = await run_in_threadpool(
+        services.create_study_sessions_bulk, items, session
+    )
+    result.errors = sorted(result.errors + errors, key=lambda e: e.index)
+    return result
+
+
+@app.get("/sessions", response_model=StudySessionPage)
 def list_sessions(
+    request: Request,
     resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    session: Session = Depends(get_session),
+) -> Response:
+    selected = api_common.parse_fields(fields, services.STUDY_SESSION_FIELDS)
+    try:
+        return _conditional(
+            request,
+            session,
+            [versions.SESSIONS],
+            lambda: services.list_study_sessions_page_rows(
+                session,
+                limit=limit,
+                cursor=cursor,
+                resource_id=resource_id,
+                started_from=started_from,
+                started_to=started_to,
+                fields=selected,
+            ),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+@app.get("/search", response_model=SearchPage)
+def search(
+    request: Request,
+    q: str = Query(..., description="Words to find, in any order"),
+    kind: Optional[SearchKind] = None,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[ResourceType] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     session: Session = Depends(get_session),
-) -> List[StudySession]:
-    return services.list_study_sessions(session, resource_id=resource_id)
+) -> Response:
+    """Resources by title / provider and sessions by notes, in two lists,
+    each best match first; ``limit`` applies to each list."""
+    try:
+        return _conditional(
+            request,
+            session,
+            [versions.RESOURCES, versions.SESSIONS],
+            lambda: services.search_page(
+                session,
+                q,
+                limit=limit,
+                cursor=cursor,
+                kind=kind,
+                status=status,
+                resource_type=resource_type,
+            ),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    except services.InvalidSearch as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+
+@app.get(
+    "/changes",
+    response_model=ChangeFeed,
+    responses={410: {"description": "since is behind the compacted log"}},
+)
+def list_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last seq the client applied"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session),
+) -> Response:
+    """Resources and sessions created or changed after ``since``."""
+    try:
+        return _conditional(
+            request,
+            session,
+            [versions.RESOURCES, versions.SESSIONS],
+            lambda: services.change_feed(session, since, limit),
+        )
+    except services.ChangesPruned as exc:
+        # resync from the listings, then continue from the watermark
+        return JSONResponse(
+            status_code=410,
+            content={"detail": str(exc), "since": exc.pruned_through},
+        )
+
+
+@app.get("/cache/resources")
+def get_resource_cache_stats(
+    session: Session = Depends(get_session),
+) -> Dict[str, float]:
+    """Hit / miss / eviction counters of the resource cache."""
+    return services.resource_cache_stats(session)
 
 
 @app.get("/stats/overview")
 def get_overview(
+    request: Request,
+    session: Session = Depends(get_session),
+) -> Response:
+    return _conditional(
+        request,
+        session,
+        [versions.RESOURCES, versions.SESSIONS],
+        lambda: services.compute_overview_stats(session),
+    )
+
+
+@app.get("/stats/timeseries", response_model=Timeseries)
+def get_timeseries(
+    request: Request,
+    bucket: TimeseriesBucket = TimeseriesBucket.day,
+    day_from: Optional[date] = Query(None, alias="from"),
+    day_to: Optional[date] = Query(None, alias="to"),
+    skill: Optional[str] = None,
+    resource_type: Optional[ResourceType] = None,
+    session: Session = Depends(get_session),
+) -> Response:
+    # resource type / skills never change after creation, so only new
+    # sessions can move the series
+    return _conditional(
+        request,
+        session,
+        [versions.SESSIONS],
+        lambda: services.compute_timeseries(
+            session,
+            bucket=bucket,
+            day_from=day_from,
+            day_to=day_to,
+            skill=skill,
+            resource_type=resource_type,
+        ),
+    )
+
+
+@app.get("/export/resources", response_class=StreamingResponse)
+def export_resources(
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
     session: Session = Depends(get_session),
-) -> Dict[str, Any]:
-    return services.compute_overview_stats(session)
+) -> StreamingResponse:
+    return StreamingResponse(
+        export.stream_resources(
+            session.get_bind(), fmt, status, resource_type, tag, skill
+        ),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="resources.{fmt.value}"'
+        },
+    )
+
+
+@app.get("/export/sessions", response_class=StreamingResponse)
+def export_sessions(
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    session: Session = Depends(get_session),
+) -> StreamingResponse:
+    return StreamingResponse(
+        export.stream_study_sessions(
+            session.get_bind(), fmt, resource_id, started_from, started_to
+        ),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="sessions.{fmt.value}"'
+        },
+    )
@@ -0,0 +1,254 @@
+"""
+Per-request metrics: route latency, SQL query counts and SQL time.
+
+``MetricsMiddleware`` is plain ASGI. It opens a ``RequestStats`` in a
+context variable for each HTTP request. ``instrument_engine`` hooks the
+engine's cursor events and adds every query run while the request is in
+flight to it. The context follows the request into threadpool workers
+and ``AsyncSession.run_sync`` greenlets. On completion the middleware records:
+
+- ``http_requests_total{method,route,status}``
+- ``http_request_duration_seconds{method,route}`` (histogram)
+- ``http_request_db_queries{method,route}`` (histogram of queries per request)
+- ``http_request_db_seconds{method,route}`` (histogram of SQL time per request)
+
+``db_group_commit_batch_size`` is filled by ``group_commit`` when enabled.
+
+``GET /metrics`` serves them in the Prometheus text format. With
+``METRICS_SERVER_TIMING=1`` every response also carries a ``Server-Timing``
+header (``app`` and ``db`` durations, plus the query count).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    sql_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# ---------- Registry ----------
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last: +Inf only
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Registry:
+    """Counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+
+    def counter(self, name: str, help: str) -> None:
+        self._help[name] = ("counter", help)
+        self._counters[name] = {}
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float]) -> None:
+        self._help[name] = ("histogram", help)
+        self._histograms[name] = {}
+        self._buckets[name] = buckets
+
+    def inc(self, name: str, labels: Dict[str, str], amount: float = 1.0) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self._buckets[name])
+            hist.observe(value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help) in self._help.items():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for key, value in sorted(self._counters[name].items()):
+                        lines.append(f"{name}{_labels(key)} {_num(value)}")
+                    continue
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts, strict=False):
+                        cumulative += count
+                        le = (("le", _num(bound)),)
+                        lines.append(f"{name}_bucket{_labels(key + le)} {cumulative}")
+                    cumulative += hist.counts[-1]
+                    inf = (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_labels(key + inf)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {_num(hist.total)}")
+                    lines.append(f"{name}_count{_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+registry = Registry()
+registry.counter("http_requests_total", "HTTP requests by route and status.")
+registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", LATENCY_BUCKETS
+)
+registry.histogram(
+    "http_request_db_queries", "SQL queries run per HTTP request.", QUERY_BUCKETS
+)
+registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request.", LATENCY_BUCKETS
+)
+registry.histogram(
+    "db_group_commit_batch_size", "Writes per group commit.", QUERY_BUCKETS
+)
+
+
+# ---------- SQL hooks ----------
+
+def instrument_engine(engine: Engine) -> None:
+    """Count queries and SQL time into the current request's stats.
+
+    Failed statements count too: a write that waited out busy_timeout
+    spent that time in SQLite.
+    """
+
+    def _finish(conn: Any) -> None:
+        # always taken off the (pooled) connection, even outside a request
+        started = conn.info.pop("metrics_started", None)
+        stats = _current.get()
+        if stats is None or started is None:
+            return
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        # one statement at a time per connection, so one start time
+        if _current.get() is not None:
+            conn.info["metrics_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        _finish(conn)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context: Any) -> None:
+        if context.connection is not None:
+            _finish(context.connection)
+
+
+# ---------- Middleware ----------
+
+def server_timing_enabled() -> bool:
+    return os.environ.get("METRICS_SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: Registry = registry,
+        server_timing: Optional[bool] = None,
+    ) -> None:
+        self.app = app
+        self.registry = registry
+        # None: follow METRICS_SERVER_TIMING, read per request
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+        server_timing = (
+            server_timing_enabled() if self.server_timing is None else self.server_timing
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    timing = (
+                        f"app;dur={elapsed_ms:.1f}, "
+                        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                    )
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._record(scope, status, time.perf_counter() - started, stats)
+
+    def _record(
+        self, scope: Scope, status: int, elapsed: float, stats: RequestStats
+    ) -> None:
+        route = scope.get("route")
+        # route templates keep label cardinality bounded
+        labels = {
+            "method": scope["method"],
+            "route": getattr(route, "path", None) or "unmatched",
+        }
+        self.registry.inc("http_requests_total", {**labels, "status": str(status)})
+        self.registry.observe("http_request_duration_seconds", labels, elapsed)
+        self.registry.observe("http_request_db_queries", labels, stats.queries)
+        self.registry.observe("http_request_db_seconds", labels, stats.sql_seconds)
@@ -0,0 +1,144 @@
+"""
+Lightweight schema migrations for existing SQLite databases.
+
+``SQLModel.metadata.create_all`` creates missing tables but never touches
+tables that already exist, so new columns, indexes and data backfills live
+here. Columns and indexes are reconciled with the models on every start;
+versioned steps are tracked in SQLite's ``PRAGMA user_version``.
+"""
+from typing import Callable, Dict, List
+
+from sqlalchemy import Connection, Engine, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql.schema import ScalarElementColumnDefault
+from sqlmodel import Session, SQLModel, select
+
+from . import aggregates, rollups, search, study_totals
+from .models import (
+    ResourceDB,
+    ResourceSkillDB,
+    ResourceTagDB,
+    create_search_index,
+)
+
+
+def _ensure_columns(conn: Connection) -> None:
+    """Add any column declared on the models but missing from the DB."""
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {
+            row[1]
+            for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")
+        }
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            ddl = f"{column.name} {column.type.compile(conn.dialect)}"
+            default = column.default
+            if isinstance(default, ScalarElementColumnDefault):
+                value = literal(default.arg).compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" NOT NULL DEFAULT {value}"
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+
+def _ensure_indexes(conn: Connection) -> None:
+    """Create any index declared on the models but missing from the DB."""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _backfill_resource_labels(conn: Connection) -> None:
+    """Copy tags / target_skills from the JSON columns into the label tables."""
+    tag_rows: List[Dict[str, object]] = []
+    skill_rows: List[Dict[str, object]] = []
+
+    for rid, tags, skills in conn.execute(
+        select(ResourceDB.id, ResourceDB.tags, ResourceDB.target_skills)
+    ):
+        for tag in dict.fromkeys(tags or []):
+            tag_rows.append({"tag": tag, "resource_id": rid})
+        for skill in dict.fromkeys(skills or []):
+            skill_rows.append({"skill": skill, "resource_id": rid})
+
+    if tag_rows:
+        conn.execute(
+            sqlite_insert(ResourceTagDB).on_conflict_do_nothing(),
+            tag_rows,
+        )
+    if skill_rows:
+        conn.execute(
+            sqlite_insert(ResourceSkillDB).on_conflict_do_nothing(),
+            skill_rows,
+        )
+
+
+def _rebuild_overview_aggregates(conn: Connection) -> None:
+    with Session(bind=conn) as session:
+        aggregates.rebuild(session)
+        session.flush()
+
+
+def _rebuild_study_rollups(conn: Connection) -> None:
+    with Session(bind=conn) as session:
+        rollups.rebuild(session)
+        session.flush()
+
+
+def _rebuild_study_totals(conn: Connection) -> None:
+    with Session(bind=conn) as session:
+        study_totals.rebuild(session)
+        session.flush()
+
+
+def _build_search_index(conn: Connection) -> None:
+    # idempotent; create_all also creates them on startup
+    create_search_index(conn)
+    with Session(bind=conn) as session:
+        search.rebuild(session)
+        session.flush()
+
+
+def _backfill_change_log(conn: Connection) -> None:
+    """Log every existing row as created, so ``since=0`` sees all of them."""
+    for entity, table in (("resource", "resources"), ("session", "study_sessions")):
+        conn.exec_driver_sql(
+            "INSERT INTO change_log (entity, entity_id, op, changed_at) "
+            f"SELECT '{entity}', id, 'create', datetime('now') FROM {table} "
+            "ORDER BY id"
+        )
+
+
+def _backfill_session_durations(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "UPDATE study_sessions SET duration_seconds = CAST(ROUND(MAX(0, "
+        "(julianday(ended_at) - julianday(started_at)) * 86400)) AS INTEGER)"
+    )
+
+
+# Append-only: each step runs once, in order, on databases whose
+# user_version is below its position.
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _backfill_resource_labels,
+    _rebuild_overview_aggregates,
+    _backfill_session_durations,
+    _rebuild_overview_aggregates,
+    _rebuild_study_rollups,
+    _rebuild_study_totals,
+    _build_search_index,
+    _backfill_change_log,
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    with engine.begin() as conn:
+        _ensure_columns(conn)
+        _ensure_indexes(conn)
+
+        current = conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+        for step in MIGRATIONS[current:]:
+            step(conn)
+        if current < len(MIGRATIONS):
+            conn.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
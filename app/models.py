@@ -1,9 +1,10 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, List, Optional
 
+from sqlalchemy import Connection, Index, event
 from sqlmodel import JSON, Column, Field, SQLModel
 
-from .schemas import ResourceStatus, ResourceType
+from .schemas import ChangeEntity, ChangeOp, ResourceStatus, ResourceType
 
 
 class ResourceDB(SQLModel, table=True):
@@ -12,7 +13,7 @@ class ResourceDB(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
 
-    resource_type: ResourceType
+    resource_type: ResourceType = Field(index=True)
     provider: Optional[str] = None
     url: Optional[str] = None
 
@@ -20,9 +21,10 @@ class ResourceDB(SQLModel, table=True):
     completed_units: int = 0
     progress_percent: float = 0.0
 
-    status: ResourceStatus = Field(default=ResourceStatus.not_started)
+    status: ResourceStatus = Field(default=ResourceStatus.not_started, index=True)
 
-    # store tags / skills as JSON arrays
+    # store tags / skills as JSON arrays (denormalized copy for reads;
+    # filtering goes through resource_tags / resource_skills below)
     tags: List[str] = Field(
         sa_column=Column(JSON, nullable=False, default=list)
     )
@@ -30,13 +32,207 @@ class ResourceDB(SQLModel, table=True):
         sa_column=Column(JSON, nullable=False, default=list)
     )
 
+    # study session totals, see app/study_totals.py
+    total_seconds: int = 0
+    session_count: int = 0
+    first_studied_at: Optional[datetime] = None
+    last_studied_at: Optional[datetime] = None
+
+    # bumped by every write to the row; validates app/resource_cache.py
+    version: int = 0
+
+
+class ResourceTagDB(SQLModel, table=True):
+    """One row per (tag, resource); the PK doubles as the tag lookup index."""
+
+    __tablename__ = "resource_tags"
+
+    tag: str = Field(primary_key=True)
+    resource_id: int = Field(
+        foreign_key="resources.id", primary_key=True, index=True
+    )
+
+
+class ResourceSkillDB(SQLModel, table=True):
+    """One row per (skill, resource); the PK doubles as the skill lookup index."""
+
+    __tablename__ = "resource_skills"
+
+    skill: str = Field(primary_key=True)
+    resource_id: int = Field(
+        foreign_key="resources.id", primary_key=True, index=True
+    )
+
 
 class StudySessionDB(SQLModel, table=True):
     __tablename__ = "study_sessions"
+    __table_args__ = (
+        # "sessions for resource X in a time range", ordered by start time
+        Index(
+            "ix_study_sessions_resource_id_started_at", "resource_id", "started_at"
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     resource_id: int = Field(foreign_key="resources.id")
 
-    started_at: datetime
+    started_at: datetime = Field(index=True)
     ended_at: datetime
+    duration_seconds: int = 0  # ended_at - started_at, set on insert
     notes: Optional[str] = None
+
+
+class StatsAggregateDB(SQLModel, table=True):
+    """Running totals behind /stats/overview, see app/aggregates.py."""
+
+    __tablename__ = "stats_aggregates"
+
+    scope: str = Field(primary_key=True)  # status / type / skill / total
+    key: str = Field(primary_key=True)
+
+    resources: int = 0
+    completed: int = 0
+    seconds: float = 0.0
+
+
+class StudyRollupDB(SQLModel, table=True):
+    """Study time per (day, resource), see app/rollups.py."""
+
+    __tablename__ = "study_rollups"
+
+    # PK order serves day-range scans; resource_id has its own index
+    day: date = Field(primary_key=True)
+    resource_id: int = Field(
+        foreign_key="resources.id", primary_key=True, index=True
+    )
+
+    seconds: float = 0.0
+    sessions: int = 0  # sessions that started on this day
+
+
+class DataVersionDB(SQLModel, table=True):
+    """Write counter per data scope, see app/versions.py."""
+
+    __tablename__ = "data_versions"
+
+    scope: str = Field(primary_key=True)  # resources / sessions
+    version: int = 0
+    updated_at: datetime
+
+
+class ChangeLogDB(SQLModel, table=True):
+    """One row per changed entity, see app/changes.py."""
+
+    __tablename__ = "change_log"
+    # AUTOINCREMENT: seq never goes back, even after the newest rows are
+    # compacted away
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    entity: ChangeEntity
+    entity_id: int
+    op: ChangeOp
+    changed_at: datetime
+
+
+class ChangeLogStateDB(SQLModel, table=True):
+    """Named sequence numbers of the change log (the prune watermark)."""
+
+    __tablename__ = "change_log_state"
+
+    name: str = Field(primary_key=True)
+    seq: int = 0
+
+
+# ---------- Full-text search (FTS5), see app/search.py ----------
+#
+# Virtual tables and triggers are not SQLModel models; their DDL hangs off
+# the metadata so every create_all / drop_all handles them too.
+
+SEARCH_DDL = [
+    # ----- resources -----
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+        title, provider,
+        content='resources', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # default ranking for ORDER BY rank: title weighs 2, provider 1
+    "INSERT INTO resources_fts (resources_fts, rank) "
+    "VALUES ('rank', 'bm25(2.0, 1.0)')",
+    """
+    CREATE TRIGGER IF NOT EXISTS resources_fts_insert AFTER INSERT ON resources
+    BEGIN
+        INSERT INTO resources_fts (rowid, title, provider)
+        VALUES (new.id, new.title, new.provider);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS resources_fts_delete AFTER DELETE ON resources
+    BEGIN
+        INSERT INTO resources_fts (resources_fts, rowid, title, provider)
+        VALUES ('delete', old.id, old.title, old.provider);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS resources_fts_update
+    AFTER UPDATE OF title, provider ON resources
+    BEGIN
+        INSERT INTO resources_fts (resources_fts, rowid, title, provider)
+        VALUES ('delete', old.id, old.title, old.provider);
+        INSERT INTO resources_fts (rowid, title, provider)
+        VALUES (new.id, new.title, new.provider);
+    END
+    """,
+    # ----- study sessions (only those with notes) -----
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS study_sessions_fts USING fts5(
+        notes,
+        content='study_sessions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_sessions_fts_insert
+    AFTER INSERT ON study_sessions WHEN new.notes IS NOT NULL
+    BEGIN
+        INSERT INTO study_sessions_fts (rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_sessions_fts_delete
+    AFTER DELETE ON study_sessions WHEN old.notes IS NOT NULL
+    BEGIN
+        INSERT INTO study_sessions_fts (study_sessions_fts, rowid, notes)
+        VALUES ('delete', old.id, old.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_sessions_fts_update
+    AFTER UPDATE OF notes ON study_sessions
+    BEGIN
+        INSERT INTO study_sessions_fts (study_sessions_fts, rowid, notes)
+        SELECT 'delete', old.id, old.notes WHERE old.notes IS NOT NULL;
+        INSERT INTO study_sessions_fts (rowid, notes)
+        SELECT new.id, new.notes WHERE new.notes IS NOT NULL;
+    END
+    """,
+]
+
+
+def create_search_index(conn: Connection) -> None:
+    for statement in SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _create_search_index(target: Any, conn: Connection, **kw: Any) -> None:
+    create_search_index(conn)
+
+
+@event.listens_for(SQLModel.metadata, "before_drop")
+def _drop_search_index(target: Any, conn: Connection, **kw: Any) -> None:
+    # the triggers go with their tables
+    for name in ("resources_fts", "study_sessions_fts"):
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
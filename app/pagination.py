@@ -0,0 +1,90 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and then
+base64url-encoded so clients treat it as an opaque token.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(*key: Any) -> str:
+    raw = json.dumps(list(key), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+    if not isinstance(key, list):
+        raise InvalidCursor("malformed cursor")
+    return key
+
+
+def decode_id_cursor(cursor: str) -> int:
+    key = decode_cursor(cursor)
+    if len(key) != 1 or not isinstance(key[0], int):
+        raise InvalidCursor("malformed cursor")
+    return key[0]
+
+
+def decode_time_id_cursor(cursor: str) -> Tuple[datetime, int]:
+    key = decode_cursor(cursor)
+    if len(key) != 2 or not isinstance(key[1], int):
+        raise InvalidCursor("malformed cursor")
+    try:
+        return datetime.fromisoformat(str(key[0])), key[1]
+    except ValueError as exc:
+        raise InvalidCursor("malformed cursor") from exc
+
+
+def decode_value_id_cursor(
+    cursor: str, value_type: type
+) -> Tuple[Optional[Any], int]:
+    """A ``(value, id)`` cursor; ``value_type`` is int or datetime (nullable)."""
+    key = decode_cursor(cursor)
+    if len(key) != 2 or not isinstance(key[1], int):
+        raise InvalidCursor("malformed cursor")
+    value = key[0]
+    if value_type is datetime:
+        if value is None:
+            return None, key[1]
+        try:
+            return datetime.fromisoformat(str(value)), key[1]
+        except ValueError as exc:
+            raise InvalidCursor("malformed cursor") from exc
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise InvalidCursor("malformed cursor")
+    return value, key[1]
+
+
+def decode_rank_cursor(cursor: str) -> Dict[str, Tuple[float, int]]:
+    """A ``/search`` cursor: ``(kind, rank, id)`` for each kind with more hits."""
+    after: Dict[str, Tuple[float, int]] = {}
+    for key in decode_cursor(cursor):
+        if (
+            not isinstance(key, list)
+            or len(key) != 3
+            or not isinstance(key[0], str)
+            or key[0] in after
+            or not isinstance(key[1], (int, float))
+            or not isinstance(key[2], int)
+        ):
+            raise InvalidCursor("malformed cursor")
+        after[key[0]] = (float(key[1]), key[2])
+    if not after:
+        raise InvalidCursor("malformed cursor")
+    return after
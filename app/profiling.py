@@ -0,0 +1,286 @@
+"""
+Opt-in cProfile capture of single requests.
+
+Enabled with ``PROFILING_ENABLED=1`` and a ``PROFILING_TOKEN``. Only then do
+the apps switch to ``ProfilingRoute`` and mount the ``/admin/profiles``
+endpoints, so a disabled deployment runs plain ``APIRoute`` handlers.
+
+A request is profiled when it carries ``X-Profile-Token: <token>`` or
+``?profile=<token>``. The endpoint function runs under ``cProfile`` in the
+thread that executes it, which is a threadpool worker for sync handlers. An
+``async def`` endpoint shares the event loop thread with every other
+request, so its profiler is only enabled while the endpoint's own coroutine
+runs and is off whenever it waits on an ``await``: the capture holds that
+request's CPU work, not the other coroutines that ran meanwhile, nor the
+time spent waiting (``duration_ms`` in the sidecar covers that). The
+stats are written as a ``.prof`` file (``pstats`` / snakeviz format), with a
+JSON sidecar, to ``PROFILING_DIR``. That directory is a ring buffer of
+``PROFILING_MAX_FILES`` captures. The response carries ``X-Profile-Id``.
+
+Dependencies and streamed response bodies run outside the endpoint call
+and are not part of the profile. One capture runs at a time per process;
+concurrent requests asking for one are served unprofiled.
+"""
+import cProfile
+import functools
+import hmac
+import inspect
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import types
+from collections.abc import Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+
+from .database import DATA_DIR
+
+TOKEN_HEADER = "X-Profile-Token"
+TOKEN_PARAM = "profile"
+
+
+@dataclass(frozen=True)
+class ProfilingSettings:
+    enabled: bool = False
+    token: str = ""
+    directory: Path = DATA_DIR / "profiles"
+    max_files: int = 50
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "ProfilingSettings":
+        enabled = env.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+        settings = cls(
+            enabled=enabled,
+            token=env.get("PROFILING_TOKEN", ""),
+            directory=Path(env.get("PROFILING_DIR") or cls.directory),
+            max_files=int(env.get("PROFILING_MAX_FILES") or cls.max_files),
+        )
+        if settings.enabled and not settings.token:
+            raise ValueError("PROFILING_ENABLED requires PROFILING_TOKEN")
+        return settings
+
+
+settings = ProfilingSettings.from_env()
+
+
+# ---------- Capture ----------
+
+@dataclass
+class _Capture:
+    profile: Optional[cProfile.Profile] = None
+
+
+_capture: ContextVar[Optional[_Capture]] = ContextVar("profile_capture", default=None)
+# cProfile cannot run two profilers in one thread; keep it to one per process
+_active = threading.Lock()
+
+
+@types.coroutine
+def _profile_steps(coro: Coroutine[Any, Any, Any], profile: cProfile.Profile) -> Any:
+    """Await ``coro`` with ``profile`` enabled only while ``coro`` runs."""
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        profile.enable()
+        try:
+            pending = coro.send(value) if error is None else coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            profile.disable()
+        # suspended: the event loop runs other requests until we resume
+        try:
+            value, error = (yield pending), None
+        except BaseException as exc:  # cancellation, passed on to coro
+            value, error = None, exc
+
+
+def _profile_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so it runs under cProfile when a capture is open."""
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            capture = _capture.get()
+            if capture is None:
+                return await endpoint(*args, **kwargs)
+            profile = cProfile.Profile()
+            try:
+                return await _profile_steps(endpoint(*args, **kwargs), profile)
+            finally:
+                capture.profile = profile
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        capture = _capture.get()
+        if capture is None:
+            return endpoint(*args, **kwargs)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.disable()
+            capture.profile = profile
+
+    return wrapper
+
+
+def _token_matches(candidate: Optional[str]) -> bool:
+    return candidate is not None and hmac.compare_digest(
+        candidate.encode(), settings.token.encode()
+    )
+
+
+def _requested(request: Request) -> bool:
+    return _token_matches(request.headers.get(TOKEN_HEADER)) or _token_matches(
+        request.query_params.get(TOKEN_PARAM)
+    )
+
+
+class ProfilingRoute(APIRoute):
+    """APIRoute that profiles requests carrying the profiling token."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _profile_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            if not _requested(request) or not _active.acquire(blocking=False):
+                return await handler(request)
+            capture = _Capture()
+            token = _capture.set(capture)
+            started = time.perf_counter()
+            try:
+                response: Response = await handler(request)
+            finally:
+                _capture.reset(token)
+                _active.release()
+            if capture.profile is not None:
+                profile_id = store.save(
+                    capture.profile,
+                    method=request.method,
+                    url=str(request.url.remove_query_params(TOKEN_PARAM)),
+                    route=self.path,
+                    status=response.status_code,
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                )
+                response.headers["X-Profile-Id"] = profile_id
+            return response
+
+        return profiled_handler
+
+
+# ---------- Ring buffer ----------
+
+_ID = re.compile(r"^[0-9]{8}T[0-9]{12}-[a-z0-9_-]+$")
+
+
+class ProfileStore:
+    """Newest ``max_files`` captures as ``<id>.prof`` + ``<id>.json``."""
+
+    def __init__(self, directory: Path, max_files: int) -> None:
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile: cProfile.Profile, **meta: Any) -> str:
+        now = datetime.now(timezone.utc)
+        slug = re.sub(r"[^a-z0-9]+", "_", f"{meta['method']} {meta['route']}".lower())
+        profile_id = f"{now:%Y%m%dT%H%M%S%f}-{slug.strip('_')}"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(self.directory / f"{profile_id}.prof"))
+            (self.directory / f"{profile_id}.json").write_text(
+                json.dumps({"id": profile_id, "created_at": now.isoformat(), **meta})
+            )
+            for stale in self._ids()[: -self.max_files]:
+                for suffix in (".prof", ".json"):
+                    (self.directory / f"{stale}{suffix}").unlink(missing_ok=True)
+        return profile_id
+
+    def _ids(self) -> List[str]:
+        # ids start with the capture time, so name order is age order
+        if not self.directory.exists():
+            return []
+        return sorted(p.stem for p in self.directory.glob("*.prof"))
+
+    def list(self) -> List[Dict[str, Any]]:
+        entries = []
+        for profile_id in reversed(self._ids()):
+            meta = self.directory / f"{profile_id}.json"
+            if meta.exists():
+                entries.append(json.loads(meta.read_text()))
+        return entries
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not _ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.exists() else None
+
+
+store = ProfileStore(settings.directory, settings.max_files)
+
+
+# ---------- Admin endpoints ----------
+
+def require_token(
+    x_profile_token: Optional[str] = Header(None),
+) -> None:
+    if not _token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+router = APIRouter(prefix="/admin/profiles", dependencies=[Depends(require_token)])
+
+
+@router.get("")
+def list_profiles() -> List[Dict[str, Any]]:
+    """Stored captures, newest first."""
+    return store.list()
+
+
+@router.get("/{profile_id}", response_model=None)
+def download_profile(
+    profile_id: str,
+    fmt: str = Query("prof", alias="format", pattern="^(prof|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+) -> Response:
+    """The raw ``.prof`` file, or ``?format=text`` for a pstats summary."""
+    path = store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if fmt == "prof":
+        return FileResponse(
+            path, media_type="application/octet-stream", filename=path.name
+        )
+    out = io.StringIO()
+    pstats.Stats(str(path), stream=out).sort_stats(sort).print_stats(50)
+    return PlainTextResponse(out.getvalue())
+
+
+def install(app: Any) -> None:
+    """Switch ``app`` to ``ProfilingRoute`` when profiling is enabled.
+
+    Must run before the app's routes are declared.
+    """
+    if not settings.enabled:
+        return
+    app.router.route_class = ProfilingRoute
+    app.include_router(router)
@@ -0,0 +1,140 @@
+"""
+Read-through cache of resources by id, shared by the request threads.
+
+Entries are bounded by LRU size and a TTL. Each one is stored with its
+row's ``resources.version``, which every write to that row bumps (progress
+and status updates, logged sessions, totals rebuilds). A hit re-reads just
+that column by primary key, instead of loading the row and building the
+model, and is served only if it still matches. A write to a row, in any
+worker process, therefore invalidates that row alone; writes in this
+process also drop their entry directly. Missing ids are not cached: the
+load that finds nothing costs the same primary-key read as a version check.
+
+One cache is kept per engine, so separate databases (tests, the async
+app) never see each other's rows.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from .models import ResourceDB
+from .schemas import Resource
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 60.0
+
+
+@dataclass
+class _Entry:
+    value: Resource
+    version: int  # resources.version of the row ``value`` was built from
+    stored_at: float
+
+
+def _row_version(session: Session, resource_id: int) -> Optional[int]:
+    return session.exec(
+        select(ResourceDB.version).where(ResourceDB.id == resource_id)
+    ).first()
+
+
+class ResourceCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # dropped for size
+        self.expirations = 0  # dropped for age
+        self.invalidations = 0  # dropped for a newer row version or a local write
+
+    def get(
+        self,
+        session: Session,
+        resource_id: int,
+        load: Callable[[], Optional[Tuple[int, Resource]]],
+    ) -> Optional[Resource]:
+        """The cached resource, or ``load()``'s (version, resource), read in
+        one statement so the two always match."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(resource_id)
+            if entry is not None and now - entry.stored_at >= self.ttl_seconds:
+                self.expirations += 1
+                del self._entries[resource_id]
+                entry = None
+
+        if entry is not None:
+            version = _row_version(session, resource_id)
+            with self._lock:
+                if version == entry.version:
+                    self.hits += 1
+                    if resource_id in self._entries:
+                        self._entries.move_to_end(resource_id)
+                    return entry.value
+                self.invalidations += 1
+                self._entries.pop(resource_id, None)
+            if version is None:  # deleted since
+                return None
+
+        with self._lock:
+            self.misses += 1
+        loaded = load()
+        if loaded is None:
+            return None
+        version, value = loaded
+        with self._lock:
+            self._entries[resource_id] = _Entry(value, version, now)
+            self._entries.move_to_end(resource_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, resource_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(resource_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_caches: "weakref.WeakKeyDictionary[Engine, ResourceCache]" = (
+    weakref.WeakKeyDictionary()
+)
+_caches_lock = threading.Lock()
+
+
+def cache_for(session: Session) -> ResourceCache:
+    engine = session.get_bind().engine
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = ResourceCache()
+        return cache
@@ -0,0 +1,215 @@
+"""
+Per-day study time rollups behind ``GET /stats/timeseries``.
+
+``study_rollups`` holds one row per (day, resource_id) with the seconds
+studied on that day and the number of sessions that started on it. A
+session that crosses midnight contributes to each day it overlaps.
+
+Session write paths in ``services`` apply deltas in the same transaction
+as the insert; ``rebuild`` / ``check`` recompute everything from
+``study_sessions``.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, select
+
+from . import versions
+from .aggregates import SECONDS_TOLERANCE
+from .models import ResourceDB, ResourceSkillDB, StudyRollupDB, StudySessionDB
+from .schemas import (
+    ResourceType,
+    Timeseries,
+    TimeseriesBucket,
+    TimeseriesPoint,
+)
+
+Key = Tuple[date, int]  # (day, resource_id)
+# [seconds, sessions]
+Values = List[Any]
+SessionSpan = Tuple[int, datetime, datetime]  # (resource_id, started_at, ended_at)
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def split_by_day(started_at: datetime, ended_at: datetime) -> List[Tuple[date, float]]:
+    """Seconds of ``[started_at, ended_at)`` falling on each calendar day."""
+    parts = []
+    start = started_at
+    while True:
+        midnight = datetime.combine(
+            start.date() + timedelta(days=1), time.min, tzinfo=start.tzinfo
+        )
+        if ended_at <= midnight:
+            parts.append((start.date(), (ended_at - start).total_seconds()))
+            return parts
+        parts.append((start.date(), (midnight - start).total_seconds()))
+        start = midnight
+
+
+def _rows_from_spans(spans: Iterable[SessionSpan]) -> Dict[Key, Values]:
+    rows: Dict[Key, Values] = {}
+    for resource_id, started_at, ended_at in spans:
+        for i, (day, seconds) in enumerate(split_by_day(started_at, ended_at)):
+            row = rows.setdefault((day, resource_id), [0.0, 0])
+            row[0] += seconds
+            row[1] += int(i == 0)
+    return rows
+
+
+# ---------- Write-path hook ----------
+
+def on_sessions_added(session: Session, spans: Iterable[SessionSpan]) -> None:
+    rows = _rows_from_spans(spans)
+    if not rows:
+        return
+
+    stmt = sqlite_insert(StudyRollupDB)
+    session.exec(
+        stmt.on_conflict_do_update(
+            index_elements=["day", "resource_id"],
+            set_={
+                "seconds": StudyRollupDB.seconds + stmt.excluded.seconds,
+                "sessions": StudyRollupDB.sessions + stmt.excluded.sessions,
+            },
+        ),
+        params=[
+            {"day": day, "resource_id": rid, "seconds": seconds, "sessions": n}
+            for (day, rid), (seconds, n) in rows.items()
+        ],
+    )
+
+
+# ---------- Reads ----------
+
+def timeseries(
+    session: Session,
+    bucket: TimeseriesBucket = TimeseriesBucket.day,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    skill: Optional[str] = None,
+    resource_type: Optional[ResourceType] = None,
+) -> Timeseries:
+    """Hours and session counts per bucket, read from ``study_rollups`` only.
+
+    ``day_from`` is inclusive, ``day_to`` exclusive. With a ``skill`` filter
+    a resource's time is split evenly across its skills, as in the overview.
+    Buckets between the first and last non-empty one are filled with zeros.
+    """
+    day = col(StudyRollupDB.day)
+    if bucket == TimeseriesBucket.week:
+        # SQLite date modifiers: forward to Sunday, then back to Monday
+        start: Any = func.date(day, "weekday 0", "-6 days")
+    else:
+        start = func.date(day)
+    seconds: Any = StudyRollupDB.seconds
+
+    skills_per_resource = (
+        select(ResourceSkillDB.resource_id, func.count().label("n"))
+        .group_by(col(ResourceSkillDB.resource_id))
+        .subquery()
+    )
+    if skill is not None:
+        seconds = seconds * 1.0 / skills_per_resource.c.n
+
+    stmt: Any = select(
+        start, func.sum(seconds), func.sum(StudyRollupDB.sessions)
+    )
+    if resource_type is not None:
+        stmt = stmt.join(
+            ResourceDB, col(ResourceDB.id) == StudyRollupDB.resource_id
+        ).where(ResourceDB.resource_type == resource_type)
+    if skill is not None:
+        stmt = (
+            stmt.join(
+                ResourceSkillDB,
+                col(ResourceSkillDB.resource_id) == StudyRollupDB.resource_id,
+            )
+            .join(
+                skills_per_resource,
+                skills_per_resource.c.resource_id == StudyRollupDB.resource_id,
+            )
+            .where(ResourceSkillDB.skill == skill)
+        )
+    if day_from is not None:
+        stmt = stmt.where(day >= day_from)
+    if day_to is not None:
+        stmt = stmt.where(day < day_to)
+    stmt = stmt.group_by(start).order_by(start)
+
+    found = {
+        date.fromisoformat(bucket_start): (float(total or 0.0), int(n or 0))
+        for bucket_start, total, n in session.exec(stmt)
+    }
+
+    points = []
+    if found:
+        step = timedelta(days=7 if bucket == TimeseriesBucket.week else 1)
+        current, last = min(found), max(found)
+        while current <= last:
+            total, n = found.get(current, (0.0, 0))
+            points.append(
+                TimeseriesPoint(
+                    start=current, hours=round(total / 3600.0, 2), sessions=n
+                )
+            )
+            current += step
+    return Timeseries(bucket=bucket, points=points)
+
+
+# ---------- Maintenance ----------
+
+def _stored_rows(session: Session) -> Dict[Key, Values]:
+    return {
+        (r.day, r.resource_id): [r.seconds, r.sessions]
+        for r in session.exec(select(StudyRollupDB))
+    }
+
+
+def _rows_from_tables(session: Session) -> Dict[Key, Values]:
+    spans = session.exec(
+        select(
+            StudySessionDB.resource_id,
+            StudySessionDB.started_at,
+            StudySessionDB.ended_at,
+        ).execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    return _rows_from_spans(spans)
+
+
+def check(session: Session) -> List[str]:
+    """Compare stored rollups with ``study_sessions``; returns drift messages."""
+    stored = _stored_rows(session)
+    fresh = _rows_from_tables(session)
+    zero: Values = [0.0, 0]
+
+    problems = []
+    for key in sorted(set(stored) | set(fresh)):
+        have = stored.get(key, zero)
+        want = fresh.get(key, zero)
+        if abs(have[0] - want[0]) > SECONDS_TOLERANCE or have[1] != want[1]:
+            problems.append(
+                f"{key[0].isoformat()}/{key[1]}: stored {have}, expected {want}"
+            )
+    return problems
+
+
+def rebuild(session: Session) -> None:
+    """Replace the stored rollups with values recomputed from ``study_sessions``.
+
+    Does not commit; callers own the transaction.
+    """
+    fresh = _rows_from_tables(session)
+    session.exec(delete(StudyRollupDB))
+    if fresh:
+        session.exec(
+            sqlite_insert(StudyRollupDB),
+            params=[
+                {"day": day, "resource_id": rid, "seconds": seconds, "sessions": n}
+                for (day, rid), (seconds, n) in fresh.items()
+            ],
+        )
+    # cached responses and client ETags may cover the values replaced here
+    versions.bump(session, versions.RESOURCES, versions.SESSIONS)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
@@ -20,6 +20,53 @@ class ResourceStatus(str, Enum):
     abandoned = "abandoned"
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class TimeseriesBucket(str, Enum):
+    day = "day"
+    week = "week"  # ISO weeks, keyed by their Monday
+
+
+class SearchKind(str, Enum):
+    resource = "resource"
+    session = "session"
+
+
+class ChangeEntity(str, Enum):
+    resource = "resource"
+    session = "session"
+
+
+class ChangeOp(str, Enum):
+    create = "create"
+    update = "update"
+
+
+class ResourceSort(str, Enum):
+    """``GET /resources`` order; a leading ``-`` sorts descending, ties by id."""
+
+    id = "id"
+    total_seconds = "total_seconds"
+    total_seconds_desc = "-total_seconds"
+    session_count = "session_count"
+    session_count_desc = "-session_count"
+    first_studied_at = "first_studied_at"
+    first_studied_at_desc = "-first_studied_at"
+    last_studied_at = "last_studied_at"
+    last_studied_at_desc = "-last_studied_at"
+
+    @property
+    def field(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+
 class ResourceBase(BaseModel):
     title: str
     resource_type: ResourceType
@@ -42,6 +89,11 @@ class Resource(ResourceBase):
     status: ResourceStatus
     completed_units: int = 0
     progress_percent: float = 0.0
+    # maintained from the resource's study sessions
+    total_seconds: int = 0
+    session_count: int = 0
+    first_studied_at: Optional[datetime] = None
+    last_studied_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
@@ -59,3 +111,87 @@ class StudySession(StudySessionBase):
 
     class Config:
         orm_mode = True
+
+
+class ResourcePage(BaseModel):
+    items: List[Resource]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class StudySessionPage(BaseModel):
+    items: List[StudySession]
+    next_cursor: Optional[str] = None
+
+
+class BulkItemError(BaseModel):
+    index: int  # position of the item in the request body
+    detail: str
+
+
+class BulkCreated(BaseModel):
+    index: int
+    id: int
+
+
+class StudySessionBulkResult(BaseModel):
+    created: List[BulkCreated] = []
+    errors: List[BulkItemError] = []
+
+
+class ResourceBulkUpdate(ResourceUpdate):
+    id: int
+
+
+class BulkUpdated(BaseModel):
+    index: int
+    resource: Resource
+
+
+class ResourceBulkUpdateResult(BaseModel):
+    updated: List[BulkUpdated] = []
+    errors: List[BulkItemError] = []
+
+
+class TimeseriesPoint(BaseModel):
+    start: date  # first day of the bucket
+    hours: float
+    sessions: int
+
+
+class Timeseries(BaseModel):
+    bucket: TimeseriesBucket
+    points: List[TimeseriesPoint]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int  # resource id or session id, per kind
+    resource_id: int
+    title: str  # the resource's title
+    started_at: Optional[datetime] = None  # sessions only
+    notes: Optional[str] = None  # sessions only
+    rank: float  # bm25; lower is a better match
+
+
+class SearchPage(BaseModel):
+    # each list is best match first; ranks of different lists don't compare
+    resources: List[SearchHit] = []
+    sessions: List[SearchHit] = []
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class Change(BaseModel):
+    seq: int
+    entity: ChangeEntity
+    id: int  # resource id or session id, per entity
+    op: ChangeOp
+    changed_at: datetime
+
+
+class ChangeFeed(BaseModel):
+    changes: List[Change]
+    # current state of the entities named in ``changes``
+    resources: List[Resource] = []
+    sessions: List[StudySession] = []
+    next_since: int  # pass back as ?since= for the next page
+    has_more: bool = False
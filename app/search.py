@@ -0,0 +1,210 @@
+"""
+Full-text search over resources and study session notes (SQLite FTS5).
+
+``resources_fts`` indexes ``resources.title`` / ``provider`` and
+``study_sessions_fts`` indexes ``study_sessions.notes`` (sessions without
+notes are left out). Both are external-content tables: they hold only the
+index and read text back from the base tables. Triggers on the base tables
+keep them in sync in the same transaction as each write; UPDATEs that do
+not touch the indexed columns (progress, status, study totals) skip them.
+
+New databases get the tables and triggers from ``create_all`` (the DDL is
+attached to the metadata in ``models``); existing ones from
+``app/migrations.py``. ``rebuild`` re-indexes everything from the base
+tables.
+
+Hits come back in one list per kind, each ranked by bm25 (lower is better;
+a match in a resource title weighs twice one in its provider) and paged by
+``(rank, id)``. The lists are never merged: bm25 depends on each table's
+own term statistics and column weights, so a resource rank and a session
+rank are not on the same scale.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, column, table, tuple_
+from sqlmodel import Session, col, select
+
+from . import versions
+from .models import ResourceDB, StudySessionDB
+from .schemas import ResourceStatus, ResourceType, SearchHit, SearchKind
+
+# at most this many words of a query are used
+MAX_TERMS = 16
+# the last word also matches as a prefix from this length on
+MIN_PREFIX_LENGTH = 3
+
+FTS_TABLES = {
+    SearchKind.resource: table(
+        "resources_fts", column("rowid", Integer), column("rank", Float)
+    ),
+    SearchKind.session: table(
+        "study_sessions_fts", column("rowid", Integer), column("rank", Float)
+    ),
+}
+
+# (rank, id) of the last hit of one kind on a page
+SearchKey = Tuple[float, int]
+
+
+class InvalidSearch(ValueError):
+    """Raised for a query without a single searchable word."""
+
+
+def rebuild(session: Session) -> None:
+    """Re-index every resource and session note from the base tables.
+
+    Does not commit; callers own the transaction.
+    """
+    conn = session.connection()
+    conn.exec_driver_sql(
+        "INSERT INTO resources_fts (resources_fts) VALUES ('rebuild')"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO study_sessions_fts (study_sessions_fts) VALUES ('delete-all')"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO study_sessions_fts (rowid, notes) "
+        "SELECT id, notes FROM study_sessions WHERE notes IS NOT NULL"
+    )
+    # cached responses and client ETags may cover the values replaced here
+    versions.bump(session, versions.RESOURCES, versions.SESSIONS)
+
+
+def fts_query(raw: str) -> str:
+    """User input as an FTS5 query: every word must match, in any order.
+
+    Words are quoted, so FTS5 operators and syntax in the input are plain
+    text; the last word also matches as a prefix ("postgr" finds
+    "postgresql"). Raises InvalidSearch when there is no word at all.
+    """
+    words = re.findall(r"\w+", raw)[:MAX_TERMS]
+    if not words:
+        raise InvalidSearch("q must contain at least one word")
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) >= MIN_PREFIX_LENGTH:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+# ---------- Reads ----------
+
+def _match(fts: Any, query: str) -> Any:
+    return column(fts.name).op("MATCH")(query)
+
+
+def _ranked(
+    session: Session,
+    kind: SearchKind,
+    query: str,
+    limit: int,
+    status: Optional[ResourceStatus],
+    resource_type: Optional[ResourceType],
+    after: Optional[SearchKey],
+) -> List[SearchKey]:
+    """The first ``limit`` hits of one kind after ``after``, as sort keys."""
+    fts = FTS_TABLES[kind]
+    stmt: Any = select(fts.c.rank, fts.c.rowid).where(_match(fts, query))
+
+    # only join the base tables when filtering: a bare FTS query with
+    # ORDER BY rank LIMIT n lets FTS5 keep just the top n
+    if status is not None or resource_type is not None:
+        resource_id: Any = fts.c.rowid
+        if kind == SearchKind.session:
+            stmt = stmt.join(
+                StudySessionDB, col(StudySessionDB.id) == fts.c.rowid
+            )
+            resource_id = StudySessionDB.resource_id
+        stmt = stmt.join(ResourceDB, col(ResourceDB.id) == resource_id)
+        if status is not None:
+            stmt = stmt.where(ResourceDB.status == status)
+        if resource_type is not None:
+            stmt = stmt.where(ResourceDB.resource_type == resource_type)
+
+    if after is not None:
+        stmt = stmt.where(tuple_(fts.c.rank, fts.c.rowid) > after)
+    stmt = stmt.order_by(fts.c.rank, fts.c.rowid).limit(limit)
+    return [(rank, rowid) for rank, rowid in session.exec(stmt)]
+
+
+def search(
+    session: Session,
+    raw_query: str,
+    limit: int,
+    kind: Optional[SearchKind] = None,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[ResourceType] = None,
+    after: Optional[Dict[SearchKind, SearchKey]] = None,
+) -> Tuple[Dict[SearchKind, List[SearchHit]], Dict[SearchKind, SearchKey]]:
+    """Up to ``limit`` hits of each kind, and the key to continue after for
+    every kind that has more (an empty dict on the last page).
+
+    ``after`` comes from the previous page; kinds missing from it are done.
+    ``status`` / ``resource_type`` filter resources, and sessions by their
+    resource. Raises InvalidSearch.
+    """
+    query = fts_query(raw_query)
+    kinds = [kind] if kind is not None else list(SearchKind)
+    if after is not None:
+        kinds = [k for k in kinds if k in after]
+    keys: Dict[SearchKind, List[SearchKey]] = {}
+    next_keys: Dict[SearchKind, SearchKey] = {}
+    for k in kinds:
+        ranked = _ranked(
+            session,
+            k,
+            query,
+            limit + 1,
+            status,
+            resource_type,
+            after[k] if after is not None else None,
+        )
+        if len(ranked) > limit:
+            next_keys[k] = ranked[limit - 1]
+        keys[k] = ranked[:limit]
+
+    resource_ids = [i for _, i in keys.get(SearchKind.resource, [])]
+    session_ids = [i for _, i in keys.get(SearchKind.session, [])]
+    rows: Dict[Tuple[SearchKind, Any], Dict[str, Any]] = {}
+    # hits come back by primary key; FTS5 snippet() would re-run the MATCH
+    # for each one, which costs milliseconds apiece on common words
+    if resource_ids:
+        for rid, title in session.exec(
+            select(ResourceDB.id, ResourceDB.title).where(
+                col(ResourceDB.id).in_(resource_ids)
+            )
+        ):
+            rows[(SearchKind.resource, rid)] = {
+                "resource_id": rid,
+                "title": title,
+            }
+    if session_ids:
+        columns = [
+            col(StudySessionDB.id),
+            col(StudySessionDB.resource_id),
+            col(StudySessionDB.started_at),
+            col(StudySessionDB.notes),
+            col(ResourceDB.title),
+        ]
+        stmt: Any = (
+            select(*columns)
+            .join(ResourceDB, col(ResourceDB.id) == StudySessionDB.resource_id)
+            .where(col(StudySessionDB.id).in_(session_ids))
+        )
+        for sid, rid, started_at, notes, title in session.exec(stmt):
+            rows[(SearchKind.session, sid)] = {
+                "resource_id": rid,
+                "title": title,
+                "started_at": started_at,
+                "notes": notes,
+            }
+
+    hits = {
+        k: [
+            SearchHit(kind=k, id=i, rank=rank, **rows[(k, i)])
+            for rank, i in keys.get(k, [])
+            if (k, i) in rows
+        ]
+        for k in SearchKind
+    }
+    return hits, next_keys
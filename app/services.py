@@ -1,16 +1,57 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-from sqlmodel import Session, select
-
-from .models import ResourceDB, StudySessionDB
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, insert, or_, tuple_
+from sqlmodel import Session, col, select
+
+from . import (
+    aggregates,
+    changes,
+    group_commit,
+    resource_cache,
+    rollups,
+    search,
+    study_totals,
+    versions,
+)
+from .models import (
+    ChangeLogDB,
+    ResourceDB,
+    ResourceSkillDB,
+    ResourceTagDB,
+    StudySessionDB,
+)
+from .pagination import (
+    InvalidCursor,
+    decode_id_cursor,
+    decode_rank_cursor,
+    decode_time_id_cursor,
+    decode_value_id_cursor,
+    encode_cursor,
+)
 from .schemas import (
+    BulkCreated,
+    BulkItemError,
+    BulkUpdated,
+    Change,
+    ChangeEntity,
+    ChangeFeed,
+    ChangeOp,
     Resource,
+    ResourceBulkUpdate,
+    ResourceBulkUpdateResult,
     ResourceCreate,
+    ResourceSort,
     ResourceStatus,
+    ResourceType,
     ResourceUpdate,
+    SearchKind,
+    SearchPage,
     StudySession,
     StudySessionBase,
+    StudySessionBulkResult,
+    Timeseries,
+    TimeseriesBucket,
 )
 
 # ---------- Mappers (DB <-> API schema) ----------
@@ -30,6 +71,10 @@ def resource_db_to_schema(db: ResourceDB) -> Resource:
         status=db.status,
         completed_units=db.completed_units,
         progress_percent=db.progress_percent,
+        total_seconds=db.total_seconds,
+        session_count=db.session_count,
+        first_studied_at=db.first_studied_at,
+        last_studied_at=db.last_studied_at,
     )
 
 
@@ -46,6 +91,18 @@ def session_db_to_schema(db: StudySessionDB) -> StudySession:
     )
 
 
+def change_db_to_schema(db: ChangeLogDB) -> Change:
+    assert db.seq is not None, "ChangeLogDB.seq should not be None after insert"
+
+    return Change(
+        seq=db.seq,
+        entity=db.entity,
+        id=db.entity_id,
+        op=db.op,
+        changed_at=db.changed_at,
+    )
+
+
 
 # ---------- Resource service ----------
 
@@ -63,41 +120,160 @@ def create_resource(
         target_skills=payload.target_skills or [],
     )
     session.add(db_resource)
+    session.flush()
+    assert db_resource.id is not None
+
+    # normalized copies of tags / skills for indexed filtering
+    for tag in dict.fromkeys(db_resource.tags):
+        session.add(ResourceTagDB(tag=tag, resource_id=db_resource.id))
+    for skill in dict.fromkeys(db_resource.target_skills):
+        session.add(ResourceSkillDB(skill=skill, resource_id=db_resource.id))
+
+    aggregates.on_resource_created(session, db_resource)
+    changes.record(session, ChangeEntity.resource, [db_resource.id], ChangeOp.create)
+    versions.bump(session, versions.RESOURCES)
     session.commit()
+    resource_cache.cache_for(session).invalidate(db_resource.id)
     session.refresh(db_resource)
     return resource_db_to_schema(db_resource)
 
 
-def list_resources(
-    session: Session,
+def filter_resources(
+    stmt: Any,
     status: Optional[ResourceStatus] = None,
     resource_type: Optional[str] = None,
     tag: Optional[str] = None,
     skill: Optional[str] = None,
-) -> List[Resource]:
-    db_resources = session.exec(select(ResourceDB)).all()
+) -> Tuple[Any, Any]:
+    """Apply resource filters to a select over ``resources``.
+
+    Returns the filtered statement and the id column to order / page by.
+    """
+    order_col: Any = ResourceDB.id
 
-    # simple in-Python filters
+    # every filter is an indexed predicate; tag / skill go through the
+    # label tables rather than the JSON columns
     if status is not None:
-        db_resources = [r for r in db_resources if r.status == status]
+        stmt = stmt.where(ResourceDB.status == status)
     if resource_type is not None:
-        db_resources = [r for r in db_resources if r.resource_type == resource_type]
+        stmt = stmt.where(ResourceDB.resource_type == resource_type)
     if tag is not None:
-        db_resources = [r for r in db_resources if tag in (r.tags or [])]
+        stmt = stmt.join(
+            ResourceTagDB, col(ResourceTagDB.resource_id) == ResourceDB.id
+        ).where(ResourceTagDB.tag == tag)
+        order_col = ResourceTagDB.resource_id
     if skill is not None:
-        db_resources = [r for r in db_resources if skill in (r.target_skills or [])]
+        stmt = stmt.join(
+            ResourceSkillDB, col(ResourceSkillDB.resource_id) == ResourceDB.id
+        ).where(ResourceSkillDB.skill == skill)
+        order_col = ResourceSkillDB.resource_id
+    return stmt, order_col
 
+
+def list_resources(
+    session: Session,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[Resource]:
+    stmt = _resources_query(
+        select(ResourceDB), status, resource_type, tag, skill, limit, after_id
+    )
+    db_resources = session.exec(stmt).all()
     return [resource_db_to_schema(r) for r in db_resources]
 
 
+def _resources_query(
+    stmt: Any,
+    status: Optional[ResourceStatus],
+    resource_type: Optional[str],
+    tag: Optional[str],
+    skill: Optional[str],
+    limit: Optional[int],
+    after_id: Optional[int],
+) -> Any:
+    stmt, order_col = filter_resources(stmt, status, resource_type, tag, skill)
+
+    # keyset pagination: a range scan on the driving index's resource_id,
+    # which also avoids a separate sort step
+    if after_id is not None:
+        stmt = stmt.where(order_col > after_id)
+    stmt = stmt.order_by(order_col)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _sorted_resources_query(
+    stmt: Any,
+    status: Optional[ResourceStatus],
+    resource_type: Optional[str],
+    tag: Optional[str],
+    skill: Optional[str],
+    limit: Optional[int],
+    sort: ResourceSort,
+    after: Optional[Tuple[Any, int]],
+) -> Any:
+    """``_resources_query`` ordered by a study total, then id.
+
+    The totals are not indexed (every session write would update the
+    index); SQLite reads the filtered rows and keeps the top ``limit``.
+    """
+    stmt, _ = filter_resources(stmt, status, resource_type, tag, skill)
+    column = col(getattr(ResourceDB, sort.field))
+    rid = col(ResourceDB.id)
+
+    # keyset on (value, id); SQLite puts NULLs first ascending, last descending
+    if after is not None:
+        value, after_id = after
+        if sort.descending:
+            if value is None:
+                stmt = stmt.where(column.is_(None), rid < after_id)
+            else:
+                stmt = stmt.where(
+                    or_(
+                        column < value,
+                        and_(column == value, rid < after_id),
+                        column.is_(None),
+                    )
+                )
+        elif value is None:
+            stmt = stmt.where(
+                or_(and_(column.is_(None), rid > after_id), column.is_not(None))
+            )
+        else:
+            stmt = stmt.where(
+                or_(column > value, and_(column == value, rid > after_id))
+            )
+    if sort.descending:
+        stmt = stmt.order_by(column.desc(), rid.desc())
+    else:
+        stmt = stmt.order_by(column, rid)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _load_resource(
+    resource_id: int, session: Session
+) -> Optional[Tuple[int, Resource]]:
+    db_resource = session.get(ResourceDB, resource_id)
+    if not db_resource:
+        return None
+    return db_resource.version, resource_db_to_schema(db_resource)
+
+
 def get_resource_by_id(
     resource_id: int,
     session: Session,
 ) -> Optional[Resource]:
-    db_resource = session.get(ResourceDB, resource_id)
-    if not db_resource:
-        return None
-    return resource_db_to_schema(db_resource)
+    """Read through the per-engine resource cache (see ``resource_cache``)."""
+    return resource_cache.cache_for(session).get(
+        session, resource_id, lambda: _load_resource(resource_id, session)
+    )
 
 
 def update_resource(
@@ -105,9 +281,38 @@ def update_resource(
     payload: ResourceUpdate,
     session: Session,
 ) -> Optional[Resource]:
+    updated = apply_resource_update(resource_id, payload, session)
+    if updated is None:
+        return None
+    session.commit()
+    resource_cache.cache_for(session).invalidate(resource_id)
+    return updated
+
+
+def apply_resource_update(
+    resource_id: int,
+    payload: ResourceUpdate,
+    session: Session,
+) -> Optional[Resource]:
+    """The writes of ``update_resource``.
+
+    Does not commit; callers own the transaction and the cache invalidation.
+    """
     db_resource = session.get(ResourceDB, resource_id)
     if not db_resource:
         return None
+    old_status = db_resource.status
+    _apply_update(db_resource, payload)
+
+    aggregates.on_resource_status_changed(session, db_resource, old_status)
+    changes.record(session, ChangeEntity.resource, [resource_id], ChangeOp.update)
+    versions.bump(session, versions.RESOURCES)
+    session.add(db_resource)
+    return resource_db_to_schema(db_resource)
+
+
+def _apply_update(db_resource: ResourceDB, payload: ResourceUpdate) -> None:
+    db_resource.version += 1
 
     # status
     if payload.status is not None:
@@ -127,131 +332,643 @@ def update_resource(
         else:
             db_resource.completed_units = completed
 
-    session.add(db_resource)
-    session.commit()
-    session.refresh(db_resource)
-    return resource_db_to_schema(db_resource)
+
+def update_resources_bulk(
+    items: Sequence[Tuple[int, ResourceBulkUpdate]],
+    session: Session,
+) -> ResourceBulkUpdateResult:
+    """Apply many updates in one transaction.
+
+    ``items`` pairs each payload with the caller's index for it, as in
+    ``create_study_sessions_bulk``. The rules are those of
+    ``update_resource``; unknown ids are reported in ``errors``. Repeated
+    ids are applied in order.
+    """
+    result = ResourceBulkUpdateResult()
+
+    # one IN query loads every target row
+    resource_ids = {payload.id for _, payload in items}
+    resources = {
+        r.id: r
+        for r in session.exec(
+            select(ResourceDB).where(col(ResourceDB.id).in_(resource_ids))
+        )
+    }
+
+    # status before the first update of each resource
+    old_statuses: Dict[int, ResourceStatus] = {}
+    for index, payload in items:
+        db_resource = resources.get(payload.id)
+        if db_resource is None:
+            result.errors.append(
+                BulkItemError(index=index, detail="Resource not found")
+            )
+            continue
+        old_statuses.setdefault(payload.id, db_resource.status)
+        _apply_update(db_resource, payload)
+        result.updated.append(
+            BulkUpdated(index=index, resource=resource_db_to_schema(db_resource))
+        )
+
+    if result.updated:
+        aggregates.on_resources_status_changed(
+            session,
+            [(resources[rid], status) for rid, status in old_statuses.items()],
+        )
+        changes.record(session, ChangeEntity.resource, old_statuses, ChangeOp.update)
+        versions.bump(session, versions.RESOURCES)
+        session.commit()
+        cache = resource_cache.cache_for(session)
+        for resource_id in old_statuses:
+            cache.invalidate(resource_id)
+    return result
 
 
 # ---------- Study session service ----------
 
+class InvalidStudySession(ValueError):
+    """Raised when a study session ends before it starts."""
+
+
+
+def _utc_naive(value: datetime) -> datetime:
+    # sessions are stored naive; aware input is converted to UTC first, so
+    # a payload mixing aware and naive values (naive taken as UTC) still
+    # subtracts
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _normalized(payload: StudySessionBase) -> StudySessionBase:
+    return payload.model_copy(
+        update={
+            "started_at": _utc_naive(payload.started_at),
+            "ended_at": _utc_naive(payload.ended_at),
+        }
+    )
+
+
+def _duration_seconds(payload: StudySessionBase) -> float:
+    duration = (
+        _utc_naive(payload.ended_at) - _utc_naive(payload.started_at)
+    ).total_seconds()
+    if duration < 0:
+        raise InvalidStudySession("ended_at must not be before started_at")
+    return duration
+
+
 def create_study_session(
     payload: StudySessionBase,
     session: Session,
 ) -> Optional[StudySession]:
-    # verify resource exists
-    db_resource = session.get(ResourceDB, payload.resource_id)
-    if not db_resource:
+    created = add_study_session(payload, session)
+    if created is None:
+        return None
+    session.commit()
+    resource_cache.cache_for(session).invalidate(payload.resource_id)
+    return created
+
+
+def add_study_session(
+    payload: StudySessionBase,
+    session: Session,
+) -> Optional[StudySession]:
+    """The writes of ``create_study_session``.
+
+    Does not commit; callers own the transaction and the cache invalidation.
+    """
+    payload = _normalized(payload)
+    seconds = round(_duration_seconds(payload))
+
+    # one UPDATE both adds to the resource's totals and checks it exists
+    target_skills = study_totals.on_session_added(
+        session, payload.resource_id, payload.started_at, payload.ended_at, seconds
+    )
+    if target_skills is None:
         return None
 
     db_session = StudySessionDB(
         resource_id=payload.resource_id,
         started_at=payload.started_at,
         ended_at=payload.ended_at,
+        duration_seconds=seconds,
         notes=payload.notes,
     )
     session.add(db_session)
-    session.commit()
-    session.refresh(db_session)
+    aggregates.on_study_time_added(session, target_skills, seconds)
+    rollups.on_sessions_added(
+        session, [(payload.resource_id, payload.started_at, payload.ended_at)]
+    )
+    session.flush()  # assigns the id
+    assert db_session.id is not None
+    changes.record(session, ChangeEntity.session, [db_session.id], ChangeOp.create)
+    # the resource's totals changed too
+    changes.record(
+        session, ChangeEntity.resource, [payload.resource_id], ChangeOp.update
+    )
+    versions.bump(session, versions.SESSIONS, versions.RESOURCES)
     return session_db_to_schema(db_session)
 
 
+def create_study_sessions_bulk(
+    items: Sequence[Tuple[int, StudySessionBase]],
+    session: Session,
+) -> StudySessionBulkResult:
+    """Insert many sessions in one transaction.
+
+    ``items`` pairs each payload with the caller's index for it, which is
+    echoed back in ``created`` / ``errors``. Invalid items are reported and
+    skipped; the rest are inserted together.
+    """
+    result = StudySessionBulkResult()
+
+    # one IN query validates every resource_id in the batch
+    resource_ids = {payload.resource_id for _, payload in items}
+    resources = {
+        r.id: r
+        for r in session.exec(
+            select(ResourceDB).where(col(ResourceDB.id).in_(resource_ids))
+        )
+    }
+
+    rows: List[Dict[str, Any]] = []
+    row_indexes: List[int] = []
+    seconds_per_resource: Dict[int, int] = {}
+    for index, payload in items:
+        payload = _normalized(payload)
+        duration = (payload.ended_at - payload.started_at).total_seconds()
+        if duration < 0:
+            result.errors.append(
+                BulkItemError(
+                    index=index, detail="ended_at must not be before started_at"
+                )
+            )
+            continue
+        if payload.resource_id not in resources:
+            result.errors.append(
+                BulkItemError(index=index, detail="Resource not found")
+            )
+            continue
+
+        rows.append(
+            {
+                "resource_id": payload.resource_id,
+                "started_at": payload.started_at,
+                "ended_at": payload.ended_at,
+                "duration_seconds": round(duration),
+                "notes": payload.notes,
+            }
+        )
+        row_indexes.append(index)
+        seconds_per_resource[payload.resource_id] = (
+            seconds_per_resource.get(payload.resource_id, 0) + round(duration)
+        )
+
+    if rows:
+        # batched multi-row INSERT ... RETURNING. SQLite does not promise
+        # RETURNING order (and sort_by_parameter_order falls back to one
+        # statement per row there), so ids are matched back to items by
+        # their values; identical items are interchangeable.
+        key_columns = ("resource_id", "started_at", "ended_at", "notes")
+
+        def key(values: Sequence[Any]) -> Tuple[Any, ...]:
+            # rows hold naive UTC datetimes, as SQLite returns them
+            return tuple(values)
+
+        indexes_by_key: Dict[Tuple[Any, ...], List[int]] = {}
+        for index, row in zip(row_indexes, rows, strict=True):
+            row_key = key([row[name] for name in key_columns])
+            indexes_by_key.setdefault(row_key, []).append(index)
+        returned = session.exec(
+            insert(StudySessionDB).returning(
+                col(StudySessionDB.id),
+                *(getattr(StudySessionDB, name) for name in key_columns),
+            ),
+            params=rows,
+        )
+        created = [
+            BulkCreated(index=indexes_by_key[key(values)].pop(), id=new_id)
+            for new_id, *values in returned
+        ]
+        result.created = sorted(created, key=lambda c: c.index)
+        for resource_id, seconds in seconds_per_resource.items():
+            aggregates.on_study_time_added(
+                session, resources[resource_id].target_skills, seconds
+            )
+        rollups.on_sessions_added(
+            session,
+            [(r["resource_id"], r["started_at"], r["ended_at"]) for r in rows],
+        )
+        study_totals.on_sessions_added(
+            session,
+            [
+                (
+                    r["resource_id"],
+                    r["started_at"],
+                    r["ended_at"],
+                    r["duration_seconds"],
+                )
+                for r in rows
+            ],
+        )
+        changes.record(
+            session, ChangeEntity.session, [c.id for c in created], ChangeOp.create
+        )
+        changes.record(
+            session, ChangeEntity.resource, seconds_per_resource, ChangeOp.update
+        )
+        versions.bump(session, versions.SESSIONS, versions.RESOURCES)
+
+    session.commit()
+    cache = resource_cache.cache_for(session)
+    for resource_id in seconds_per_resource:
+        cache.invalidate(resource_id)
+    return result
+
+
+def filter_study_sessions(
+    stmt: Any,
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+) -> Any:
+    """Apply session filters to a select over ``study_sessions``.
+
+    ``started_from`` is inclusive, ``started_to`` exclusive. Aware bounds
+    are converted to naive UTC, as stored; naive ones are taken as UTC.
+    """
+    if resource_id is not None:
+        stmt = stmt.where(StudySessionDB.resource_id == resource_id)
+    if started_from is not None:
+        stmt = stmt.where(
+            col(StudySessionDB.started_at) >= _utc_naive(started_from)
+        )
+    if started_to is not None:
+        stmt = stmt.where(col(StudySessionDB.started_at) < _utc_naive(started_to))
+    return stmt
+
+
 def list_study_sessions(
     session: Session,
     resource_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
 ) -> List[StudySession]:
-    db_sessions = session.exec(select(StudySessionDB)).all()
-    if resource_id is not None:
-        db_sessions = [s for s in db_sessions if s.resource_id == resource_id]
+    stmt = _study_sessions_query(
+        select(StudySessionDB), resource_id, started_from, started_to, limit, after
+    )
+    db_sessions = session.exec(stmt).all()
     return [session_db_to_schema(s) for s in db_sessions]
 
 
-# ---------- Stats service ----------
+def _study_sessions_query(
+    stmt: Any,
+    resource_id: Optional[int],
+    started_from: Optional[datetime],
+    started_to: Optional[datetime],
+    limit: Optional[int],
+    after: Optional[Tuple[datetime, int]],
+) -> Any:
+    stmt = filter_study_sessions(stmt, resource_id, started_from, started_to)
+
+    # keyset pagination on (started_at, id)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(col(StudySessionDB.started_at), col(StudySessionDB.id)) > after
+        )
+    stmt = stmt.order_by(col(StudySessionDB.started_at), col(StudySessionDB.id))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
 
-def compute_overview_stats(session: Session) -> Dict[str, Any]:
-    resources = session.exec(select(ResourceDB)).all()
-    sessions_db = session.exec(select(StudySessionDB)).all()
 
-    total_resources = len(resources)
-    completed_resources = sum(
-        1 for r in resources if r.status == ResourceStatus.completed
+# ---------- Group commit (see group_commit) ----------
+
+def create_study_session_grouped(
+    payload: StudySessionBase,
+    session: Session,
+) -> Optional[StudySession]:
+    """``create_study_session``, committed in a batch by the writer thread."""
+    # reject before queueing: a failing job costs its batch a rerun
+    _duration_seconds(payload)
+    created = group_commit.committer_for(session).run(
+        lambda s: add_study_session(payload, s)
     )
-    in_progress_resources = sum(
-        1 for r in resources if r.status == ResourceStatus.in_progress
+    if created is not None:
+        resource_cache.cache_for(session).invalidate(payload.resource_id)
+    return created
+
+
+def update_resource_grouped(
+    resource_id: int,
+    payload: ResourceUpdate,
+    session: Session,
+) -> Optional[Resource]:
+    """``update_resource``, committed in a batch by the writer thread."""
+    updated = group_commit.committer_for(session).run(
+        lambda s: apply_resource_update(resource_id, payload, s)
     )
+    if updated is not None:
+        resource_cache.cache_for(session).invalidate(resource_id)
+    return updated
 
-    # total study time
-    total_minutes = 0.0
-    for s in sessions_db:
-        start = (
-            s.started_at
-            if isinstance(s.started_at, datetime)
-            else datetime.fromisoformat(str(s.started_at))
-        )
-        end = (
-            s.ended_at
-            if isinstance(s.ended_at, datetime)
-            else datetime.fromisoformat(str(s.ended_at))
+
+# ---------- Row fast path (list endpoints) ----------
+#
+# The list endpoints skip ORM objects and pydantic models: they select only
+# the columns of the documented schema as tuples and hand plain dicts to the
+# JSON encoder.
+
+RESOURCE_FIELDS = tuple(Resource.model_fields)
+STUDY_SESSION_FIELDS = tuple(StudySession.model_fields)
+
+
+class InvalidFields(ValueError):
+    """Raised for a ``?fields=`` list naming fields the schema does not have."""
+
+
+def parse_fields(
+    raw: Optional[str], allowed: Sequence[str]
+) -> Optional[Tuple[str, ...]]:
+    """``"id,title"`` as a tuple in schema order; None selects every field."""
+    if raw is None:
+        return None
+    names = {name.strip() for name in raw.split(",")} - {""}
+    unknown = names - set(allowed)
+    if unknown or not names:
+        raise InvalidFields(
+            f"Unknown fields: {', '.join(sorted(unknown))}"
+            if unknown
+            else "fields must name at least one field"
         )
-        total_minutes += max(0.0, (end - start).total_seconds() / 60.0)
-
-    # by type
-    by_type: Dict[str, Dict[str, int]] = {}
-    for r in resources:
-        t = r.resource_type.value
-        if t not in by_type:
-            by_type[t] = {"count": 0, "completed": 0}
-        by_type[t]["count"] += 1
-        if r.status == ResourceStatus.completed:
-            by_type[t]["completed"] += 1
-
-    # by skill
-    by_skill: Dict[str, Dict[str, float | int]] = {}
-    for r in resources:
-        for skill in r.target_skills or []:
-            if skill not in by_skill:
-                by_skill[skill] = {
-                    "resources": 0,
-                    "completed": 0,
-                    "hours": 0.0,
-                }
-            by_skill[skill]["resources"] += 1
-            if r.status == ResourceStatus.completed:
-                by_skill[skill]["completed"] += 1
-
-    # attribute hours to skills
-    for s in sessions_db:
-        resource = next((r for r in resources if r.id == s.resource_id), None)
-        if not resource or not resource.target_skills:
-            continue
+    return tuple(name for name in allowed if name in names)
+
 
-        start = (
-            s.started_at
-            if isinstance(s.started_at, datetime)
-            else datetime.fromisoformat(str(s.started_at))
+def _rows(
+    session: Session,
+    model: Any,
+    stmt_for: Callable[[Any], Any],
+    fields: Sequence[str],
+    key_fields: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Rows of ``fields`` plus the paging ``key_fields``, as dicts."""
+    names = list(fields) + [k for k in key_fields if k not in fields]
+    stmt = stmt_for(select(*(col(getattr(model, name)) for name in names)))
+    result = session.exec(stmt)
+    # sqlmodel hands back bare scalars for a one-column select
+    rows = result if len(names) > 1 else ((value,) for value in result)
+    items = [dict(zip(names, row, strict=True)) for row in rows]
+    # same defaults as resource_db_to_schema
+    for label in ("tags", "target_skills"):
+        if label in fields:
+            for item in items:
+                item[label] = item[label] or []
+    return items
+
+
+def _page(
+    items: List[Dict[str, Any]],
+    limit: int,
+    fields: Sequence[str],
+    key_fields: Sequence[str],
+    cursor_for: Callable[[Dict[str, Any]], str],
+) -> Dict[str, Any]:
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = cursor_for(items[-1])
+    extra = [k for k in key_fields if k not in fields]
+    if extra:
+        for item in items:
+            for k in extra:
+                del item[k]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_resources_page_rows(
+    session: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    skill: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: ResourceSort = ResourceSort.id,
+) -> Dict[str, Any]:
+    """One page of resources as a plain ``ResourcePage``-shaped dict.
+
+    ``fields`` narrows both the SELECT and the items; see ``parse_fields``.
+    Pages are ordered by ``sort``; its cursors are only valid for that sort.
+    Raises InvalidCursor.
+    """
+    fields = fields or RESOURCE_FIELDS
+    if sort == ResourceSort.id:
+        after_id = decode_id_cursor(cursor) if cursor else None
+        items = _rows(
+            session,
+            ResourceDB,
+            lambda stmt: _resources_query(
+                stmt, status, resource_type, tag, skill, limit + 1, after_id
+            ),
+            fields,
+            ("id",),
         )
-        end = (
-            s.ended_at
-            if isinstance(s.ended_at, datetime)
-            else datetime.fromisoformat(str(s.ended_at))
+        return _page(
+            items, limit, fields, ("id",), lambda last: encode_cursor(last["id"])
         )
-        duration_hours = max(0.0, (end - start).total_seconds() / 3600.0)
-        share = duration_hours / len(resource.target_skills)
-        for skill in resource.target_skills:
-            by_skill[skill]["hours"] += share
-
-    return {
-        "total_resources": total_resources,
-        "completed_resources": completed_resources,
-        "in_progress_resources": in_progress_resources,
-        "total_study_hours": round(total_minutes / 60.0, 2),
-        "by_type": by_type,
-        "by_skill": {
-            k: {
-                "resources": v["resources"],
-                "completed": v["completed"],
-                "hours": round(v["hours"], 2),
+
+    value_type = int if sort.field in ("total_seconds", "session_count") else datetime
+    after = decode_value_id_cursor(cursor, value_type) if cursor else None
+    key_fields = (sort.field, "id")
+    items = _rows(
+        session,
+        ResourceDB,
+        lambda stmt: _sorted_resources_query(
+            stmt, status, resource_type, tag, skill, limit + 1, sort, after
+        ),
+        fields,
+        key_fields,
+    )
+
+    def cursor_for(last: Dict[str, Any]) -> str:
+        value = last[sort.field]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return encode_cursor(value, last["id"])
+
+    return _page(items, limit, fields, key_fields, cursor_for)
+
+
+def list_study_sessions_page_rows(
+    session: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    resource_id: Optional[int] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """One page of sessions ordered by start time, as a plain
+    ``StudySessionPage``-shaped dict.
+
+    ``fields`` narrows both the SELECT and the items; see ``parse_fields``.
+    Raises InvalidCursor.
+    """
+    after = decode_time_id_cursor(cursor) if cursor else None
+    fields = fields or STUDY_SESSION_FIELDS
+    key_fields = ("started_at", "id")
+    items = _rows(
+        session,
+        StudySessionDB,
+        lambda stmt: _study_sessions_query(
+            stmt, resource_id, started_from, started_to, limit + 1, after
+        ),
+        fields,
+        key_fields,
+    )
+    return _page(
+        items,
+        limit,
+        fields,
+        key_fields,
+        lambda last: encode_cursor(last["started_at"].isoformat(), last["id"]),
+    )
+
+
+def resource_fields(resource: Resource, fields: Optional[Sequence[str]]) -> Any:
+    """``resource`` narrowed to ``fields`` (all of it when None)."""
+    if fields is None:
+        return resource
+    return resource.model_dump(include=set(fields))
+
+
+# ---------- Search service ----------
+
+InvalidSearch = search.InvalidSearch
+
+
+def search_page(
+    session: Session,
+    q: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    kind: Optional[SearchKind] = None,
+    status: Optional[ResourceStatus] = None,
+    resource_type: Optional[ResourceType] = None,
+) -> SearchPage:
+    """One page of ranked full-text hits per kind; raises InvalidSearch /
+    InvalidCursor."""
+    after = None
+    if cursor:
+        try:
+            after = {
+                SearchKind(k): key for k, key in decode_rank_cursor(cursor).items()
             }
-            for k, v in by_skill.items()
-        },
-    }
+        except ValueError as exc:  # not a SearchKind
+            raise InvalidCursor("malformed cursor") from exc
+    hits, next_keys = search.search(
+        session,
+        q,
+        limit,
+        kind=kind,
+        status=status,
+        resource_type=resource_type,
+        after=after,
+    )
+    next_cursor = None
+    if next_keys:
+        next_cursor = encode_cursor(
+            *[[k.value, rank, i] for k, (rank, i) in next_keys.items()]
+        )
+    return SearchPage(
+        resources=hits[SearchKind.resource],
+        sessions=hits[SearchKind.session],
+        next_cursor=next_cursor,
+    )
+
+
+# ---------- Change feed ----------
+
+ChangesPruned = changes.ChangesPruned
+
+
+def change_feed(session: Session, since: int, limit: int) -> ChangeFeed:
+    """Entries after ``since`` with the current state of their entities.
+
+    Raises ChangesPruned when the client is behind the compacted part.
+    """
+    entries, has_more = changes.read(session, since, limit)
+    ids: Dict[ChangeEntity, List[int]] = {e: [] for e in ChangeEntity}
+    for entry in entries:
+        ids[entry.entity].append(entry.entity_id)
+
+    resources: List[Resource] = []
+    sessions: List[StudySession] = []
+    if ids[ChangeEntity.resource]:
+        resources = [
+            resource_db_to_schema(r)
+            for r in session.exec(
+                select(ResourceDB)
+                .where(col(ResourceDB.id).in_(ids[ChangeEntity.resource]))
+                .order_by(col(ResourceDB.id))
+            )
+        ]
+    if ids[ChangeEntity.session]:
+        sessions = [
+            session_db_to_schema(s)
+            for s in session.exec(
+                select(StudySessionDB)
+                .where(col(StudySessionDB.id).in_(ids[ChangeEntity.session]))
+                .order_by(col(StudySessionDB.id))
+            )
+        ]
+    feed = [change_db_to_schema(e) for e in entries]
+    return ChangeFeed(
+        changes=feed,
+        resources=resources,
+        sessions=sessions,
+        next_since=feed[-1].seq if feed else since,
+        has_more=has_more,
+    )
+
+
+# ---------- Data versions ----------
+
+def data_state(session: Session, scopes: Sequence[str]) -> versions.DataState:
+    """Current ETag / Last-Modified for endpoints that read ``scopes``."""
+    return versions.read(session, scopes)
+
+
+def resource_cache_stats(session: Session) -> Dict[str, float]:
+    return resource_cache.cache_for(session).stats()
+
+
+# ---------- Stats service ----------
+
+def compute_overview_stats(session: Session) -> Dict[str, Any]:
+    # served from the incrementally maintained stats_aggregates table;
+    # see aggregates.check / aggregates.rebuild for the from-scratch version
+    return aggregates.read_overview(session)
+
+
+def compute_timeseries(
+    session: Session,
+    bucket: TimeseriesBucket = TimeseriesBucket.day,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    skill: Optional[str] = None,
+    resource_type: Optional[ResourceType] = None,
+) -> Timeseries:
+    # served from the per-day study_rollups table, never study_sessions
+    return rollups.timeseries(
+        session,
+        bucket=bucket,
+        day_from=day_from,
+        day_to=day_to,
+        skill=skill,
+        resource_type=resource_type,
+    )
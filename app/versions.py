@@ -0,0 +1,65 @@
+"""
+Data version counters behind the ``ETag`` / ``Last-Modified`` headers.
+
+``data_versions`` holds one row per scope. The write paths in ``services``
+bump a scope in the same transaction as the change, so a read endpoint can
+tell whether its data changed by reading one or two primary-key rows
+instead of the tables it summarizes.
+
+Repairs that rewrite derived tables (the ``rebuild`` functions behind the
+CLI and migrations, ``changes.compact``) bump both scopes as well.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, select
+
+from .models import DataVersionDB
+
+RESOURCES = "resources"
+SESSIONS = "sessions"
+
+
+@dataclass(frozen=True)
+class DataState:
+    etag: str
+    last_modified: Optional[datetime]  # UTC; None until the first write
+
+
+def _utcnow() -> datetime:
+    # SQLite stores naive datetimes; versions are always UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump(session: Session, *scopes: str) -> None:
+    now = _utcnow()
+    stmt = sqlite_insert(DataVersionDB).values(
+        [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes]
+    )
+    session.exec(
+        stmt.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={"version": DataVersionDB.version + 1, "updated_at": now},
+        )
+    )
+
+
+def read(session: Session, scopes: Iterable[str]) -> DataState:
+    scopes = sorted(scopes)
+    rows = {
+        row.scope: row
+        for row in session.exec(
+            select(DataVersionDB).where(col(DataVersionDB.scope).in_(scopes))
+        )
+    }
+
+    tag = ".".join(
+        f"{scope}-{rows[scope].version if scope in rows else 0}" for scope in scopes
+    )
+    modified = [row.updated_at for row in rows.values()]
+    return DataState(
+        etag=f'"{tag}"',
+        last_modified=max(modified) if modified else None,
+    )
@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the Learning Progress Tracker (not run by pytest).
+"""
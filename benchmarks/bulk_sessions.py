@@ -0,0 +1,89 @@
+"""
+Throughput of POST /sessions/bulk versus one POST /sessions per item.
+
+Runs the app in-process against a file-backed SQLite database (so every
+commit pays for an fsync, as in production) and reports sessions/second.
+
+    python -m benchmarks.bulk_sessions [--items 1000]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.database import get_session
+from app.main import app
+
+
+def make_items(resource_id: int, n: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "resource_id": resource_id,
+            "started_at": (start + timedelta(hours=i)).isoformat(),
+            "ended_at": (start + timedelta(hours=i, minutes=40)).isoformat(),
+            "notes": f"offline session {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        SQLModel.metadata.create_all(engine)
+
+        def _get_session_override() -> Iterator[Session]:
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = _get_session_override
+        client = TestClient(app)
+        resource_id = client.post(
+            "/resources", json={"title": "Bench", "resource_type": "course"}
+        ).json()["id"]
+        items = make_items(resource_id, args.items)
+
+        t0 = time.perf_counter()
+        for item in items:
+            client.post("/sessions", json=item).raise_for_status()
+        single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        res = client.post("/sessions/bulk", json=items)
+        res.raise_for_status()
+        bulk = time.perf_counter() - t0
+        assert len(res.json()["created"]) == args.items
+
+        t0 = time.perf_counter()
+        client.post(
+            "/sessions/bulk",
+            content="\n".join(json.dumps(i) for i in items),
+            headers={"Content-Type": "application/x-ndjson"},
+        ).raise_for_status()
+        ndjson = time.perf_counter() - t0
+
+        app.dependency_overrides.clear()
+
+    n = args.items
+    print(f"single POST /sessions : {n / single:>10.0f} sessions/s")
+    print(f"bulk JSON array       : {n / bulk:>10.0f} sessions/s")
+    print(f"bulk NDJSON           : {n / ndjson:>10.0f} sessions/s")
+    print(f"speedup (JSON array)  : {single / bulk:>10.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
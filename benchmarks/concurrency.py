@@ -0,0 +1,188 @@
+"""
+Requests/second of the sync app (``app.main``) versus the async app
+(``app.async_main``) at several client concurrency levels.
+
+Each app runs in its own uvicorn subprocess against a seeded temporary
+database; an httpx client keeps ``--concurrency`` requests in flight for
+``--seconds`` and counts completed responses. The mix is read-heavy:
+resource listings, single-resource reads and the stats overview.
+
+    python -m benchmarks.concurrency [--concurrency 50 500] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+N_RESOURCES = 200
+# same pool for both apps; the sync app can use at most 40 (threadpool size)
+POOL = {"pool_size": 20, "max_overflow": 20, "pool_timeout": 60}
+PATHS = ["/resources?limit=20", "/stats/overview"] + [
+    f"/resources/{i}" for i in range(1, 21)
+]
+
+
+def serve(app_name: str, db_path: str, port: int) -> None:
+    """Run one app under uvicorn with its session dependency on ``db_path``."""
+    import uvicorn
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import Session, create_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.database import get_async_session, get_session
+
+    if app_name == "async":
+        from app.async_main import app
+
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{db_path}", **POOL
+        )
+
+        async def _async_override() -> AsyncIterator[AsyncSession]:
+            async with AsyncSession(async_engine, expire_on_commit=False) as s:
+                yield s
+
+        app.dependency_overrides[get_async_session] = _async_override
+    else:
+        from app.main import app
+
+        engine = create_engine(f"sqlite:///{db_path}", **POOL)
+
+        def _override() -> Iterator[Session]:
+            with Session(engine) as s:
+                yield s
+
+        app.dependency_overrides[get_session] = _override
+
+    # skip the startup hook: it would create tables in the default database
+    app.router.on_startup.clear()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(db_path: str) -> None:
+    from sqlmodel import Session, SQLModel, create_engine
+
+    from app import aggregates
+    from benchmarks.overview_scaling import seed as seed_rows
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    seed_rows(engine, N_RESOURCES, random.Random(7))
+    with Session(engine) as session:
+        aggregates.rebuild(session)
+        session.commit()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def wait_ready(base_url: str) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/stats/overview")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+async def drive(base_url: str, concurrency: int, seconds: float) -> Dict[str, float]:
+    limits = httpx.Limits(max_connections=concurrency)
+    done = 0
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+
+        async def worker(seed: int) -> None:
+            nonlocal done, errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                try:
+                    res = await client.get(rng.choice(PATHS))
+                    if res.status_code >= 500:
+                        errors += 1
+                    else:
+                        done += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"rps": done / elapsed, "errors": errors}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument(
+        "--serve", nargs=3, metavar=("APP", "DB", "PORT"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve[0], args.serve[1], int(args.serve[2]))
+        return 0
+
+    results: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path)
+
+        for app_name in ("sync", "async"):
+            port = free_port()
+            proc = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.concurrency",
+                    "--serve",
+                    app_name,
+                    db_path,
+                    str(port),
+                ],
+                env={**os.environ, "PYTHONWARNINGS": "ignore"},
+            )
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(wait_ready(base_url))
+                for concurrency in args.concurrency:
+                    stats = asyncio.run(drive(base_url, concurrency, args.seconds))
+                    results.append(
+                        f"{app_name:>6} {concurrency:>12} {stats['rps']:>10.0f} {stats['errors']:>8.0f}"
+                    )
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+
+    print(f"{'app':>6} {'concurrency':>12} {'req/s':>10} {'errors':>8}")
+    print("\n".join(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Fills ``resources`` and ``study_sessions`` (plus the label tables) at a
+given number of sessions, then rebuilds the derived tables so every read
+path sees consistent data. The same seed always produces the same rows.
+
+Skills and tags follow a Zipf-like popularity curve (a few labels are on
+most resources, a long tail is rare), resources get uneven amounts of
+study, and sessions cluster in the evening with log-normal durations.
+With ``notes`` every session gets a short note drawn from a Zipf-like
+vocabulary (for the search benchmark).
+
+    python -m benchmarks.datagen --scale 100k --out data/bench.db [--seed 0] [--notes]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Engine, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import aggregates, rollups, study_totals
+from app.models import ResourceDB, ResourceSkillDB, ResourceTagDB, StudySessionDB
+from app.schemas import ResourceStatus, ResourceType
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+SKILLS = [f"skill-{i}" for i in range(40)]
+TAGS = [f"tag-{i}" for i in range(60)]
+SESSIONS_PER_RESOURCE = 20  # on average
+INSERT_BATCH_SIZE = 10_000
+
+TYPE_WEIGHTS = {
+    ResourceType.course: 35,
+    ResourceType.book: 25,
+    ResourceType.video_series: 20,
+    ResourceType.article: 15,
+    ResourceType.other: 5,
+}
+STATUS_WEIGHTS = {
+    ResourceStatus.not_started: 25,
+    ResourceStatus.in_progress: 40,
+    ResourceStatus.completed: 25,
+    ResourceStatus.abandoned: 10,
+}
+# number of skills / tags on a resource
+SKILL_COUNT_WEIGHTS = [10, 40, 35, 15]  # 0..3
+TAG_COUNT_WEIGHTS = [15, 30, 30, 15, 10]  # 0..4
+
+# a few topic words, then a long tail of rarer ones
+NOTE_WORDS = [
+    "python", "sql", "postgresql", "index", "query", "review", "chapter",
+    "exercise", "recursion", "graph", "cache", "transaction", "vacuum",
+    "kubernetes", "docker", "rust", "ownership", "async", "closure", "testing",
+] + [f"term{i}" for i in range(5000)]
+NOTE_LENGTH = (4, 16)  # words
+
+START = datetime(2023, 1, 1)
+DAYS = 730
+
+
+@dataclass(frozen=True)
+class Generated:
+    resources: int
+    sessions: int
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+
+def _pick_labels(
+    rng: random.Random,
+    labels: Sequence[str],
+    weights: Sequence[float],
+    k: int,
+) -> List[str]:
+    picked: Dict[str, None] = {}
+    while len(picked) < k:
+        picked[rng.choices(labels, weights)[0]] = None
+    return list(picked)
+
+
+def _note(rng: random.Random, weights: Sequence[float]) -> str:
+    return " ".join(rng.choices(NOTE_WORDS, weights, k=rng.randint(*NOTE_LENGTH)))
+
+
+def _session_row(
+    rng: random.Random,
+    resource_id: int,
+    note_weights: Optional[Sequence[float]] = None,
+) -> Dict[str, Any]:
+    day = START + timedelta(days=rng.randrange(DAYS))
+    # mostly evenings, some mornings / late nights
+    hour = min(23.99, max(0.0, rng.gauss(19.0, 3.0)))
+    started_at = day + timedelta(hours=hour)
+    # median 30 min, clipped to 5 min .. 4 h
+    seconds = round(min(4 * 3600, max(300, rng.lognormvariate(math.log(1800), 0.6))))
+    return {
+        "resource_id": resource_id,
+        "started_at": started_at,
+        "ended_at": started_at + timedelta(seconds=seconds),
+        "duration_seconds": seconds,
+        "notes": _note(rng, note_weights) if note_weights else None,
+    }
+
+
+def generate(
+    engine: Engine,
+    n_sessions: int,
+    seed: int = 0,
+    sessions_per_resource: int = SESSIONS_PER_RESOURCE,
+    notes: bool = False,
+) -> Generated:
+    """Insert ``n_sessions`` sessions over ``n_sessions / sessions_per_resource``
+    resources into an empty schema, then rebuild the derived tables."""
+    rng = random.Random(seed)
+    n_resources = max(1, n_sessions // sessions_per_resource)
+    skill_weights = _zipf_weights(len(SKILLS))
+    tag_weights = _zipf_weights(len(TAGS))
+    note_weights = _zipf_weights(len(NOTE_WORDS)) if notes else None
+
+    resources: List[Dict[str, Any]] = []
+    skill_rows: List[Dict[str, Any]] = []
+    tag_rows: List[Dict[str, Any]] = []
+    for rid in range(1, n_resources + 1):
+        skills = _pick_labels(
+            rng, SKILLS, skill_weights, rng.choices(range(4), SKILL_COUNT_WEIGHTS)[0]
+        )
+        tags = _pick_labels(
+            rng, TAGS, tag_weights, rng.choices(range(5), TAG_COUNT_WEIGHTS)[0]
+        )
+        total_units = rng.choice([None, 10, 20, 40])
+        resources.append(
+            {
+                "id": rid,
+                "title": f"Resource {rid}",
+                "resource_type": rng.choices(
+                    list(TYPE_WEIGHTS), list(TYPE_WEIGHTS.values())
+                )[0],
+                "status": rng.choices(
+                    list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+                )[0],
+                "total_units": total_units,
+                "completed_units": 0,
+                "progress_percent": 0.0,
+                "tags": tags,
+                "target_skills": skills,
+            }
+        )
+        skill_rows.extend({"skill": s, "resource_id": rid} for s in skills)
+        tag_rows.extend({"tag": t, "resource_id": rid} for t in tags)
+
+    # a few resources get most of the study time
+    popularity = [rng.paretovariate(1.5) for _ in range(n_resources)]
+    owners = rng.choices(range(1, n_resources + 1), popularity, k=n_sessions)
+
+    with engine.begin() as conn:
+        conn.execute(insert(ResourceDB), resources)
+        if skill_rows:
+            conn.execute(insert(ResourceSkillDB), skill_rows)
+        if tag_rows:
+            conn.execute(insert(ResourceTagDB), tag_rows)
+        for start in range(0, n_sessions, INSERT_BATCH_SIZE):
+            conn.execute(
+                insert(StudySessionDB),
+                [
+                    _session_row(rng, rid, note_weights)
+                    for rid in owners[start : start + INSERT_BATCH_SIZE]
+                ],
+            )
+
+    with Session(engine) as session:
+        aggregates.rebuild(session)
+        rollups.rebuild(session)
+        study_totals.rebuild(session)
+        session.commit()
+    return Generated(resources=n_resources, sessions=n_sessions)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="100k")
+    parser.add_argument("--out", type=Path, required=True, help="new SQLite file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--notes", action="store_true", help="fill session notes")
+    args = parser.parse_args()
+
+    if args.out.exists():
+        print(f"{args.out} already exists", file=sys.stderr)
+        return 1
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+
+    engine = create_engine(f"sqlite:///{args.out}")
+    SQLModel.metadata.create_all(engine)
+    t0 = time.perf_counter()
+    generated = generate(engine, SCALES[args.scale], seed=args.seed, notes=args.notes)
+    print(
+        f"{generated.resources} resources, {generated.sessions} sessions "
+        f"in {time.perf_counter() - t0:.1f}s -> {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Write throughput with and without group commit.
+
+N threads each log M study sessions against a file-backed SQLite database
+(engine settings from the environment, so ``DB_PROFILE`` applies). The
+direct mode calls ``services.create_study_session``, one commit per write.
+The grouped mode calls ``services.create_study_session_grouped``, whose
+writer thread commits up to ``--max-batch`` writes at once.
+
+    python -m benchmarks.group_commit [--threads 1 8 32] [--writes 50]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel
+
+from app import group_commit, services
+from app.database import EngineSettings, build_engine
+from app.schemas import ResourceCreate, StudySession, StudySessionBase
+
+Create = Callable[[StudySessionBase, Session], Optional[StudySession]]
+
+
+def run(
+    directory: Path, threads: int, writes: int, create: Create, grouped: bool
+) -> Tuple[float, int, float]:
+    """(committed writes/s, "database is locked" errors, mean batch size)"""
+    path = directory / f"{'grouped' if grouped else 'direct'}-{threads}.db"
+    settings = replace(EngineSettings.from_env(), url=f"sqlite:///{path}")
+    settings = replace(settings, pool_size=threads, max_overflow=threads)
+    engine = build_engine(settings)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        resource_id = services.create_resource(
+            ResourceCreate(title="Bench", resource_type="course"), session
+        ).id
+
+    errors: List[int] = []
+
+    def worker(offset: int) -> None:
+        start = datetime(2024, 1, 1) + timedelta(days=offset)
+        with Session(engine) as session:
+            for i in range(writes):
+                began = start + timedelta(minutes=i)
+                payload = StudySessionBase(
+                    resource_id=resource_id,
+                    started_at=began,
+                    ended_at=began + timedelta(minutes=1),
+                )
+                try:
+                    create(payload, session)
+                except OperationalError:
+                    session.rollback()
+                    errors.append(offset)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    mean_batch = 1.0
+    if grouped:
+        with Session(engine) as session:
+            committer = group_commit.committer_for(session)
+        committer.close()
+        mean_batch = committer.stats()["mean_batch"]
+    engine.dispose()
+    return (threads * writes - len(errors)) / elapsed, len(errors), mean_batch
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--writes", type=int, default=50, help="per thread")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    group_commit.settings = group_commit.GroupCommitSettings(
+        enabled=True, max_batch=args.max_batch, max_delay_ms=args.delay_ms
+    )
+
+    print(f"{'threads':>7} {'mode':>8} {'writes/s':>9} {'locked':>7} {'batch':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in args.threads:
+            for mode, create in (
+                ("direct", services.create_study_session),
+                ("grouped", services.create_study_session_grouped),
+            ):
+                rate, locked, batch = run(
+                    Path(tmp), threads, args.writes, create, mode == "grouped"
+                )
+                print(f"{threads:>7} {mode:>8} {rate:>9.0f} {locked:>7} {batch:>6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Cost of building large list responses: model path versus row fast path.
+
+The model path is what the list endpoints used to do: ORM objects, copied
+into pydantic ``Resource`` / ``StudySession`` models, then
+``jsonable_encoder`` + ``json.dumps``. The row fast path selects the schema's
+columns as tuples and encodes plain dicts with orjson
+(``services.list_*_page_rows`` + ``http_cache.encode``). Both build the same
+JSON for a 10k-row page.
+
+    python -m benchmarks.list_responses [--rows 10000] [--repeat 5]
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import services
+from app.http_cache import encode
+from app.schemas import ResourcePage, StudySessionPage
+
+from .datagen import generate
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    # one session per resource: args.rows of each
+    generate(engine, args.rows, seed=0, sessions_per_resource=1)
+
+    n = args.rows
+    cases = {
+        "resources": (
+            lambda s: json.dumps(
+                jsonable_encoder(ResourcePage(items=services.list_resources(s, limit=n)))
+            ),
+            lambda s: encode(services.list_resources_page_rows(s, n)),
+        ),
+        "sessions": (
+            lambda s: json.dumps(
+                jsonable_encoder(
+                    StudySessionPage(items=services.list_study_sessions(s, limit=n))
+                )
+            ),
+            lambda s: encode(services.list_study_sessions_page_rows(s, n)),
+        ),
+    }
+
+    print(f"{'page':<10} {'rows':>6} {'models ms':>10} {'rows ms':>10} {'speedup':>8}")
+    with Session(engine) as session:
+        for name, (models, rows) in cases.items():
+            assert json.loads(models(session)) == json.loads(rows(session))
+            before = best_of(args.repeat, lambda m=models: m(session))
+            after = best_of(args.repeat, lambda r=rows: r(session))
+            print(
+                f"{name:<10} {n:>6} {before * 1000:>10.1f} {after * 1000:>10.1f}"
+                f" {before / after:>7.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,430 @@
+"""
+Mixed read/write HTTP load test of ``app.main`` with SQLite lock reporting.
+
+Seeds a temporary file database with ``benchmarks.datagen``, then keeps
+``--clients`` concurrent clients issuing a weighted mix of requests for
+``--seconds``. The app runs either in-process (httpx over ASGI, the
+default) or under uvicorn on localhost (``--server``). Engine settings come
+from the usual environment variables, so configurations are compared by
+running the harness once per setting, e.g. ``DB_PROFILE=tuned``.
+
+Reports throughput and p50/p95/p99 latency per operation, plus SQLite lock
+contention measured on the engine: write statements / commits that took
+longer than ``--lock-wait-ms`` (waiting on another connection's lock) and
+"database is locked" failures (which the app answers with a 503).
+
+    python -m benchmarks.loadtest [--clients 50] [--seconds 20] \\
+        [--mix list_resources=30,create_session=15,...] [--server] \\
+        [--report loadtest.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel
+
+from app.database import EngineSettings, build_engine, get_session, is_database_locked
+
+from .concurrency import free_port, wait_ready
+from .datagen import SKILLS, generate
+
+# name -> weight; override with --mix
+DEFAULT_MIX = {
+    "list_resources": 30,
+    "get_resource": 20,
+    "list_sessions": 15,
+    "overview": 15,
+    "create_session": 15,
+    "update_resource": 4,
+    "create_resource": 1,
+}
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]  # method, url, json body
+
+
+def make_request(op: str, rng: random.Random, n_resources: int) -> Request:
+    rid = rng.randint(1, n_resources)
+    if op == "list_resources":
+        if rng.random() < 0.5:
+            return ("GET", f"/resources?limit=20&skill={rng.choice(SKILLS)}", None)
+        return ("GET", "/resources?limit=20", None)
+    if op == "get_resource":
+        return ("GET", f"/resources/{rid}", None)
+    if op == "list_sessions":
+        return ("GET", f"/sessions?resource_id={rid}&limit=50", None)
+    if op == "overview":
+        return ("GET", "/stats/overview", None)
+    if op == "create_session":
+        began = datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(500_000))
+        body = {
+            "resource_id": rid,
+            "started_at": began.isoformat(),
+            "ended_at": (began + timedelta(minutes=rng.randint(5, 90))).isoformat(),
+        }
+        return ("POST", "/sessions", body)
+    if op == "update_resource":
+        return ("PATCH", f"/resources/{rid}", {"completed_units": rng.randint(0, 40)})
+    if op == "create_resource":
+        body = {
+            "title": f"Load test {rng.random():.6f}",
+            "resource_type": "article",
+            "target_skills": [rng.choice(SKILLS)],
+        }
+        return ("POST", "/resources", body)
+    raise ValueError(f"unknown operation {op!r}")
+
+
+# ---------- SQLite lock probe ----------
+
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@dataclass
+class LockStats:
+    threshold_ms: float
+    write_statements: int = 0
+    commits: int = 0
+    lock_waits: int = 0  # writes / commits slower than threshold_ms
+    lock_wait_seconds: float = 0.0
+    locked_errors: int = 0  # gave up after busy_timeout
+
+
+class LockProbe:
+    """Times write statements and commits on an engine.
+
+    SQLite blocks inside the statement that needs a lock (the first write
+    of a transaction, or COMMIT in rollback-journal mode) for up to
+    ``busy_timeout``. A write that takes much longer than a write normally
+    takes was waiting on another connection.
+    """
+
+    def __init__(self, engine: Engine, threshold_ms: float) -> None:
+        self.stats = LockStats(threshold_ms=threshold_ms)
+        self._threshold = threshold_ms / 1000
+        self._lock = threading.Lock()
+
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._error)
+
+        # there is no "after commit" connection event; time the DBAPI call
+        dialect = engine.dialect
+        do_commit = dialect.do_commit
+
+        def timed_commit(dbapi_connection: Any) -> None:
+            started = time.perf_counter()
+            try:
+                do_commit(dbapi_connection)
+            finally:
+                self._record("commits", time.perf_counter() - started)
+
+        dialect.do_commit = timed_commit  # type: ignore[method-assign]
+
+    def _record(self, counter: str, elapsed: float) -> None:
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+            if elapsed > self._threshold:
+                self.stats.lock_waits += 1
+                self.stats.lock_wait_seconds += elapsed
+
+    def _before(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info["loadtest_started"] = time.perf_counter()
+
+    def _after(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().upper().startswith(WRITE_PREFIXES):
+            elapsed = time.perf_counter() - conn.info.pop("loadtest_started")
+            self._record("write_statements", elapsed)
+
+    def _error(self, context: Any) -> None:
+        exc = context.sqlalchemy_exception
+        if isinstance(exc, OperationalError) and is_database_locked(exc):
+            with self._lock:
+                self.stats.locked_errors += 1
+
+
+# ---------- App setup ----------
+
+def setup_app(db_path: str, threshold_ms: float) -> Tuple[Any, LockProbe]:
+    """``app.main`` with its session dependency on ``db_path`` and a probe."""
+    from app.main import app
+
+    settings = replace(EngineSettings.from_env(), url=f"sqlite:///{db_path}")
+    engine = build_engine(settings)
+    probe = LockProbe(engine, threshold_ms)
+
+    def _override() -> Iterator[Session]:
+        with Session(engine) as s:
+            yield s
+
+    app.dependency_overrides[get_session] = _override
+    # skip the startup hook: it would create tables in the default database
+    app.router.on_startup.clear()
+    return app, probe
+
+
+def serve(db_path: str, port: int, threshold_ms: float, stats_path: str) -> None:
+    import uvicorn
+
+    app, probe = setup_app(db_path, threshold_ms)
+
+    @app.on_event("shutdown")
+    def _dump_lock_stats() -> None:
+        Path(stats_path).write_text(json.dumps(asdict(probe.stats)))
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(db_path: str, n_sessions: int) -> int:
+    engine = build_engine(
+        replace(EngineSettings.from_env(), url=f"sqlite:///{db_path}")
+    )
+    SQLModel.metadata.create_all(engine)
+    n_resources = generate(engine, n_sessions, seed=1).resources
+    engine.dispose()
+    return n_resources
+
+
+# ---------- Driver ----------
+
+@dataclass
+class OpStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    transport_errors: int = 0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    mix: Dict[str, int],
+    clients: int,
+    seconds: float,
+    n_resources: int,
+) -> Tuple[Dict[str, OpStats], float]:
+    ops = list(mix)
+    weights = list(mix.values())
+    results = {op: OpStats() for op in ops}
+    deadline = time.perf_counter() + seconds
+
+    async def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            method, url, body = make_request(op, rng, n_resources)
+            stats = results[op]
+            started = time.perf_counter()
+            try:
+                res = await client.request(method, url, json=body)
+            except httpx.HTTPError:
+                stats.transport_errors += 1
+                continue
+            stats.latencies.append(time.perf_counter() - started)
+            code = str(res.status_code)
+            stats.statuses[code] = stats.statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(clients)))
+    return results, time.perf_counter() - started
+
+
+def build_report(
+    config: Dict[str, Any],
+    results: Dict[str, OpStats],
+    elapsed: float,
+    lock_stats: Dict[str, Any],
+) -> Dict[str, Any]:
+    def summary(latencies: List[float], statuses: Dict[str, int], errors: int) -> Dict[str, Any]:
+        ordered = sorted(latencies)
+        failed = errors + sum(n for code, n in statuses.items() if code >= "500")
+        return {
+            "requests": len(ordered),
+            "rps": round(len(ordered) / elapsed, 1),
+            "failed": failed,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+            "statuses": dict(sorted(statuses.items())),
+        }
+
+    total_statuses: Dict[str, int] = {}
+    for stats in results.values():
+        for code, n in stats.statuses.items():
+            total_statuses[code] = total_statuses.get(code, 0) + n
+
+    return {
+        "config": config,
+        "elapsed_seconds": round(elapsed, 2),
+        "total": summary(
+            [lat for s in results.values() for lat in s.latencies],
+            total_statuses,
+            sum(s.transport_errors for s in results.values()),
+        ),
+        "operations": {
+            op: summary(s.latencies, s.statuses, s.transport_errors)
+            for op, s in results.items()
+        },
+        "sqlite": lock_stats,
+    }
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"expected name=weight with name in {sorted(DEFAULT_MIX)}, got {part!r}"
+            )
+        mix[name] = int(weight)
+    return mix
+
+
+def run_in_process(
+    db_path: str, args: argparse.Namespace, n_resources: int
+) -> Tuple[Dict[str, OpStats], float, Dict[str, Any]]:
+    app, probe = setup_app(db_path, args.lock_wait_ms)
+
+    async def run() -> Tuple[Dict[str, OpStats], float]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=60.0
+        ) as client:
+            return await drive(client, args.mix, args.clients, args.seconds, n_resources)
+
+    results, elapsed = asyncio.run(run())
+    return results, elapsed, asdict(probe.stats)
+
+
+def run_on_server(
+    db_path: str, args: argparse.Namespace, n_resources: int
+) -> Tuple[Dict[str, OpStats], float, Dict[str, Any]]:
+    port = free_port()
+    stats_path = str(Path(db_path).with_suffix(".locks.json"))
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.loadtest",
+            "--serve",
+            db_path,
+            str(port),
+            str(args.lock_wait_ms),
+            stats_path,
+        ],
+        env={**os.environ, "PYTHONWARNINGS": "ignore"},
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(base_url))
+
+        async def run() -> Tuple[Dict[str, OpStats], float]:
+            limits = httpx.Limits(max_connections=args.clients)
+            async with httpx.AsyncClient(
+                base_url=base_url, limits=limits, timeout=60.0
+            ) as client:
+                return await drive(
+                    client, args.mix, args.clients, args.seconds, n_resources
+                )
+
+        results, elapsed = asyncio.run(run())
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    lock_stats = json.loads(Path(stats_path).read_text())
+    return results, elapsed, lock_stats
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{'operation':>16} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        f" {'p99 ms':>8} {'failed':>7}"
+    )
+    rows: List[Tuple[str, Dict[str, Any]]] = list(report["operations"].items())
+    rows.append(("total", report["total"]))
+    for name, row in rows:
+        print(
+            f"{name:>16} {row['requests']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.1f}"
+            f" {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['failed']:>7}"
+        )
+    locks = report["sqlite"]
+    print(
+        f"sqlite: {locks['write_statements']} writes, {locks['commits']} commits,"
+        f" {locks['lock_waits']} waited >{locks['threshold_ms']:g} ms"
+        f" ({locks['lock_wait_seconds']:.2f} s total),"
+        f" {locks['locked_errors']} 'database is locked' errors"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--sessions", type=int, default=10_000, help="seeded rows")
+    parser.add_argument("--lock-wait-ms", type=float, default=20.0)
+    parser.add_argument("--server", action="store_true", help="run under uvicorn")
+    parser.add_argument("--report", type=Path, help="write the JSON report here")
+    parser.add_argument(
+        "--serve", nargs=4, metavar=("DB", "PORT", "MS", "OUT"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve[0], int(args.serve[1]), float(args.serve[2]), args.serve[3])
+        return 0
+
+    run: Callable[..., Tuple[Dict[str, OpStats], float, Dict[str, Any]]] = (
+        run_on_server if args.server else run_in_process
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "loadtest.db")
+        n_resources = seed(db_path, args.sessions)
+        results, elapsed, lock_stats = run(db_path, args, n_resources)
+
+    settings = EngineSettings.from_env()
+    config = {
+        "mode": "server" if args.server else "in-process",
+        "clients": args.clients,
+        "seconds": args.seconds,
+        "mix": args.mix,
+        "seeded_sessions": args.sessions,
+        "db_profile": os.environ.get("DB_PROFILE", "default"),
+        "engine": {k: v for k, v in asdict(settings).items() if k != "url"},
+    }
+    report = build_report(config, results, elapsed, lock_stats)
+    print_report(report)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Scaling benchmark for the overview stats computed from the raw tables.
+
+``/stats/overview`` reads the maintained ``stats_aggregates`` rows, whose
+cost does not depend on the data size; what has to scale is recomputing
+them (``aggregates.rebuild``, also run by migrations and the CLI). Seeds an
+in-memory database at several sizes (sessions grow with resources, 20
+sessions per resource) and times the rebuild at each. The time per session
+must stay roughly flat; a quadratic implementation shows up as the
+per-session cost multiplying with every step.
+
+    python -m benchmarks.overview_scaling [--base 1000] [--steps 3]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import Engine, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import aggregates, services
+from app.models import ResourceDB, ResourceSkillDB, StudySessionDB
+from app.schemas import ResourceStatus, ResourceType
+
+SKILLS = [f"skill-{i}" for i in range(50)]
+SESSIONS_PER_RESOURCE = 20
+
+# allowed growth in per-session cost between the smallest and largest size
+MAX_COST_RATIO = 3.0
+
+
+def seed(engine: Engine, n_resources: int, rng: random.Random) -> None:
+    resources: List[Dict[str, Any]] = []
+    skills: List[Dict[str, Any]] = []
+    sessions: List[Dict[str, Any]] = []
+    start = datetime(2024, 1, 1)
+
+    for rid in range(1, n_resources + 1):
+        picked = rng.sample(SKILLS, rng.randint(0, 3))
+        resources.append(
+            {
+                "id": rid,
+                "title": f"Resource {rid}",
+                "resource_type": rng.choice(list(ResourceType)),
+                "status": rng.choice(list(ResourceStatus)),
+                "completed_units": 0,
+                "progress_percent": 0.0,
+                "tags": [],
+                "target_skills": picked,
+            }
+        )
+        skills.extend({"skill": s, "resource_id": rid} for s in picked)
+        for _ in range(SESSIONS_PER_RESOURCE):
+            began = start + timedelta(minutes=rng.randint(0, 500_000))
+            minutes = rng.randint(5, 180)
+            sessions.append(
+                {
+                    "resource_id": rid,
+                    "started_at": began,
+                    "ended_at": began + timedelta(minutes=minutes),
+                    "duration_seconds": minutes * 60,
+                }
+            )
+
+    with engine.begin() as conn:
+        conn.execute(insert(ResourceDB), resources)
+        if skills:
+            conn.execute(insert(ResourceSkillDB), skills)
+        conn.execute(insert(StudySessionDB), sessions)
+
+
+def time_rebuild(n_resources: int, repeat: int = 3) -> float:
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    seed(engine, n_resources, random.Random(42))
+
+    best = float("inf")
+    with Session(engine) as session:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            aggregates.rebuild(session)
+            session.flush()
+            best = min(best, time.perf_counter() - t0)
+        session.commit()
+
+        # the endpoint must see the seeded data, not an empty table
+        stats = services.compute_overview_stats(session)
+        assert stats["total_resources"] == n_resources, stats
+        assert stats["total_study_hours"] > 0, stats
+        assert stats["by_skill"], stats
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", type=int, default=1000, help="resources at step 1")
+    parser.add_argument("--steps", type=int, default=3, help="sizes, doubling each step")
+    args = parser.parse_args()
+
+    print(f"{'resources':>10} {'sessions':>10} {'seconds':>10} {'us/session':>11}")
+    costs = []
+    for step in range(args.steps):
+        n = args.base * 2**step
+        elapsed = time_rebuild(n)
+        per_session = elapsed / (n * SESSIONS_PER_RESOURCE)
+        costs.append(per_session)
+        print(f"{n:>10} {n * SESSIONS_PER_RESOURCE:>10} {elapsed:>10.3f} {per_session * 1e6:>11.2f}")
+
+    ratio = costs[-1] / costs[0]
+    print(f"per-session cost ratio largest/smallest: {ratio:.2f}")
+    if ratio > MAX_COST_RATIO:
+        print(f"FAIL: superlinear scaling (ratio > {MAX_COST_RATIO})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
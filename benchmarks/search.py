@@ -0,0 +1,96 @@
+"""
+Full-text search over session notes: FTS5 versus a LIKE scan.
+
+Generates ``--sessions`` sessions with notes (1M by default) into a
+file-backed SQLite database. The FTS triggers index them as they are
+inserted. Then each query runs through ``services.search_page`` and
+through the ``notes LIKE '%word%'`` scan it replaces, which has to read
+every match to rank them. Terms range from rare to very common, alone and
+with a status filter (LIKE counts ignore the filter).
+
+    python -m benchmarks.search [--sessions 1000000] [--repeat 5]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from sqlmodel import Session, SQLModel, col, create_engine, select
+
+from app import services
+from app.models import StudySessionDB
+from app.schemas import ResourceStatus, SearchKind
+
+from .datagen import generate
+
+# (label, query, extra search_page kwargs)
+QUERIES = [
+    ("rare word", "term4000", {}),
+    ("common word", "python", {}),
+    ("two words", "python sql", {}),
+    ("prefix", "kuber", {}),
+    ("common + status", "python", {"status": ResourceStatus.completed}),
+]
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def like_scan(session: Session, words: str) -> Any:
+    # ranking needs every match, so the scan reads the whole table
+    stmt = select(StudySessionDB.id, StudySessionDB.notes)
+    for word in words.split():
+        stmt = stmt.where(col(StudySessionDB.notes).like(f"%{word}%"))
+    return session.exec(stmt).all()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'search.db'}")
+        SQLModel.metadata.create_all(engine)
+        t0 = time.perf_counter()
+        generate(engine, args.sessions, seed=0, notes=True)
+        print(
+            f"generated and indexed {args.sessions} notes "
+            f"in {time.perf_counter() - t0:.1f}s"
+        )
+
+        print(
+            f"{'query':<16} {'matches':>8} {'fts ms':>8} {'like ms':>8}"
+            f" {'speedup':>8}"
+        )
+        with Session(engine) as session:
+            for label, query, kwargs in QUERIES:
+                filters: Dict[str, Any] = {"kind": SearchKind.session, **kwargs}
+                matches = len(like_scan(session, query))
+                fts = best_of(
+                    args.repeat,
+                    lambda q=query, f=filters: services.search_page(
+                        session, q, args.limit, **f
+                    ),
+                )
+                like = best_of(args.repeat, lambda q=query: like_scan(session, q))
+                print(
+                    f"{label:<16} {matches:>8} {fts * 1000:>8.1f}"
+                    f" {like * 1000:>8.1f} {like / fts:>7.1f}x"
+                )
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Mixed read/write throughput of the ``default`` and ``tuned`` engine profiles.
+
+Writer threads insert study sessions through ``services`` while reader
+threads list resources and read the overview, all against one
+file-backed database per profile. Reports operations per second and how
+many operations failed with "database is locked".
+
+    python -m benchmarks.sqlite_profiles [--writers 4] [--readers 8] [--seconds 10]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel
+
+from app import services
+from app.database import PROFILES, build_engine
+from app.schemas import ResourceCreate, StudySessionBase
+
+
+def run_profile(
+    engine: Engine, writers: int, readers: int, seconds: float
+) -> Dict[str, float]:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        resource_id = services.create_resource(
+            ResourceCreate(
+                title="Bench", resource_type="course", target_skills=["sql"]
+            ),
+            session,
+        ).id
+
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    start = datetime(2024, 1, 1)
+
+    def bump(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def writer() -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            began = start + timedelta(minutes=i)
+            payload = StudySessionBase(
+                resource_id=resource_id,
+                started_at=began,
+                ended_at=began + timedelta(minutes=30),
+            )
+            try:
+                with Session(engine) as session:
+                    services.create_study_session(payload, session)
+                bump("writes")
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                bump("locked")
+
+    def reader() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                with Session(engine) as session:
+                    services.list_resources_page_rows(session, limit=20)
+                    services.compute_overview_stats(session)
+                bump("reads")
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                bump("locked")
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "writes/s": counts["writes"] / elapsed,
+        "reads/s": counts["reads"] / elapsed,
+        "locked": counts["locked"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'writes/s':>10} {'reads/s':>10} {'locked':>8}")
+    for name, profile in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_engine(
+                replace(profile, url=f"sqlite:///{Path(tmp) / 'bench.db'}")
+            )
+            stats = run_profile(engine, args.writers, args.readers, args.seconds)
+            engine.dispose()
+        print(
+            f"{name:>8} {stats['writes/s']:>10.0f} {stats['reads/s']:>10.0f}"
+            f" {stats['locked']:>8.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
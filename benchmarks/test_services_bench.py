@@ -0,0 +1,124 @@
+"""
+pytest-benchmark suite for the services layer on generated data.
+
+Not part of the normal test run (``testpaths`` is ``tests``). The database
+is generated once per run by ``benchmarks.datagen``; ``BENCH_SCALE`` picks
+1k / 100k / 1m sessions (default 100k). Engine settings come from the
+usual environment variables (``DB_PROFILE`` ...).
+
+    # run
+    python -m pytest benchmarks --benchmark-only
+
+    # compare with the stored baseline in benchmarks/baselines; fails when a
+    # min or median is >50% slower. This gate is run by hand, not in CI.
+    # Baselines are per machine: re-record one (last command) where the
+    # check runs.
+    OPTS="--benchmark-only --benchmark-storage=benchmarks/baselines \\
+          --benchmark-disable-gc --benchmark-warmup=on"
+    python -m pytest benchmarks $OPTS --benchmark-compare \\
+        --benchmark-compare-fail=min:50% --benchmark-compare-fail=median:50%
+    python -m pytest benchmarks $OPTS --benchmark-save=baseline
+"""
+import itertools
+import os
+from collections.abc import Iterator
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Engine
+from sqlmodel import Session, SQLModel
+
+from app import services
+from app.database import EngineSettings, build_engine
+from app.schemas import ResourceStatus, ResourceUpdate, StudySessionBase
+
+from .datagen import SCALES, START, generate
+
+pytest.importorskip("pytest_benchmark")
+
+PAGE = 100
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory: pytest.TempPathFactory) -> Engine:
+    path = tmp_path_factory.mktemp("bench") / "bench.db"
+    settings = replace(EngineSettings.from_env(), url=f"sqlite:///{path}")
+    engine = build_engine(settings)
+    SQLModel.metadata.create_all(engine)
+    generate(engine, SCALES[os.environ.get("BENCH_SCALE", "100k")], seed=0)
+    return engine
+
+
+@pytest.fixture
+def session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"status": ResourceStatus.in_progress},
+        {"resource_type": "book"},
+        {"tag": "tag-0"},  # most common tag
+        {"tag": "tag-59"},  # rare tag
+        {"skill": "skill-3"},
+        {"status": ResourceStatus.completed, "skill": "skill-0"},
+    ],
+    ids=["none", "status", "type", "tag-common", "tag-rare", "skill", "status+skill"],
+)
+def test_list_resources(benchmark, session: Session, filters) -> None:
+    page = benchmark(services.list_resources_page_rows, session, PAGE, **filters)
+    assert page["items"]
+
+
+def test_list_study_sessions(benchmark, session: Session) -> None:
+    page = benchmark(services.list_study_sessions_page_rows, session, PAGE)
+    assert len(page["items"]) == PAGE
+
+
+def test_list_study_sessions_for_resource_in_range(
+    benchmark, session: Session
+) -> None:
+    page = benchmark(
+        services.list_study_sessions_page_rows,
+        session,
+        PAGE,
+        resource_id=1,
+        started_from=START,
+        started_to=START + timedelta(days=365),
+    )
+    assert page is not None
+
+
+def test_compute_overview_stats(benchmark, session: Session) -> None:
+    stats = benchmark(services.compute_overview_stats, session)
+    assert stats["total_resources"] > 0
+
+
+def test_update_resource(benchmark, session: Session) -> None:
+    statuses = itertools.cycle([ResourceStatus.in_progress, ResourceStatus.abandoned])
+
+    def update() -> None:
+        services.update_resource(1, ResourceUpdate(status=next(statuses)), session)
+
+    benchmark(update)
+
+
+def test_create_study_session(benchmark, session: Session) -> None:
+    starts = (datetime(2030, 1, 1) + timedelta(hours=i) for i in itertools.count())
+
+    def create() -> None:
+        started_at = next(starts)
+        services.create_study_session(
+            StudySessionBase(
+                resource_id=1,
+                started_at=started_at,
+                ended_at=started_at + timedelta(minutes=30),
+            ),
+            session,
+        )
+
+    benchmark(create)
@@ -1,13 +1,85 @@
+import re
 from collections.abc import Iterator
+from typing import Any, List, Sequence, Tuple
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
 from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine
 
 from app import models  # noqa: F401  # ensure tables are registered
 from app.database import get_session
 from app.main import app
+from app.metrics import instrument_engine
+
+# tables that grow with usage; a SCAN of one of these is a regression
+LARGE_TABLES = (
+    "resources",
+    "resource_tags",
+    "resource_skills",
+    "study_sessions",
+    "study_rollups",
+)
+
+
+class QueryRecorder:
+    """Records the statements sent to ``engine`` inside ``with recorder:``.
+
+    ``scans()`` runs ``EXPLAIN QUERY PLAN`` on the recorded SELECTs and
+    returns the plan lines that scan one of ``tables``.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.queries: List[Tuple[str, Any]] = []
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # executemany: the first parameter set is enough to explain it
+        params = parameters[0] if executemany and parameters else parameters
+        self.queries.append((statement, params))
+
+    def __enter__(self) -> "QueryRecorder":
+        self.queries = []
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def plans(self) -> List[Tuple[str, List[str]]]:
+        plans = []
+        with self.engine.connect() as conn:
+            for statement, params in self.queries:
+                if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                    continue
+                rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)
+                plans.append((statement, [row[-1] for row in rows]))
+        return plans
+
+    def scans(self, tables: Sequence[str] = LARGE_TABLES) -> List[str]:
+        pattern = re.compile(rf"^SCAN ({'|'.join(map(re.escape, tables))})\b")
+        return [
+            f"{detail}  <-  {statement}"
+            for statement, details in self.plans()
+            for detail in details
+            if pattern.match(detail)
+        ]
+
+    def assert_budget(
+        self, max_queries: int, tables: Sequence[str] = LARGE_TABLES
+    ) -> None:
+        """At most ``max_queries`` statements and no SCAN of ``tables``."""
+        statements = "\n".join(statement for statement, _ in self.queries)
+        assert self.count <= max_queries, (
+            f"{self.count} queries (budget {max_queries}):\n{statements}"
+        )
+        scans = self.scans(tables)
+        assert not scans, "full table scans:\n" + "\n".join(scans)
 
 
 @pytest.fixture(scope="session")
@@ -19,6 +91,7 @@ def engine():
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    instrument_engine(engine)
     return engine
 
 
@@ -29,6 +102,12 @@ def db_session(engine) -> Iterator[Session]:
         yield session
 
 
+@pytest.fixture
+def query_recorder(engine) -> QueryRecorder:
+    """``with query_recorder: ...`` then ``query_recorder.assert_budget(n)``."""
+    return QueryRecorder(engine)
+
+
 @pytest.fixture(scope="session")
 def client(engine) -> TestClient:
     """FastAPI TestClient using the test DB via dependency override."""
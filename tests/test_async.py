@@ -0,0 +1,70 @@
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.async_main import app as async_app
+from app.database import get_async_session
+
+
+@pytest.fixture
+def async_client(tmp_path) -> Iterator[TestClient]:
+    """TestClient for the async app on a throwaway aiosqlite database."""
+    db_path = tmp_path / "async.db"
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{db_path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+    async def _get_async_session_override() -> AsyncIterator[AsyncSession]:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    async_app.dependency_overrides[get_async_session] = _get_async_session_override
+    yield TestClient(async_app)
+    async_app.dependency_overrides.clear()
+
+
+def test_async_app_resource_session_and_stats_flow(async_client: TestClient):
+    created = async_client.post(
+        "/resources",
+        json={
+            "title": "Async Python",
+            "resource_type": "video_series",
+            "total_units": 4,
+            "target_skills": ["asyncio"],
+        },
+    )
+    assert created.status_code == 200
+    resource_id = created.json()["id"]
+
+    patched = async_client.patch(
+        f"/resources/{resource_id}", json={"completed_units": 4}
+    )
+    assert patched.json()["status"] == "completed"
+
+    start = datetime(2024, 7, 1, 10, 0)
+    res = async_client.post(
+        "/sessions",
+        json={
+            "resource_id": resource_id,
+            "started_at": start.isoformat(),
+            "ended_at": (start + timedelta(hours=2)).isoformat(),
+        },
+    )
+    assert res.status_code == 200
+
+    sessions = async_client.get("/sessions", params={"resource_id": resource_id})
+    assert len(sessions.json()["items"]) == 1
+
+    stats = async_client.get("/stats/overview").json()
+    assert stats["completed_resources"] == 1
+    assert stats["by_skill"]["asyncio"] == {
+        "resources": 1,
+        "completed": 1,
+        "hours": 2.0,
+    }
+    assert async_client.get("/resources/999999").status_code == 404
@@ -0,0 +1,39 @@
+import pytest
+
+from app.database import PROFILES, EngineSettings, build_engine
+
+
+def test_engine_settings_from_env_profile_and_overrides():
+    settings = EngineSettings.from_env(
+        {
+            "DB_PROFILE": "tuned",
+            "DATABASE_URL": "sqlite:////tmp/other.db",
+            "DB_POOL_SIZE": "7",
+        }
+    )
+    assert settings.url == "sqlite:////tmp/other.db"
+    assert settings.async_url == "sqlite+aiosqlite:////tmp/other.db"
+    assert settings.journal_mode == "WAL"
+    assert settings.pool_size == 7
+
+    assert EngineSettings.from_env({}) == PROFILES["default"]
+    with pytest.raises(ValueError):
+        EngineSettings.from_env({"DB_PROFILE": "turbo"})
+
+
+def test_tuned_profile_applies_pragmas_on_connect(tmp_path):
+    settings = EngineSettings.from_env(
+        {"DB_PROFILE": "tuned", "DATABASE_URL": f"sqlite:///{tmp_path / 't.db'}"}
+    )
+    engine = build_engine(settings)
+
+    with engine.connect() as conn:
+
+        def pragma(name: str):
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 10000
+        assert pragma("cache_size") == -64000
+    engine.dispose()
@@ -22,7 +22,7 @@ def test_create_and_list_resources(client: TestClient):
 
     list_res = client.get("/resources")
     assert list_res.status_code == 200
-    all_resources = list_res.json()
+    all_resources = list_res.json()["items"]
     assert any(r["title"] == "FastAPI Course" for r in all_resources)
 
 def test_update_resource_progress(client: TestClient):
@@ -78,4 +78,801 @@ def test_stats_overview_counts_time_and_resources(client: TestClient):
     assert stats_res.status_code == 200
     stats = stats_res.json()
     assert stats["total_resources"] >= 1
-    assert stats["total_study_hours"] >= 1.0
\ No newline at end of file
+    assert stats["total_study_hours"] >= 1.0
+
+def test_list_resources_cursor_pagination(client: TestClient):
+    for i in range(3):
+        client.post(
+            "/resources",
+            json={
+                "title": f"Paged Article {i}",
+                "resource_type": "article",
+                "tags": ["paged"],
+            },
+        )
+
+    first = client.get("/resources", params={"tag": "paged", "limit": 2}).json()
+    assert [r["title"] for r in first["items"]] == [
+        "Paged Article 0",
+        "Paged Article 1",
+    ]
+    assert first["next_cursor"]
+
+    second = client.get(
+        "/resources",
+        params={"tag": "paged", "limit": 2, "cursor": first["next_cursor"]},
+    ).json()
+    assert [r["title"] for r in second["items"]] == ["Paged Article 2"]
+    assert second["next_cursor"] is None
+
+    bad = client.get("/resources", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_bulk_create_sessions_json_and_ndjson(client: TestClient):
+    import json
+
+    resource_id = client.post(
+        "/resources",
+        json={"title": "Offline Course", "resource_type": "course"},
+    ).json()["id"]
+    start = datetime(2024, 4, 1, 8, 0)
+
+    def item(minutes: int, rid: int = resource_id) -> dict:
+        return {
+            "resource_id": rid,
+            "started_at": start.isoformat(),
+            "ended_at": (start + timedelta(minutes=minutes)).isoformat(),
+        }
+
+    res = client.post(
+        "/sessions/bulk",
+        json=[item(30), item(-5), item(10, rid=999_999), {"notes": "x"}, item(20)],
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert [c["index"] for c in body["created"]] == [0, 4]
+    assert [e["index"] for e in body["errors"]] == [1, 2, 3]
+    assert body["errors"][1]["detail"] == "Resource not found"
+
+    ndjson = "\n".join([json.dumps(item(15)), "{not json", json.dumps(item(45))])
+    res = client.post(
+        "/sessions/bulk",
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    body = res.json()
+    assert [c["index"] for c in body["created"]] == [0, 2]
+    assert body["errors"] == [{"index": 1, "detail": "Invalid JSON"}]
+
+    sessions = client.get("/sessions", params={"resource_id": resource_id}).json()
+    assert len(sessions["items"]) == 4
+
+
+def test_export_sessions_streams_ndjson_and_csv(client: TestClient):
+    import csv
+    import io
+    import json
+
+    resource_id = client.post(
+        "/resources",
+        json={"title": "Export Course", "resource_type": "course", "tags": ["x"]},
+    ).json()["id"]
+    start = datetime(2023, 1, 1, 9, 0)
+    for day in range(3):
+        began = start + timedelta(days=day)
+        client.post(
+            "/sessions",
+            json={
+                "resource_id": resource_id,
+                "started_at": began.isoformat(),
+                "ended_at": (began + timedelta(minutes=30)).isoformat(),
+                "notes": f"day {day}, with a comma",
+            },
+        )
+
+    res = client.get(
+        "/export/sessions",
+        params={
+            "resource_id": resource_id,
+            "from": (start + timedelta(days=1)).isoformat(),
+        },
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [r["notes"] for r in rows] == ["day 1, with a comma", "day 2, with a comma"]
+    assert rows[0]["duration_seconds"] == 1800
+
+    res = client.get(
+        "/export/resources", params={"format": "csv", "resource_type": "course"}
+    )
+    assert res.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(res.text)))
+    exported = [r for r in records if r["id"] == str(resource_id)]
+    assert exported[0]["title"] == "Export Course"
+    assert json.loads(exported[0]["tags"]) == ["x"]
+    assert all(r["resource_type"] == "course" for r in records)
+
+
+def test_list_sessions_time_range_filter(client: TestClient):
+    import json
+
+    resource_id = client.post(
+        "/resources", json={"title": "Weekly Course", "resource_type": "course"}
+    ).json()["id"]
+    start = datetime(2022, 3, 1, 19, 0)
+    for day in range(10):
+        began = start + timedelta(days=day)
+        client.post(
+            "/sessions",
+            json={
+                "resource_id": resource_id,
+                "started_at": began.isoformat(),
+                "ended_at": (began + timedelta(minutes=20)).isoformat(),
+            },
+        )
+
+    res = client.get(
+        "/sessions",
+        params={
+            "resource_id": resource_id,
+            "from": datetime(2022, 3, 4).isoformat(),
+            "to": datetime(2022, 3, 11).isoformat(),
+        },
+    )
+    assert res.status_code == 200
+    days = [s["started_at"][:10] for s in res.json()["items"]]
+    assert days == [f"2022-03-{d:02d}" for d in range(4, 11)]
+
+    # sessions start at 19:00 UTC; 21:00+02:00 is that same instant
+    bounds = {
+        "resource_id": resource_id,
+        "from": "2022-03-04T21:00:00+02:00",
+        "to": "2022-03-11T21:00:00+02:00",
+    }
+    res = client.get("/sessions", params=bounds)
+    days = [s["started_at"][:10] for s in res.json()["items"]]
+    assert days == [f"2022-03-{d:02d}" for d in range(4, 11)]
+    res = client.get("/export/sessions", params=bounds)
+    days = [json.loads(line)["started_at"][:10] for line in res.text.splitlines()]
+    assert days == [f"2022-03-{d:02d}" for d in range(4, 11)]
+
+
+def test_stats_timeseries_filters_by_type_and_range(client: TestClient):
+    book_id = client.post(
+        "/resources",
+        json={
+            "title": "Timeseries Book",
+            "resource_type": "book",
+            "target_skills": ["timeseries"],
+        },
+    ).json()["id"]
+    video_id = client.post(
+        "/resources",
+        json={
+            "title": "Timeseries Videos",
+            "resource_type": "video_series",
+            "target_skills": ["timeseries"],
+        },
+    ).json()["id"]
+    for resource_id, day in [(book_id, 10), (book_id, 12), (video_id, 12)]:
+        client.post(
+            "/sessions",
+            json={
+                "resource_id": resource_id,
+                "started_at": datetime(2019, 5, day, 9, 0).isoformat(),
+                "ended_at": datetime(2019, 5, day, 10, 30).isoformat(),
+            },
+        )
+
+    res = client.get(
+        "/stats/timeseries",
+        params={
+            "skill": "timeseries",
+            "resource_type": "book",
+            "from": "2019-05-11",
+            "to": "2019-06-01",
+        },
+    )
+    assert res.status_code == 200
+    assert res.json() == {
+        "bucket": "day",
+        "points": [{"start": "2019-05-12", "hours": 1.5, "sessions": 1}],
+    }
+
+    res = client.get(
+        "/stats/timeseries", params={"skill": "timeseries", "bucket": "week"}
+    )
+    # Fri 10th and Sun 12th share the ISO week starting Mon 6th
+    assert res.json()["points"] == [
+        {"start": "2019-05-06", "hours": 4.5, "sessions": 3},
+    ]
+
+
+def test_conditional_get_and_response_cache(client: TestClient, monkeypatch):
+    from app import services
+
+    calls = []
+    compute = services.compute_overview_stats
+    monkeypatch.setattr(
+        services,
+        "compute_overview_stats",
+        lambda session: calls.append(1) or compute(session),
+    )
+    client.post("/resources", json={"title": "Polled Book", "resource_type": "book"})
+
+    first = client.get("/stats/overview")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert "last-modified" in first.headers
+
+    # unchanged data: 304 without running the endpoint, then a cache hit
+    res = client.get("/stats/overview", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+    res = client.get(
+        "/stats/overview",
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert res.status_code == 304
+    res = client.get("/stats/overview")
+    assert res.json() == first.json()
+    assert len(calls) == 1
+
+    # a write bumps the version
+    client.post("/resources", json={"title": "ETag Book", "resource_type": "book"})
+    res = client.get("/stats/overview", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+    assert res.json()["total_resources"] == first.json()["total_resources"] + 1
+    assert len(calls) == 2
+
+    # session writes change the resources' study totals, so their version too
+    resources = client.get("/resources", params={"limit": 1})
+    resource_id = resources.json()["items"][0]["id"]
+    client.post(
+        "/sessions",
+        json={
+            "resource_id": resource_id,
+            "started_at": datetime(2021, 1, 1, 9).isoformat(),
+            "ended_at": datetime(2021, 1, 1, 10).isoformat(),
+        },
+    )
+    res = client.get(
+        "/resources",
+        params={"limit": 1},
+        headers={"If-None-Match": resources.headers["etag"]},
+    )
+    assert res.status_code == 200
+    assert res.json()["items"][0]["session_count"] == (
+        resources.json()["items"][0]["session_count"] + 1
+    )
+
+
+def test_database_locked_maps_to_503(client: TestClient, monkeypatch):
+    import sqlite3
+
+    from sqlalchemy.exc import OperationalError
+
+    from app import services
+
+    def locked(*args, **kwargs):
+        raise OperationalError(
+            "INSERT", {}, sqlite3.OperationalError("database is locked")
+        )
+
+    monkeypatch.setattr(services, "create_resource", locked)
+    res = client.post("/resources", json={"title": "Busy", "resource_type": "book"})
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+    assert res.json() == {"detail": "database is locked"}
+
+
+def test_metrics_count_requests_and_queries(client: TestClient, monkeypatch):
+    monkeypatch.setenv("METRICS_SERVER_TIMING", "1")
+    resource_id = client.post(
+        "/resources", json={"title": "Metered Book", "resource_type": "book"}
+    ).json()["id"]
+    res = client.get(f"/resources/{resource_id}")
+    assert res.headers["server-timing"].startswith("app;dur=")
+    assert 'queries"' in res.headers["server-timing"]
+
+    res = client.get("/metrics")
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = res.text
+    labels = 'method="GET",route="/resources/{resource_id}"'
+    assert f'http_requests_total{{{labels},status="200"}}' in body
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}' in body
+    # unknown paths share one label value instead of one series per path
+    client.get("/no/such/path")
+    assert 'route="unmatched"' in client.get("/metrics").text
+    # at least the version check ran for the resource read
+    count_line = next(
+        line
+        for line in body.splitlines()
+        if line.startswith(f"http_request_db_queries_sum{{{labels}}}")
+    )
+    assert float(count_line.split()[-1]) >= 1
+
+
+def test_profiling_captures_token_requests_into_ring_buffer(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+
+    from app import profiling
+
+    monkeypatch.setattr(
+        profiling,
+        "settings",
+        profiling.ProfilingSettings(enabled=True, token="s3cret", directory=tmp_path),
+    )
+    monkeypatch.setattr(profiling, "store", profiling.ProfileStore(tmp_path, 2))
+    app = FastAPI()
+    profiling.install(app)
+
+    @app.get("/squares")
+    def squares(n: int = 10) -> dict:
+        return {"total": sum(i * i for i in range(n))}
+
+    client = TestClient(app)
+    res = client.get("/squares", params={"n": 100})
+    assert res.json() == {"total": 328350}
+    assert "x-profile-id" not in res.headers
+    res = client.get("/squares", headers={"X-Profile-Token": "wrong"})
+    assert "x-profile-id" not in res.headers
+
+    ids = [
+        client.get("/squares", params={"n": 1000, "profile": "s3cret"}).headers[
+            "x-profile-id"
+        ]
+        for _ in range(3)
+    ]
+
+    admin = {"X-Profile-Token": "s3cret"}
+    assert client.get("/admin/profiles").status_code == 403
+    listed = client.get("/admin/profiles", headers=admin).json()
+    # ring buffer of 2: the oldest capture is gone
+    assert [p["id"] for p in listed] == ids[:0:-1]
+    assert listed[0]["url"].endswith("/squares?n=1000")
+
+    text = client.get(
+        f"/admin/profiles/{ids[-1]}", params={"format": "text"}, headers=admin
+    )
+    assert "squares" in text.text
+    raw = client.get(f"/admin/profiles/{ids[-1]}", headers=admin)
+    assert raw.headers["content-type"] == "application/octet-stream"
+    assert client.get(f"/admin/profiles/{ids[0]}", headers=admin).status_code == 404
+
+
+def test_profiling_async_endpoints_leaves_out_other_coroutines():
+    import asyncio
+    import pstats
+
+    from app import profiling
+
+    def own_work() -> int:
+        return sum(range(1000))
+
+    def other_work() -> int:
+        return sum(range(1000))
+
+    async def endpoint() -> int:
+        total = own_work()
+        await asyncio.sleep(0.01)
+        return total + own_work()
+
+    async def other_request() -> None:
+        for _ in range(5):
+            other_work()
+            await asyncio.sleep(0)
+
+    async def main() -> profiling._Capture:
+        capture = profiling._Capture()
+        profiling._capture.set(capture)
+        wrapped = profiling._profile_endpoint(endpoint)
+        total, _ = await asyncio.gather(wrapped(), other_request())
+        assert total == 2 * own_work()
+        return capture
+
+    capture = asyncio.run(main())
+    assert capture.profile is not None
+    calls = {
+        func[2]: stat[1]
+        for func, stat in pstats.Stats(capture.profile).stats.items()
+    }
+    assert calls["own_work"] == 2
+    assert "other_work" not in calls
+
+
+def test_filtered_reads_stay_within_query_budget(client: TestClient, query_recorder):
+    resource_id = client.post(
+        "/resources",
+        json={
+            "title": "Indexed Course",
+            "resource_type": "course",
+            "tags": ["budget-tag"],
+            "target_skills": ["budget-skill"],
+        },
+    ).json()["id"]
+    client.post(
+        "/sessions",
+        json={
+            "resource_id": resource_id,
+            "started_at": "2024-03-01T10:00:00",
+            "ended_at": "2024-03-01T11:00:00",
+        },
+    )
+
+    # data version lookup + one indexed query each
+    for url in [
+        "/resources?tag=budget-tag",
+        "/resources?skill=budget-skill",
+        "/resources?status=in_progress",
+        "/resources?resource_type=course",
+        f"/sessions?resource_id={resource_id}",
+        "/sessions?from=2024-03-01T00:00:00&to=2024-03-02T00:00:00",
+        "/stats/timeseries?from=2024-03-01&to=2024-03-02",
+    ]:
+        with query_recorder:
+            assert client.get(url).status_code == 200
+        query_recorder.assert_budget(2)
+
+    # a miss loads the row, a hit reads just its version
+    for _ in range(2):
+        with query_recorder:
+            assert client.get(f"/resources/{resource_id}").status_code == 200
+        query_recorder.assert_budget(2)
+
+
+def test_sparse_fieldsets_narrow_select_and_payload(client: TestClient, query_recorder):
+    ids = [
+        client.post(
+            "/resources",
+            json={"title": f"Sparse {i}", "resource_type": "video_series", "tags": ["sparse"]},
+        ).json()["id"]
+        for i in range(3)
+    ]
+    client.post(
+        "/sessions",
+        json={
+            "resource_id": ids[0],
+            "started_at": "2024-04-01T10:00:00",
+            "ended_at": "2024-04-01T10:30:00",
+        },
+    )
+
+    with query_recorder:
+        res = client.get(
+            "/resources", params={"tag": "sparse", "fields": "title,status", "limit": 2}
+        )
+    page = res.json()
+    assert page["items"] == [
+        {"title": "Sparse 0", "status": "not_started"},
+        {"title": "Sparse 1", "status": "not_started"},
+    ]
+    # the JSON label columns are not read at all
+    listing = query_recorder.queries[-1][0]
+    assert "resources.title" in listing and "resources.tags" not in listing
+
+    # the cursor still works without id in the payload
+    res = client.get(
+        "/resources",
+        params={"tag": "sparse", "fields": "id", "cursor": page["next_cursor"]},
+    )
+    assert res.json() == {"items": [{"id": ids[2]}], "next_cursor": None}
+
+    res = client.get(f"/resources/{ids[1]}", params={"fields": "id, progress_percent"})
+    assert res.json() == {"id": ids[1], "progress_percent": 0.0}
+
+    res = client.get(
+        "/sessions", params={"resource_id": ids[0], "fields": "ended_at,notes"}
+    )
+    assert res.json()["items"] == [{"ended_at": "2024-04-01T10:30:00", "notes": None}]
+
+    res = client.get("/resources", params={"fields": "title,secret"})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Unknown fields: secret"
+    assert client.get("/sessions", params={"fields": ","}).status_code == 400
+
+
+def test_group_commit_serves_session_and_progress_writes(client: TestClient, monkeypatch):
+    from app import group_commit
+
+    monkeypatch.setattr(
+        group_commit, "settings", group_commit.GroupCommitSettings(enabled=True)
+    )
+    resource_id = client.post(
+        "/resources", json={"title": "Grouped", "resource_type": "book", "total_units": 4}
+    ).json()["id"]
+    assert client.get(f"/resources/{resource_id}").json()["completed_units"] == 0
+
+    res = client.post(
+        "/sessions",
+        json={
+            "resource_id": resource_id,
+            "started_at": "2024-05-01T10:00:00",
+            "ended_at": "2024-05-01T11:00:00",
+        },
+    )
+    assert res.status_code == 200 and res.json()["id"] > 0
+    res = client.patch(f"/resources/{resource_id}", json={"completed_units": 4})
+    assert res.json()["status"] == "completed"
+    # the cached copy was dropped after the batch committed
+    assert client.get(f"/resources/{resource_id}").json()["completed_units"] == 4
+
+    bad = {
+        "resource_id": resource_id,
+        "started_at": "2024-05-01T11:00:00",
+        "ended_at": "2024-05-01T10:00:00",
+    }
+    assert client.post("/sessions", json=bad).status_code == 422
+    bad.update(resource_id=999_999, ended_at="2024-05-01T12:00:00")
+    assert client.post("/sessions", json=bad).status_code == 404
+    assert client.patch("/resources/999999", json={"completed_units": 1}).status_code == 404
+
+
+def test_bulk_update_resources_reports_each_item(client: TestClient):
+    course = client.post(
+        "/resources", json={"title": "Bulk Course", "resource_type": "course", "total_units": 8}
+    ).json()
+    book = client.post(
+        "/resources", json={"title": "Bulk Book", "resource_type": "book"}
+    ).json()
+    client.get(f"/resources/{course['id']}")  # cache it
+
+    res = client.patch(
+        "/resources/bulk",
+        json=[
+            {"id": course["id"], "completed_units": 99},
+            {"id": 999_999, "status": "completed"},
+            {"id": "not-a-number"},
+            {"id": book["id"], "status": "in_progress", "completed_units": 3},
+        ],
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert [u["index"] for u in body["updated"]] == [0, 3]
+    # clamped to total_units, which also completes the course
+    assert body["updated"][0]["resource"]["completed_units"] == 8
+    assert body["updated"][0]["resource"]["progress_percent"] == 100.0
+    assert body["updated"][0]["resource"]["status"] == "completed"
+    assert body["updated"][1]["resource"]["completed_units"] == 3
+    assert [e["index"] for e in body["errors"]] == [1, 2]
+    assert body["errors"][0]["detail"] == "Resource not found"
+
+    assert client.get(f"/resources/{course['id']}").json()["status"] == "completed"
+    assert client.patch("/resources/bulk", json={"id": 1}).status_code == 400
+
+
+def test_resources_sort_by_study_totals(client: TestClient):
+    ids = [
+        client.post(
+            "/resources",
+            json={"title": f"Sorted {i}", "resource_type": "book", "tags": ["sorted"]},
+        ).json()["id"]
+        for i in range(2)
+    ]
+    for minutes, resource_id in ((90, ids[1]), (20, ids[0]), (20, ids[1])):
+        client.post(
+            "/sessions",
+            json={
+                "resource_id": resource_id,
+                "started_at": datetime(2023, 3, 1, 8).isoformat(),
+                "ended_at": (
+                    datetime(2023, 3, 1, 8) + timedelta(minutes=minutes)
+                ).isoformat(),
+            },
+        )
+
+    res = client.get(
+        "/resources",
+        params={
+            "tag": "sorted",
+            "sort": "-total_seconds",
+            "limit": 1,
+            "fields": "id,total_seconds,session_count",
+        },
+    )
+    assert res.status_code == 200
+    assert res.json()["items"] == [
+        {"id": ids[1], "total_seconds": 6600, "session_count": 2}
+    ]
+    res = client.get(
+        "/resources",
+        params={
+            "tag": "sorted",
+            "sort": "-total_seconds",
+            "cursor": res.json()["next_cursor"],
+        },
+    )
+    assert [item["id"] for item in res.json()["items"]] == [ids[0]]
+
+    # cursors belong to one sort order
+    by_id = client.get("/resources", params={"limit": 1}).json()["next_cursor"]
+    res = client.get("/resources", params={"sort": "session_count", "cursor": by_id})
+    assert res.status_code == 400
+    assert client.get("/resources", params={"sort": "title"}).status_code == 422
+
+
+def test_rebuild_commands_change_the_etag(client: TestClient, db_session):
+    from sqlalchemy import text
+
+    from app import cli
+
+    client.post("/resources", json={"title": "Drifted Book", "resource_type": "book"})
+    first = client.get("/stats/overview")
+    total = first.json()["total_resources"]
+
+    # drift the stored aggregates behind the app's back: no version bump
+    db_session.exec(
+        text(
+            "UPDATE stats_aggregates SET resources = resources + 100 "
+            "WHERE scope = 'status'"
+        )
+    )
+    db_session.commit()
+    etag = first.headers["etag"]
+    res = client.get("/stats/overview", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    for command in (
+        cli.rebuild_aggregates,
+        cli.rebuild_rollups,
+        cli.rebuild_search,
+    ):
+        assert command(db_session) == 0
+        res = client.get("/stats/overview", headers={"If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.json()["total_resources"] == total
+        etag = res.headers["etag"]
+
+    # the study totals on /resources likewise
+    resource_id = client.post(
+        "/resources", json={"title": "Drifted Course", "resource_type": "course"}
+    ).json()["id"]
+    path = f"/resources/{resource_id}"
+    etag = client.get(path).headers["etag"]
+    db_session.exec(
+        text(f"UPDATE resources SET total_seconds = 999 WHERE id = {resource_id}")
+    )
+    db_session.commit()
+    assert cli.rebuild_study_totals(db_session) == 0
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["total_seconds"] == 0
+
+
+def test_search_endpoint(client: TestClient):
+    resource = client.post(
+        "/resources",
+        json={"title": "Zettelkasten Method", "resource_type": "article"},
+    ).json()
+    for day in (2, 3):
+        client.post(
+            "/sessions",
+            json={
+                "resource_id": resource["id"],
+                "started_at": datetime(2022, 2, day, 20).isoformat(),
+                "ended_at": datetime(2022, 2, day, 21).isoformat(),
+                "notes": "linked zettelkasten notes",
+            },
+        )
+
+    res = client.get("/search", params={"q": "zettelkasten", "limit": 1})
+    assert res.status_code == 200
+    page = res.json()
+    # up to limit hits of each kind, in separate lists
+    assert [h["kind"] for h in page["resources"]] == ["resource"]
+    assert [h["kind"] for h in page["sessions"]] == ["session"]
+    # only the sessions have more
+    res = client.get(
+        "/search", params={"q": "zettelkasten", "cursor": page["next_cursor"]}
+    )
+    page = res.json()
+    assert page["resources"] == [] and len(page["sessions"]) == 1
+    assert page["next_cursor"] is None
+
+    res = client.get(
+        "/search",
+        params={"q": "zettelkasten", "kind": "session", "status": "completed"},
+    )
+    assert res.json() == {"resources": [], "sessions": [], "next_cursor": None}
+    assert client.get("/search", params={"q": "***"}).status_code == 400
+    assert client.get("/search", params={"q": "x", "cursor": "bad"}).status_code == 400
+
+
+def test_changes_endpoint_pages_deltas(client: TestClient, monkeypatch):
+    from app import changes
+
+    since = client.get("/changes", params={"limit": 1}).json()["next_since"]
+    while True:  # catch up with rows written by other tests
+        feed = client.get("/changes", params={"since": since}).json()
+        since = feed["next_since"]
+        if not feed["has_more"]:
+            break
+
+    resource = client.post(
+        "/resources", json={"title": "Sync Me", "resource_type": "video_series"}
+    ).json()
+    client.patch(f"/resources/{resource['id']}", json={"completed_units": 1})
+
+    res = client.get("/changes", params={"since": since, "limit": 1})
+    assert res.status_code == 200
+    page = res.json()
+    assert [(c["entity"], c["id"], c["op"]) for c in page["changes"]] == [
+        ("resource", resource["id"], "create")
+    ]
+    assert page["has_more"] and page["sessions"] == []
+    assert page["resources"][0]["completed_units"] == 1
+    res = client.get("/changes", params={"since": page["next_since"]})
+    assert [c["op"] for c in res.json()["changes"]] == ["update"]
+    assert not res.json()["has_more"]
+
+    monkeypatch.setattr(changes, "pruned_through", lambda session: since + 1)
+    res = client.get("/changes", params={"since": since})
+    assert res.status_code == 410
+    assert res.json()["since"] == since + 1
+    assert client.get("/changes", params={"since": -1}).status_code == 422
+
+
+def test_session_with_mixed_aware_and_naive_times(client: TestClient):
+    resource = client.post(
+        "/resources", json={"title": "Mixed Zones", "resource_type": "article"}
+    ).json()
+
+    # naive times are taken as UTC
+    res = client.post(
+        "/sessions",
+        json={
+            "resource_id": resource["id"],
+            "started_at": "2024-05-01T10:00:00Z",
+            "ended_at": "2024-05-01T12:30:00",
+        },
+    )
+    assert res.status_code == 200
+    assert res.json()["started_at"] == "2024-05-01T10:00:00"
+    res = client.post(
+        "/sessions",
+        json={
+            "resource_id": resource["id"],
+            "started_at": "2024-05-02T10:00:00",
+            "ended_at": "2024-05-02T11:00:00+02:00",  # 09:00 UTC
+        },
+    )
+    assert res.status_code == 422
+
+    stored = client.get(f"/resources/{resource['id']}").json()
+    assert (stored["total_seconds"], stored["session_count"]) == (9000, 1)
+
+
+def test_bulk_sessions_with_mixed_aware_and_naive_times(client: TestClient):
+    resource_id = client.post(
+        "/resources", json={"title": "Mixed Batch", "resource_type": "course"}
+    ).json()["id"]
+
+    def item(started_at: str, ended_at: str) -> dict:
+        return {
+            "resource_id": resource_id,
+            "started_at": started_at,
+            "ended_at": ended_at,
+        }
+
+    res = client.post(
+        "/sessions/bulk",
+        json=[
+            item("2024-06-01T09:00:00", "2024-06-01T10:00:00"),
+            item("2024-06-02T08:00:00Z", "2024-06-02T08:30:00"),
+            # 07:00 UTC, before its naive start
+            item("2024-06-03T08:00:00", "2024-06-03T09:00:00+02:00"),
+            item("2024-05-31T20:00:00-02:00", "2024-05-31T22:15:00"),
+        ],
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert [c["index"] for c in body["created"]] == [0, 1, 3]
+    assert [e["index"] for e in body["errors"]] == [2]
+
+    stored = client.get(f"/resources/{resource_id}").json()
+    assert (stored["total_seconds"], stored["session_count"]) == (6300, 3)
+    assert stored["first_studied_at"] == "2024-05-31T22:00:00"
+    assert stored["last_studied_at"] == "2024-06-02T08:30:00"
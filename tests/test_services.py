@@ -9,6 +9,7 @@ from app.schemas import (
     ResourceStatus,
     ResourceUpdate,
     StudySessionBase,
+    TimeseriesBucket,
 )
 
 # --- Fixtures: test database + session ---
@@ -262,3 +263,906 @@ def test_compute_overview_stats(session: Session):
     assert "fastapi" in by_skill
     assert "algorithms" in by_skill
     assert by_skill["algorithms"]["completed"] == 1
+
+
+def test_list_resources_filters_by_skill_and_combined(session: Session):
+    r1 = services.create_resource(
+        ResourceCreate(
+            title="FastAPI Course",
+            resource_type="course",
+            tags=["backend", "python"],
+            target_skills=["fastapi", "rest-api"],
+        ),
+        session,
+    )
+    services.create_resource(
+        ResourceCreate(
+            title="Flask Book",
+            resource_type="book",
+            tags=["backend", "python"],
+            target_skills=["flask", "rest-api"],
+        ),
+        session,
+    )
+
+    rest = services.list_resources(session=session, skill="rest-api")
+    assert [r.title for r in rest] == ["FastAPI Course", "Flask Book"]
+
+    combined = services.list_resources(
+        session=session, tag="python", skill="fastapi", resource_type="course"
+    )
+    assert [r.id for r in combined] == [r1.id]
+
+    assert services.list_resources(session=session, tag="missing") == []
+
+
+def test_migration_backfills_labels_from_json_columns(engine):
+    from app.migrations import run_migrations
+    from app.models import ResourceDB
+
+    # rows written before the label tables existed only have the JSON copy
+    with Session(engine) as session:
+        session.add(
+            ResourceDB(
+                title="Legacy Course",
+                resource_type="course",
+                tags=["legacy", "legacy"],
+                target_skills=["sql"],
+            )
+        )
+        session.commit()
+
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        assert [r.title for r in services.list_resources(session, tag="legacy")] == [
+            "Legacy Course"
+        ]
+        assert len(services.list_resources(session, skill="sql")) == 1
+
+
+def test_list_study_sessions_page_walks_keyset_cursor(session: Session):
+    resource = services.create_resource(
+        ResourceCreate(title="SQL Course", resource_type="course"),
+        session,
+    )
+    start = datetime(2024, 1, 1, 9, 0)
+    # pairs of sessions share a start time, so the id tie-breaker matters
+    created_ids = []
+    for i in range(5):
+        created = services.create_study_session(
+            StudySessionBase(
+                resource_id=resource.id,
+                started_at=start + timedelta(hours=i // 2),
+                ended_at=start + timedelta(hours=3),
+            ),
+            session,
+        )
+        assert created is not None
+        created_ids.append(created.id)
+
+    seen = []
+    cursor = None
+    while True:
+        page = services.list_study_sessions_page_rows(
+            session, limit=2, cursor=cursor
+        )
+        assert len(page["items"]) <= 2
+        seen.extend(s["id"] for s in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == created_ids
+
+
+def test_compute_overview_stats_splits_hours_across_skills(session: Session):
+    course = services.create_resource(
+        ResourceCreate(
+            title="Full-stack Course",
+            resource_type="course",
+            target_skills=["python", "sql", "css"],
+        ),
+        session,
+    )
+    services.create_resource(
+        ResourceCreate(title="Untagged Video", resource_type="video_series"),
+        session,
+    )
+
+    start = datetime(2024, 3, 1, 18, 0)
+    for hours in (1, 2):
+        services.create_study_session(
+            StudySessionBase(
+                resource_id=course.id,
+                started_at=start,
+                ended_at=start + timedelta(hours=hours),
+            ),
+            session,
+        )
+
+    stats = services.compute_overview_stats(session)
+
+    assert stats["total_resources"] == 2
+    assert stats["total_study_hours"] == 3.0
+    assert stats["by_type"]["video_series"] == {"count": 1, "completed": 0}
+    assert stats["by_skill"] == {
+        skill: {"resources": 1, "completed": 0, "hours": 1.0}
+        for skill in ("python", "sql", "css")
+    }
+
+
+def test_overview_aggregates_match_raw_tables_and_rebuild(session: Session):
+    from app import aggregates
+    from app.models import StatsAggregateDB
+
+    book = services.create_resource(
+        ResourceCreate(
+            title="Designing Data-Intensive Applications",
+            resource_type="book",
+            total_units=12,
+            target_skills=["databases", "distributed-systems"],
+        ),
+        session,
+    )
+    start = datetime(2024, 5, 1, 20, 0)
+    services.create_study_session(
+        StudySessionBase(
+            resource_id=book.id,
+            started_at=start,
+            ended_at=start + timedelta(minutes=90),
+        ),
+        session,
+    )
+    services.update_resource(book.id, ResourceUpdate(completed_units=12), session)
+    services.update_resource(
+        book.id, ResourceUpdate(status=ResourceStatus.in_progress), session
+    )
+
+    assert aggregates.check(session) == []
+    stats = services.compute_overview_stats(session)
+    assert stats["in_progress_resources"] == 1
+    assert stats["completed_resources"] == 0
+    assert stats["by_skill"]["databases"]["hours"] == 0.75
+
+    # simulate drift, detect it, then repair
+    row = session.get(StatsAggregateDB, ("total", ""))
+    assert row is not None
+    row.seconds += 600
+    session.add(row)
+    session.commit()
+    assert aggregates.check(session) == [
+        "total/: stored [0, 0, 6000.0], expected [0, 0, 5400.0]"
+    ]
+
+    aggregates.rebuild(session)
+    session.commit()
+    assert aggregates.check(session) == []
+    assert services.compute_overview_stats(session) == stats
+
+
+def test_create_study_session_stores_duration_and_rejects_negative(
+    session: Session,
+):
+    from app.models import StudySessionDB
+
+    resource = services.create_resource(
+        ResourceCreate(title="Rust Book", resource_type="book"), session
+    )
+    start = datetime(2024, 2, 1, 7, 0)
+
+    created = services.create_study_session(
+        StudySessionBase(
+            resource_id=resource.id,
+            started_at=start,
+            ended_at=start + timedelta(minutes=45, seconds=30),
+        ),
+        session,
+    )
+    assert created is not None
+    db_session = session.get(StudySessionDB, created.id)
+    assert db_session is not None
+    assert db_session.duration_seconds == 2730
+
+    with pytest.raises(services.InvalidStudySession):
+        services.create_study_session(
+            StudySessionBase(
+                resource_id=resource.id,
+                started_at=start,
+                ended_at=start - timedelta(minutes=1),
+            ),
+            session,
+        )
+
+
+def test_create_study_sessions_bulk_keeps_aggregates_in_sync(session: Session):
+    from app import aggregates
+
+    resource = services.create_resource(
+        ResourceCreate(
+            title="Go Course", resource_type="course", target_skills=["go"]
+        ),
+        session,
+    )
+    start = datetime(2024, 6, 1, 12, 0)
+    result = services.create_study_sessions_bulk(
+        [
+            (
+                i,
+                StudySessionBase(
+                    resource_id=resource.id,
+                    started_at=start,
+                    ended_at=start + timedelta(minutes=30),
+                ),
+            )
+            for i in range(4)
+        ],
+        session,
+    )
+
+    assert [c.index for c in result.created] == [0, 1, 2, 3]
+    assert len({c.id for c in result.created}) == 4
+    assert result.errors == []
+    assert aggregates.check(session) == []
+    assert services.compute_overview_stats(session)["by_skill"]["go"]["hours"] == 2.0
+
+
+def test_study_rollups_split_sessions_across_midnight(session: Session):
+    from app import rollups
+
+    resource = services.create_resource(
+        ResourceCreate(
+            title="Night Owl Book",
+            resource_type="book",
+            target_skills=["rust", "wasm"],
+        ),
+        session,
+    )
+    # 23:00 -> 01:30 the next day: 1h on the 3rd, 1.5h on the 4th
+    services.create_study_session(
+        StudySessionBase(
+            resource_id=resource.id,
+            started_at=datetime(2024, 1, 3, 23, 0),
+            ended_at=datetime(2024, 1, 4, 1, 30),
+        ),
+        session,
+    )
+    services.create_study_sessions_bulk(
+        [
+            (
+                0,
+                StudySessionBase(
+                    resource_id=resource.id,
+                    started_at=datetime(2024, 1, 9, 8, 0),
+                    ended_at=datetime(2024, 1, 9, 10, 0),
+                ),
+            )
+        ],
+        session,
+    )
+
+    daily = services.compute_timeseries(session)
+    assert [(p.start.isoformat(), p.hours, p.sessions) for p in daily.points] == [
+        ("2024-01-03", 1.0, 1),
+        ("2024-01-04", 1.5, 0),
+        ("2024-01-05", 0.0, 0),
+        ("2024-01-06", 0.0, 0),
+        ("2024-01-07", 0.0, 0),
+        ("2024-01-08", 0.0, 0),
+        ("2024-01-09", 2.0, 1),
+    ]
+
+    # 2024-01-01 and 2024-01-08 are Mondays; skill time is split across 2 skills
+    weekly = services.compute_timeseries(
+        session,
+        bucket=TimeseriesBucket.week,
+        skill="rust",
+        day_from=datetime(2024, 1, 4).date(),
+    )
+    assert [(p.start.isoformat(), p.hours, p.sessions) for p in weekly.points] == [
+        ("2024-01-01", 0.75, 0),
+        ("2024-01-08", 1.0, 1),
+    ]
+
+    assert rollups.check(session) == []
+    rollups.rebuild(session)
+    assert rollups.check(session) == []
+
+
+def test_resource_cache_hits_and_invalidates_on_writes(engine, session: Session):
+    from sqlalchemy import update
+
+    from app import resource_cache
+    from app.models import ResourceDB
+
+    cache = resource_cache.cache_for(session)
+    resource, other = (
+        services.create_resource(
+            ResourceCreate(title=f"Cached Course {i}", resource_type="course"),
+            session,
+        )
+        for i in range(2)
+    )
+
+    assert services.get_resource_by_id(resource.id, session) == resource
+    assert services.get_resource_by_id(resource.id, session) == resource
+    assert services.get_resource_by_id(999, session) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # writes to other rows, sessions included, leave the entry valid
+    services.update_resource(
+        other.id, ResourceUpdate(status=ResourceStatus.in_progress), session
+    )
+    start = datetime(2024, 2, 1, 10, 0)
+    services.create_study_session(
+        StudySessionBase(
+            resource_id=other.id, started_at=start, ended_at=start + timedelta(hours=1)
+        ),
+        session,
+    )
+    assert services.get_resource_by_id(resource.id, session) == resource
+    assert cache.hits == 2
+
+    # a local write drops the entry
+    services.update_resource(
+        resource.id, ResourceUpdate(status=ResourceStatus.in_progress), session
+    )
+    assert services.get_resource_by_id(resource.id, session).status == (
+        ResourceStatus.in_progress
+    )
+    assert (cache.misses, cache.invalidations) == (3, 1)
+
+    # a write from another process only shows up as a new row version
+    with Session(engine) as writer:
+        writer.exec(
+            update(ResourceDB)
+            .where(ResourceDB.id == resource.id)
+            .values(version=ResourceDB.version + 1, completed_units=3)
+        )
+        writer.commit()
+    session.expire_all()
+    assert services.get_resource_by_id(resource.id, session).completed_units == 3
+    assert (cache.misses, cache.invalidations) == (4, 2)
+
+    cache.max_entries = 1
+    services.get_resource_by_id(other.id, session)
+    assert cache.evictions == 1
+
+    cache.ttl_seconds = 0
+    services.get_resource_by_id(other.id, session)
+    assert cache.expirations == 1
+    assert cache.stats()["size"] == 1
+
+
+def test_list_and_bulk_query_counts_do_not_grow_with_rows(
+    session: Session, query_recorder
+):
+    for i in range(20):
+        services.create_resource(
+            ResourceCreate(
+                title=f"Budget {i}",
+                resource_type="book",
+                tags=["budget", f"t{i}"],
+                target_skills=["reading"],
+            ),
+            session,
+        )
+    session.expire_all()
+
+    with query_recorder:
+        page = services.list_resources_page_rows(session, limit=50, tag="budget")
+    assert len(page["items"]) == 20
+    query_recorder.assert_budget(1)
+
+    start = datetime(2024, 7, 1, 9, 0)
+    items = [
+        (
+            i,
+            StudySessionBase(
+                resource_id=page["items"][i]["id"],
+                started_at=start,
+                ended_at=start + timedelta(minutes=20),
+            ),
+        )
+        for i in range(10)
+    ]
+    with query_recorder:
+        services.create_study_sessions_bulk(items, session)
+    baseline = query_recorder.count
+    with query_recorder:
+        services.create_study_sessions_bulk(items * 3, session)
+    # one statement per table, not one per item
+    assert query_recorder.count == baseline
+
+
+def test_list_page_rows_match_the_documented_schema(session: Session):
+    import json
+
+    from fastapi.encoders import jsonable_encoder
+
+    from app.http_cache import encode
+    from app.pagination import encode_cursor
+
+    for i in range(3):
+        resource = services.create_resource(
+            ResourceCreate(
+                title=f"Rows {i}", resource_type="article", tags=["rows"]
+            ),
+            session,
+        )
+        start = datetime(2024, 8, 1, 9, 0, 0, 250_000)
+        services.create_study_session(
+            StudySessionBase(
+                resource_id=resource.id,
+                started_at=start + timedelta(days=i),
+                ended_at=start + timedelta(days=i, minutes=15),
+                notes=None if i else "first",
+            ),
+            session,
+        )
+
+    models = services.list_resources(session, tag="rows", limit=2)
+    rows = services.list_resources_page_rows(session, limit=2, tag="rows")
+    assert json.loads(encode(rows["items"])) == jsonable_encoder(models)
+    assert rows["next_cursor"] == encode_cursor(models[-1].id)
+    rows = services.list_resources_page_rows(
+        session, limit=2, cursor=rows["next_cursor"], tag="rows"
+    )
+    assert [r["title"] for r in rows["items"]] == ["Rows 2"]
+
+    sessions = services.list_study_sessions(session, limit=2)
+    rows = services.list_study_sessions_page_rows(session, limit=2)
+    assert json.loads(encode(rows["items"])) == jsonable_encoder(sessions)
+    last = sessions[-1]
+    assert rows["next_cursor"] == encode_cursor(last.started_at.isoformat(), last.id)
+
+
+def test_group_committer_batches_jobs_and_isolates_failures(tmp_path):
+    from app.group_commit import GroupCommitter
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'group.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        resource = services.create_resource(
+            ResourceCreate(title="Batched", resource_type="course", total_units=10),
+            session,
+        )
+
+    committer = GroupCommitter(engine, max_batch=8, max_delay_ms=200)
+    start = datetime(2024, 9, 1, 8, 0)
+
+    def add(i: int):
+        payload = StudySessionBase(
+            resource_id=resource.id,
+            started_at=start + timedelta(hours=i),
+            ended_at=start + timedelta(hours=i, minutes=30),
+        )
+        return lambda s: services.add_study_session(payload, s)
+
+    def fail(s: Session):
+        raise RuntimeError("job failed")
+
+    futures = [committer.submit(add(i)) for i in range(5)]
+    failing = committer.submit(fail)
+    futures.append(
+        committer.submit(
+            lambda s: services.apply_resource_update(
+                resource.id, ResourceUpdate(completed_units=4), s
+            )
+        )
+    )
+    committer.close()
+
+    with pytest.raises(RuntimeError, match="job failed"):
+        failing.result()
+    created = [f.result() for f in futures[:5]]
+    assert len({c.id for c in created}) == 5
+    assert futures[-1].result().progress_percent == 40.0
+    # one transaction for the seven jobs (the failing one forced a rerun)
+    assert committer.stats()["batches"] == 1
+    assert committer.stats()["jobs"] == 6
+
+    with Session(engine) as session:
+        assert len(services.list_study_sessions(session, resource_id=resource.id)) == 5
+        assert services.get_resource_by_id(resource.id, session).completed_units == 4
+        assert services.compute_overview_stats(session)["total_study_hours"] == 2.5
+
+
+def test_update_resources_bulk_keeps_aggregates_in_sync(
+    session: Session, query_recorder
+):
+    from app import aggregates
+    from app.schemas import ResourceBulkUpdate
+
+    ids = [
+        services.create_resource(
+            ResourceCreate(
+                title=f"Bulk {i}",
+                resource_type="course",
+                total_units=10,
+                target_skills=["bulk"],
+            ),
+            session,
+        ).id
+        for i in range(3)
+    ]
+    items = [
+        ResourceBulkUpdate(id=ids[0], status=ResourceStatus.in_progress),
+        # same resource again: applied in order
+        ResourceBulkUpdate(id=ids[0], completed_units=10),
+        ResourceBulkUpdate(id=ids[1], completed_units=5),
+        ResourceBulkUpdate(id=ids[2], status=ResourceStatus.abandoned),
+    ]
+
+    with query_recorder:
+        result = services.update_resources_bulk(list(enumerate(items)), session)
+    selects = [q for q, _ in query_recorder.queries if q.startswith("SELECT")]
+    assert len(selects) == 1
+
+    assert [u.resource.status for u in result.updated] == [
+        ResourceStatus.in_progress,
+        ResourceStatus.completed,
+        ResourceStatus.not_started,
+        ResourceStatus.abandoned,
+    ]
+    assert result.updated[2].resource.progress_percent == 50.0
+    assert aggregates.check(session) == []
+    stats = services.compute_overview_stats(session)
+    assert stats["completed_resources"] == 1
+
+
+def test_study_totals_follow_session_writes_and_rebuild(session: Session):
+    from datetime import timezone
+
+    from app import study_totals
+    from app.models import ResourceDB
+    from app.schemas import ResourceSort
+
+    ids = [
+        services.create_resource(
+            ResourceCreate(title=f"Totals {i}", resource_type="book"), session
+        ).id
+        for i in range(3)
+    ]
+    start = datetime(2024, 6, 1, 9, 0)
+    services.create_study_session(
+        StudySessionBase(
+            resource_id=ids[0],
+            started_at=start,
+            ended_at=start + timedelta(minutes=30),
+        ),
+        session,
+    )
+    # tz-aware input is stored naive, like the sessions themselves
+    services.create_study_session(
+        StudySessionBase(
+            resource_id=ids[0],
+            started_at=(start - timedelta(days=1)).replace(tzinfo=timezone.utc),
+            ended_at=(start - timedelta(days=1, minutes=-10)).replace(
+                tzinfo=timezone.utc
+            ),
+        ),
+        session,
+    )
+    services.create_study_sessions_bulk(
+        [
+            (i, StudySessionBase(
+                resource_id=ids[1],
+                started_at=start + timedelta(days=i),
+                ended_at=start + timedelta(days=i, hours=1),
+            ))
+            for i in range(3)
+        ],
+        session,
+    )
+
+    first = services.get_resource_by_id(ids[0], session)
+    assert (first.total_seconds, first.session_count) == (2400, 2)
+    assert first.first_studied_at == start - timedelta(days=1)
+    assert first.last_studied_at == start + timedelta(minutes=30)
+    second = services.get_resource_by_id(ids[1], session)
+    assert (second.total_seconds, second.session_count) == (10800, 3)
+    assert second.last_studied_at == start + timedelta(days=2, hours=1)
+    assert services.get_resource_by_id(ids[2], session).last_studied_at is None
+    assert study_totals.check(session) == []
+
+    # sorted pages, walked one item at a time; NULLs sort last descending
+    for sort, expected in (
+        (ResourceSort.total_seconds_desc, [ids[1], ids[0], ids[2]]),
+        (ResourceSort.last_studied_at_desc, [ids[1], ids[0], ids[2]]),
+        (ResourceSort.first_studied_at, [ids[2], ids[0], ids[1]]),
+    ):
+        seen, cursor = [], None
+        while True:
+            page = services.list_resources_page_rows(
+                session, limit=1, cursor=cursor, sort=sort, fields=("id",)
+            )
+            seen += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert [i for i in seen if i in ids] == expected, sort
+
+    # simulate drift, detect it, then repair
+    row = session.get(ResourceDB, ids[2])
+    row.session_count = 5
+    session.add(row)
+    session.commit()
+    assert study_totals.check(session) == [
+        f"resource {ids[2]}: stored [0, 5, None, None], expected [0, 0, None, None]"
+    ]
+    study_totals.rebuild(session)
+    session.commit()
+    assert study_totals.check(session) == []
+
+
+def test_search_ranks_pages_and_filters_hits(session: Session):
+    from app.schemas import SearchKind
+
+    sql = services.create_resource(
+        ResourceCreate(
+            title="PostgreSQL Internals", resource_type="book", provider="Self"
+        ),
+        session,
+    )
+    ddia = services.create_resource(
+        ResourceCreate(
+            title="Designing Data-Intensive Applications",
+            resource_type="book",
+            provider="Postgres Weekly",
+        ),
+        session,
+    )
+    start = datetime(2024, 7, 1, 19, 0)
+    for i, notes in enumerate(
+        ["MVCC and vacuum in postgresql", None, "Café notes: B-tree indexes"]
+    ):
+        services.create_study_session(
+            StudySessionBase(
+                resource_id=ddia.id,
+                started_at=start + timedelta(days=i),
+                ended_at=start + timedelta(days=i, minutes=40),
+                notes=notes,
+            ),
+            session,
+        )
+
+    # words in any order, last one as a prefix; FTS5 syntax is plain text
+    page = services.search_page(session, "vacuum MVCC postg", limit=10)
+    hits = page.sessions
+    assert page.resources == []
+    assert [(h.kind, h.resource_id, h.title) for h in hits] == [
+        (SearchKind.session, ddia.id, ddia.title)
+    ]
+    assert hits[0].notes == "MVCC and vacuum in postgresql"
+    assert hits[0].started_at == start
+    # diacritics are folded
+    assert services.search_page(session, "cafe", limit=10).sessions[0].notes == (
+        "Café notes: B-tree indexes"
+    )
+    nothing = services.search_page(session, 'AND "NEAR(', limit=10)
+    assert nothing.resources == nothing.sessions == []
+    with pytest.raises(services.InvalidSearch):
+        services.search_page(session, " -- ", limit=10)
+
+    # a title match outranks a provider match; each kind pages by (rank, id)
+    # on its own and drops out of the cursor once it runs out
+    resources, sessions, cursor = [], [], None
+    while True:
+        page = services.search_page(session, "postgres", limit=1, cursor=cursor)
+        resources += [h.id for h in page.resources]
+        sessions += [h.id for h in page.sessions]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert resources == [sql.id, ddia.id]
+    assert len(sessions) == 1
+    only = services.search_page(
+        session, "postgres", limit=10, kind=SearchKind.resource
+    )
+    assert [h.id for h in only.resources] == [sql.id, ddia.id]
+    assert only.sessions == [] and only.next_cursor is None
+    assert [h.rank for h in only.resources] == sorted(
+        h.rank for h in only.resources
+    )
+
+    services.update_resource(
+        sql.id, ResourceUpdate(status=ResourceStatus.completed), session
+    )
+    completed = services.search_page(
+        session, "postgres", limit=10, status=ResourceStatus.completed
+    )
+    assert [h.id for h in completed.resources] == [sql.id]
+    assert completed.sessions == []
+
+
+def test_migration_builds_search_index_for_existing_rows(engine):
+    from app.migrations import MIGRATIONS, _build_search_index, run_migrations
+
+    with Session(engine) as session:
+        services.create_resource(
+            ResourceCreate(title="Legacy Rust Book", resource_type="book"), session
+        )
+    # a database from before the FTS tables existed
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE resources_fts")
+        conn.exec_driver_sql("DROP TABLE study_sessions_fts")
+        for trigger in ("insert", "update", "delete"):
+            conn.exec_driver_sql(f"DROP TRIGGER resources_fts_{trigger}")
+            conn.exec_driver_sql(f"DROP TRIGGER study_sessions_fts_{trigger}")
+        step = MIGRATIONS.index(_build_search_index)
+        conn.exec_driver_sql(f"PRAGMA user_version = {step}")
+
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        hits = services.search_page(session, "rust", limit=10).resources
+        assert [h.title for h in hits] == ["Legacy Rust Book"]
+
+
+def test_change_feed_follows_writes_and_compacts(session: Session):
+    from app import changes
+    from app.schemas import ChangeEntity, ChangeOp, ResourceBulkUpdate
+
+    resource = services.create_resource(
+        ResourceCreate(title="SICP", resource_type="book", total_units=5), session
+    )
+    services.update_resource(resource.id, ResourceUpdate(completed_units=2), session)
+    start = datetime(2024, 8, 1, 9, 0)
+    study = services.create_study_session(
+        StudySessionBase(
+            resource_id=resource.id,
+            started_at=start,
+            ended_at=start + timedelta(hours=1),
+        ),
+        session,
+    )
+    bulk = services.create_study_sessions_bulk(
+        [
+            (0, StudySessionBase(
+                resource_id=resource.id,
+                started_at=start + timedelta(days=1),
+                ended_at=start + timedelta(days=1, hours=1),
+            )),
+        ],
+        session,
+    )
+    services.update_resources_bulk(
+        [(0, ResourceBulkUpdate(id=resource.id, completed_units=5))], session
+    )
+
+    feed = services.change_feed(session, since=0, limit=100)
+    assert [(c.entity, c.id, c.op) for c in feed.changes] == [
+        (ChangeEntity.resource, resource.id, ChangeOp.create),
+        (ChangeEntity.resource, resource.id, ChangeOp.update),
+        (ChangeEntity.session, study.id, ChangeOp.create),
+        (ChangeEntity.resource, resource.id, ChangeOp.update),
+        (ChangeEntity.session, bulk.created[0].id, ChangeOp.create),
+        (ChangeEntity.resource, resource.id, ChangeOp.update),
+        (ChangeEntity.resource, resource.id, ChangeOp.update),
+    ]
+    # entities come back once, in their current state
+    assert [r.status for r in feed.resources] == [ResourceStatus.completed]
+    assert feed.resources[0].session_count == 2
+    assert [s.id for s in feed.sessions] == [study.id, bulk.created[0].id]
+
+    # paging by seq
+    page = services.change_feed(session, since=0, limit=3)
+    assert page.has_more and page.next_since == feed.changes[2].seq
+    rest = services.change_feed(session, since=page.next_since, limit=100)
+    assert rest.changes == feed.changes[3:] and not rest.has_more
+    assert services.change_feed(session, rest.next_since, 100).changes == []
+
+    # compaction keeps the latest entry per entity ...
+    result = changes.compact(session, retention_days=30)
+    session.commit()
+    assert (result.superseded, result.expired, result.pruned_through) == (4, 0, 0)
+    compacted = services.change_feed(session, since=0, limit=100)
+    assert [c.seq for c in compacted.changes] == [
+        feed.changes[2].seq,
+        feed.changes[4].seq,
+        feed.changes[6].seq,
+    ]
+
+    # ... and drops old ones; clients behind the watermark must resync
+    later = datetime.utcnow() + timedelta(days=31)
+    result = changes.compact(session, retention_days=30, now=later)
+    session.commit()
+    assert result.expired == 3 and result.pruned_through == feed.changes[6].seq
+    with pytest.raises(services.ChangesPruned):
+        services.change_feed(session, since=0, limit=100)
+    assert services.change_feed(session, result.pruned_through, 100).changes == []
+
+    # seq keeps growing after the log was emptied
+    services.update_resource(resource.id, ResourceUpdate(completed_units=1), session)
+    fresh = services.change_feed(session, result.pruned_through, 100).changes
+    assert [c.seq for c in fresh] == [result.pruned_through + 1]
+
+
+def test_migration_logs_existing_rows_as_created(engine):
+    from app.migrations import MIGRATIONS, _backfill_change_log, run_migrations
+
+    with Session(engine) as session:
+        resource = services.create_resource(
+            ResourceCreate(title="Old Notes", resource_type="article"), session
+        )
+    # a database from before the change log existed
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM change_log")
+        step = MIGRATIONS.index(_backfill_change_log)
+        conn.exec_driver_sql(f"PRAGMA user_version = {step}")
+
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        feed = services.change_feed(session, since=0, limit=10)
+        assert [(c.id, c.op) for c in feed.changes] == [(resource.id, "create")]
+        assert feed.resources[0].title == "Old Notes"
+
+
+def test_export_reads_each_batch_in_its_own_transaction(tmp_path, monkeypatch):
+    import json
+
+    from app import export
+    from app.schemas import ExportFormat
+
+    # a file database in rollback-journal mode, where an open read
+    # transaction blocks writers; no busy wait, so a held lock fails at once
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'export.db'}", connect_args={"timeout": 0}
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    with Session(engine) as session:
+        resource = services.create_resource(
+            ResourceCreate(title="Exported", resource_type="course"), session
+        )
+        start = datetime(2024, 9, 1, 8, 0)
+        for i in range(5):
+            services.create_study_session(
+                StudySessionBase(
+                    resource_id=resource.id,
+                    # equal start times page by id
+                    started_at=start + timedelta(days=i // 2),
+                    ended_at=start + timedelta(days=i // 2, hours=1),
+                ),
+                session,
+            )
+
+    stream = export.stream_study_sessions(engine, ExportFormat.ndjson)
+    chunks = [next(stream)]
+    # a writer gets in while the client is still downloading
+    with Session(engine) as session:
+        services.update_resource(
+            resource.id, ResourceUpdate(status=ResourceStatus.in_progress), session
+        )
+    chunks += list(stream)
+
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert len(chunks) == 3
+    assert [r["id"] for r in rows] == [1, 2, 3, 4, 5]
+    engine.dispose()
+
+
+def test_engine_metrics_survive_failed_statements():
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from app import metrics
+
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            # nothing left behind on the pooled connection
+            assert "metrics_started" not in conn.info
+    finally:
+        metrics._current.reset(token)
+    assert stats.queries == 4
+    engine.dispose()